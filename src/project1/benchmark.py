@@ -0,0 +1,293 @@
+"""Measure the throughput and peak memory of the lexer.
+
+`python -m project1.benchmark run` times `run_fsm` for each FSM, `lexer`, and
+`project1` over the pass-off inputs and over synthetic inputs of each size,
+and writes the results as JSON. `python -m project1.benchmark compare` reads
+two such files and reports each case that got slower, or used more memory, by
+more than a threshold:
+
+```
+$ python -m project1.benchmark run --sizes 1K,1M,1G --output baseline.json
+$ python -m project1.benchmark run --output current.json
+$ python -m project1.benchmark compare baseline.json current.json --threshold 0.1
+```
+
+A case is a target and an input, named `target/input`: `run_fsm/Colon/1M` is
+`run_fsm` with a `Colon` at the start of every token, hidden or not, of the
+synthetic 1 MiB input. Each case is run `repeat` times and the fastest run is
+kept. Peak memory is measured with `tracemalloc` in one more run, so it does
+not slow the timed runs, and does not count the input itself.
+
+Examples:
+    >>> from project1.benchmark import compare, parse_size
+    >>> parse_size("32K")
+    32768
+    >>> baseline = {"lexer/1K": {"tokens_per_sec": 100.0, "peak_bytes": 10}}
+    >>> current = {"lexer/1K": {"tokens_per_sec": 80.0, "peak_bytes": 10}}
+    >>> compare(baseline, current, 0.1)
+    ['lexer/1K: tokens_per_sec 100 -> 80 (-20.0%)']
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Any, Callable
+
+from project1.corpus import LEXER_MIX, generate
+from project1.fsm import FiniteStateMachine, run_fsm
+from project1.lexer import default_fsms, hidden, lexer, matcher
+from project1.project1 import project1
+from project1.token import TokenCode, code_mask
+
+Result = dict[str, float]
+"""The measurements for one case, by name."""
+
+PASSOFF_ROOT = "./tests/resources/project1-passoff"
+
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+_LAST_MASK: int = code_mask(["EOF", "UNDEFINED"])
+
+
+def parse_size(text: str) -> int:
+    """Return the number of bytes in a size such as `1K`, `32M`, or `1G`."""
+    text = text.strip().upper()
+    unit = text[-1:] if text[-1:] in _UNITS else ""
+    return int(text[: len(text) - len(unit)]) * _UNITS[unit]
+
+
+def synthetic_input(size: int, seed: int = 236) -> str:
+    """Return `size` characters of the tokens in `project1.corpus.LEXER_MIX`."""
+    return generate(size, LEXER_MIX, seed).text[:size]
+
+
+def passoff_inputs(root: str = PASSOFF_ROOT) -> list[str]:
+    """Return the contents of every pass-off input under `root`, in order."""
+    inputs: list[str] = []
+    for path in sorted(glob.glob(os.path.join(root, "*", "input*.txt"))):
+        with open(path, "r") as f:
+            inputs.append(f.read())
+    return inputs
+
+
+def run_benchmarks(
+    sizes: list[int], passoff_root: str | None = PASSOFF_ROOT, repeat: int = 3
+) -> dict[str, Result]:
+    """Measure every target over the pass-off inputs and each synthetic size.
+
+    Args:
+        sizes: The sizes, in characters, of the synthetic inputs.
+        passoff_root: The pass-off directory, or `None` to skip it.
+        repeat: The number of timed runs of each case.
+
+    Returns:
+        results: The measurements for each case by name.
+    """
+    inputs: dict[str, list[str]] = {}
+    if passoff_root is not None:
+        inputs["passoff"] = passoff_inputs(passoff_root)
+    for size in sizes:
+        inputs[_size_name(size)] = [synthetic_input(size)]
+
+    results: dict[str, Result] = {}
+    for input_name, input_strings in inputs.items():
+        size = sum(len(s.encode()) for s in input_strings)
+        starts: list["array[int]"] = []
+        number_of_tokens = 0
+        for input_string in input_strings:
+            offsets, count = _token_starts(input_string)
+            starts.append(offsets)
+            number_of_tokens += count
+        number_of_starts = sum(len(s) for s in starts)
+        for fsm in default_fsms():
+            name = "run_fsm/" + type(fsm).__name__ + "/" + input_name
+            run = _run_fsm_at(fsm, input_strings, starts)
+            results[name] = _measure(run, number_of_starts, size, repeat)
+        targets: list[tuple[str, Callable[[str], object]]] = [
+            ("lexer", _run_lexer),
+            ("project1", project1),
+        ]
+        for target, function in targets:
+            run = _run_each(function, input_strings)
+            results[target + "/" + input_name] = _measure(
+                run, number_of_tokens, size, repeat
+            )
+    return results
+
+
+def compare(
+    baseline: dict[str, Result], current: dict[str, Result], threshold: float
+) -> list[str]:
+    """Describe each regression from `baseline` to `current`.
+
+    A regression is throughput that fell, or peak memory that rose, by more
+    than `threshold` as a fraction of the baseline. Cases that are not in both
+    are ignored.
+
+    Args:
+        baseline: The earlier results.
+        current: The later results.
+        threshold: The change that is not a regression, such as `0.1`.
+
+    Returns:
+        regressions: One line for each regression.
+    """
+    regressions: list[str] = []
+    for name in baseline.keys() & current.keys():
+        for key, sign in [("tokens_per_sec", -1), ("peak_bytes", 1)]:
+            before = baseline[name].get(key)
+            after = current[name].get(key)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change * sign > threshold:
+                regressions.append(
+                    f"{name}: {key} {before:.0f} -> {after:.0f} ({change:+.1%})"
+                )
+    return sorted(regressions)
+
+
+def _size_name(size: int) -> str:
+    """Return the shortest name for `size` that `parse_size` reads."""
+    for unit, scale in sorted(_UNITS.items(), key=lambda item: -item[1]):
+        if size % scale == 0:
+            return str(size // scale) + unit
+    return str(size)
+
+
+def _token_starts(input_string: str) -> tuple["array[int]", int]:
+    """Return the offset of every token, hidden or not, in `input_string`.
+
+    The starts are 8 bytes each rather than a Python `int` each, as the input
+    may be a gigabyte.
+
+    Returns:
+        starts: The offset where each token starts.
+        count: The number of tokens `lexer` produces, those that are not hidden.
+    """
+    match_at = matcher(default_fsms(), "fsm")
+    hidden_mask = code_mask(hidden)
+    starts = array("q")
+    count = 0
+    start = 0
+    while True:
+        starts.append(start)
+        num_chars_read, fsm, _ = match_at(input_string, start)
+        code = TokenCode.UNDEFINED
+        if fsm is not None:
+            value = input_string[start : start + num_chars_read]
+            code = TokenCode.of(fsm.token_type(value))
+        if not (hidden_mask >> code) & 1:
+            count += 1
+        if (_LAST_MASK >> code) & 1:
+            return starts, count
+        start = start + num_chars_read
+
+
+def _run_fsm_at(
+    fsm: FiniteStateMachine, input_strings: list[str], starts: list["array[int]"]
+) -> Callable[[], None]:
+    """Return a function that runs `fsm` at every token start of each input."""
+
+    def run() -> None:
+        for input_string, offsets in zip(input_strings, starts):
+            for start in offsets:
+                run_fsm(fsm, input_string, start)
+
+    return run
+
+
+def _run_lexer(input_string: str) -> None:
+    """Produce every token from `input_string`."""
+    for _ in lexer(input_string):
+        pass
+
+
+def _run_each(
+    function: Callable[[str], object], input_strings: list[str]
+) -> Callable[[], None]:
+    """Return a function that calls `function` on each input."""
+
+    def run() -> None:
+        for input_string in input_strings:
+            function(input_string)
+
+    return run
+
+
+def _measure(run: Callable[[], None], tokens: int, size: int, repeat: int) -> Result:
+    """Time the fastest of `repeat` calls to `run` and trace one more."""
+    seconds = float("inf")
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - begin)
+    seconds = max(seconds, 1e-9)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "tokens": tokens,
+        "bytes": size,
+        "seconds": seconds,
+        "tokens_per_sec": tokens / seconds,
+        "mb_per_sec": size / seconds / (1 << 20),
+        "peak_bytes": peak_bytes,
+    }
+
+
+def main() -> None:
+    """Run the benchmarks, or compare two results, from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m project1.benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="measure and write JSON")
+    run_parser.add_argument("--sizes", default="1K,32K,1M", help="e.g. 1K,1M,1G")
+    run_parser.add_argument("--passoff", default=PASSOFF_ROOT, help="pass-off inputs")
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed runs")
+    run_parser.add_argument("--output", help="the JSON file, else standard output")
+    compare_parser = commands.add_parser("compare", help="report regressions")
+    compare_parser.add_argument("baseline", help="the earlier JSON file")
+    compare_parser.add_argument("current", help="the later JSON file")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="the allowed change, e.g. 0.1"
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        sizes = [parse_size(size) for size in args.sizes.split(",") if size]
+        passoff_root = args.passoff if os.path.isdir(args.passoff) else None
+        document: dict[str, Any] = {
+            "python": platform.python_version(),
+            "results": run_benchmarks(sizes, passoff_root, args.repeat),
+        }
+        text = json.dumps(document, indent=2, sort_keys=True)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, "r") as f:
+        current = json.load(f)["results"]
+    regressions = compare(baseline, current, args.threshold)
+    for line in regressions:
+        print(line)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
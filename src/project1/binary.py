@@ -0,0 +1,136 @@
+"""Write and read token streams in a compact binary format.
+
+A parser in another process can read the binary format without parsing the
+`(TYPE,"value",line)` text of `project1.project1.write_tokens`. The stream is
+a header, the magic `P1TB` and a format version, followed by a record for
+each token: its `TokenCode` in one byte, its line number and the length of
+its value in bytes, each as a 4-byte little-endian integer, and then the value
+in UTF-8. Records are written as the tokens are produced, so the stream needs
+no count up front; it ends after the last token the lexer produced.
+
+A `TokenReader` walks the records of a `bytes`, `mmap`, or other buffer
+through a `memoryview`, so the values it yields are views into the buffer
+rather than copies.
+
+Examples:
+    >>> import io
+    >>> from project1.binary import TokenReader, write_binary
+    >>> from project1.lexer import lexer
+    >>> out = io.BytesIO()
+    >>> write_binary(lexer(":\\n:"), out)
+    3
+    >>> reader = TokenReader(out.getvalue())
+    >>> [(code, bytes(value), line_num) for code, value, line_num in reader]
+    [(0, b':', 1), (0, b':', 2), (5, b'', 2)]
+    >>> [str(token) for token in reader.tokens()]
+    ['(COLON,":",1)', '(COLON,":",2)', '(EOF,"",2)']
+"""
+
+import struct
+from mmap import mmap
+from typing import BinaryIO, Iterable, Iterator
+
+from project1.token import TOKEN_TYPES, Token
+
+Buffer = bytes | bytearray | memoryview | mmap
+"""A buffer holding a binary token stream."""
+
+_HEADER = struct.Struct("<4sH")
+"""The magic and the format version."""
+
+_MAGIC = b"P1TB"
+FORMAT_VERSION = 1
+"""The version of the format written by `write_binary`."""
+
+_RECORD = struct.Struct("<BII")
+"""The code, line number, and value length of a token."""
+
+
+def write_binary(
+    tokens: Iterable[Token], out: BinaryIO, buffer_size: int = 1024
+) -> int:
+    """Write `tokens` to `out` in the binary format as they are produced.
+
+    Like `project1.project1.write_tokens`, it writes `buffer_size` tokens at a
+    time. Every token is written, so the stream ends at the first `UNDEFINED`
+    token only if the lexer does, as it does unless it recovers from errors.
+
+    Args:
+        tokens: The tokens to write, usually from `project1.lexer.lexer`.
+        out: The binary file to write to.
+        buffer_size: The number of token records to join for each write.
+
+    Returns:
+        token_count: The number of tokens written.
+    """
+    pack = _RECORD.pack
+    parts: list[bytes] = [_HEADER.pack(_MAGIC, FORMAT_VERSION)]
+    token_count = 0
+    for i in tokens:
+        value = i.value.encode("utf-8", "surrogatepass")
+        parts.append(pack(i.code, i.line_num, len(value)))
+        parts.append(value)
+        token_count += 1
+        if len(parts) >= 2 * buffer_size:
+            out.write(b"".join(parts))
+            parts.clear()
+    out.write(b"".join(parts))
+    return token_count
+
+
+class TokenReader:
+    """The tokens in a buffer written by `write_binary`.
+
+    Attributes:
+        data (memoryview): A view of the whole buffer.
+    """
+
+    __slots__ = ["data"]
+
+    def __init__(self, data: Buffer) -> None:
+        """Read the tokens in `data`.
+
+        Args:
+            data: The buffer, such as `bytes` or an `mmap`.
+
+        Raises:
+            ValueError: if `data` does not start with the header.
+        """
+        self.data = memoryview(data).cast("B")
+        if len(self.data) < _HEADER.size:
+            raise ValueError("not a binary token stream")
+        magic, version = _HEADER.unpack_from(self.data)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a binary token stream of a known version")
+
+    def __iter__(self) -> Iterator[tuple[int, memoryview, int]]:
+        """Yield the code, value, and line number of each token.
+
+        The value is a view of the UTF-8 bytes in the buffer.
+
+        Raises:
+            ValueError: if a record is cut short.
+        """
+        data = self.data
+        unpack_from = _RECORD.unpack_from
+        record_size = _RECORD.size
+        offset = _HEADER.size
+        end = len(data)
+        while offset < end:
+            if offset + record_size > end:
+                raise ValueError(f"truncated token record at offset {offset}")
+            code, line_num, length = unpack_from(data, offset)
+            offset += record_size
+            if offset + length > end:
+                raise ValueError(f"truncated token value at offset {offset}")
+            yield code, data[offset : offset + length], line_num
+            offset += length
+
+    def tokens(self) -> Iterator[Token]:
+        """Build each token in order."""
+        for code, value, line_num in self:
+            yield Token(
+                TOKEN_TYPES[code],
+                str(value, "utf-8", "surrogatepass"),
+                line_num,
+            )
@@ -0,0 +1,196 @@
+"""Keep the tokens for inputs already lexed in files on disk.
+
+A `LexCache` stores the tokens for an input in a file named by a hash of the
+input and of a _version_, `lexer_version`, that changes whenever the FSMs, the
+lexer, or the hidden token types do. Given the same input again, the lexer reads the
+tokens back rather than lexing it (see `project1.lexer.lexer`).
+
+Each file is a small header followed by the token codes, one byte each, the
+length of each value and each line number, as arrays of 4-byte integers in
+native byte order, and the values joined in UTF-8. The cache keeps at most
+`max_bytes` of files: reading a file marks it as used, and the files used
+least recently are deleted once there are more.
+
+Several processes may share a cache. A file is written under a temporary name
+and renamed into place, so a reader sees either the whole file or none of it,
+and a file deleted by one process is a miss for another.
+
+Examples:
+    >>> import tempfile
+    >>> from project1.cache import LexCache
+    >>> from project1.lexer import cache_version, lexer
+    >>> cache = LexCache(tempfile.mkdtemp())
+    >>> [str(token) for token in lexer(":\\n:", cache=cache)]
+    ['(COLON,":",1)', '(COLON,":",2)', '(EOF,"",2)']
+    >>> [str(token) for token in cache.load(":\\n:", cache_version())]
+    ['(COLON,":",1)', '(COLON,":",2)', '(EOF,"",2)']
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+from array import array
+from typing import Sequence
+
+from project1.codegen import cache_dir, fingerprint
+from project1.fsm import FiniteStateMachine
+from project1.token import TOKEN_TYPES, Token, TokenType
+
+FORMAT_VERSION = "1"
+"""Part of every key; change it when the file format changes."""
+
+_MAGIC = b"P1TK"
+_HEADER = struct.Struct("<4sII")
+"""The magic, the number of tokens, and the size of the joined values."""
+
+_SUFFIX = ".tok"
+
+
+def lexer_version(
+    fsms: Sequence[FiniteStateMachine], hidden: list[TokenType], lexer_source: str
+) -> str:
+    """Return a version for lexing with `fsms` that hides the `hidden` types.
+
+    It is the `project1.codegen.fingerprint` of the FSMs with a hash of
+    `lexer_source`, the source of the code that runs them, the hidden types,
+    and `FORMAT_VERSION`.
+    """
+    digest = hashlib.blake2b(lexer_source.encode(), digest_size=16).hexdigest()
+    return f"{FORMAT_VERSION}:{fingerprint(fsms)}:{digest}:{','.join(hidden)}"
+
+
+class LexCache:
+    """A directory of token files, used least recently first out.
+
+    Attributes:
+        directory (str): Where the files are kept.
+        max_bytes (int): The most bytes of files to keep.
+    """
+
+    __slots__ = ["directory", "max_bytes", "_written"]
+
+    def __init__(self, directory: str | None = None, max_bytes: int = 1 << 26) -> None:
+        """Use the cache in `directory`, which is created when first written.
+
+        Args:
+            directory: Where to keep the files, `tokens` in
+                `project1.codegen.cache_dir()` if `None`.
+            max_bytes: The most bytes of files to keep.
+        """
+        self.directory = directory or os.path.join(cache_dir(), "tokens")
+        self.max_bytes = max_bytes
+        # Bytes written since the last eviction; the first store evicts.
+        self._written = max_bytes
+
+    def path(self, input_string: str, version: str) -> str:
+        """Return the file for the tokens of `input_string` at `version`."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(version.encode() + b"\0")
+        digest.update(input_string.encode("utf-8", "surrogatepass"))
+        return os.path.join(self.directory, digest.hexdigest() + _SUFFIX)
+
+    def load(self, input_string: str, version: str) -> list[Token] | None:
+        """Return the tokens stored for `input_string`, or `None` on a miss.
+
+        Args:
+            input_string: The input that was lexed.
+            version: The `lexer_version` of the lexer.
+
+        Returns:
+            tokens: The tokens the lexer produced, or `None` if not stored.
+        """
+        path = self.path(input_string, version)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return _decode(data)
+
+    def store(self, input_string: str, version: str, tokens: list[Token]) -> None:
+        """Store the `tokens` for `input_string`, then evict if it is time to.
+
+        A cache that cannot be written is not an error; it just misses.
+
+        Args:
+            input_string: The input that was lexed.
+            version: The `lexer_version` of the lexer.
+            tokens: The tokens the lexer produced.
+        """
+        data = _encode(tokens)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, suffix=".tmp", delete=False
+            ) as f:
+                f.write(data)
+            os.replace(f.name, self.path(input_string, version))
+        except OSError:
+            return
+        self._written += len(data)
+        if self._written > self.max_bytes // 16:
+            self._written = 0
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used files until at most `max_bytes` remain."""
+        try:
+            entries = [
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(_SUFFIX)
+            ]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def _encode(tokens: list[Token]) -> bytes:
+    """Return the file contents for `tokens`."""
+    text = "".join(token.value for token in tokens).encode("utf-8", "surrogatepass")
+    return b"".join(
+        [
+            _HEADER.pack(_MAGIC, len(tokens), len(text)),
+            bytes(token.code for token in tokens),
+            array("I", [len(token.value) for token in tokens]).tobytes(),
+            array("I", [token.line_num for token in tokens]).tobytes(),
+            text,
+        ]
+    )
+
+
+def _decode(data: bytes) -> list[Token] | None:
+    """Return the tokens in file contents, or `None` if they are not valid."""
+    if len(data) < _HEADER.size:
+        return None
+    magic, count, text_size = _HEADER.unpack_from(data)
+    array_size = count * array("I").itemsize
+    offset = _HEADER.size + count
+    if magic != _MAGIC or len(data) != offset + 2 * array_size + text_size:
+        return None
+    codes = data[_HEADER.size : offset]
+    lengths = array("I", data[offset : offset + array_size])
+    line_nums = array("I", data[offset + array_size : offset + 2 * array_size])
+    try:
+        text = data[offset + 2 * array_size :].decode("utf-8", "surrogatepass")
+    except UnicodeDecodeError:
+        return None
+    if max(codes, default=0) >= len(TOKEN_TYPES) or sum(lengths) != len(text):
+        return None
+
+    tokens: list[Token] = []
+    start = 0
+    for code, length, line_num in zip(codes, lengths, line_nums):
+        tokens.append(Token(TOKEN_TYPES[code], text[start : start + length], line_num))
+        start += length
+    return tokens
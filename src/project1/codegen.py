@@ -0,0 +1,289 @@
+"""Generate a specialized Python scanner for each FSM.
+
+`run_fsm` calls a state function, and builds a tuple, for every character it
+reads. `generate_source(fsms)` instead reads the state graph of each FSM with
+`project1.fsm.to_table` and writes a Python module with a function for each,
+`scan_<class name>(input_string, start)`, that is a loop over local variables
+with the transitions written out as `in` tests on string constants: there is no
+call and no tuple until it returns. A state that loops on itself on a few
+characters becomes an inner loop that does nothing but move the cursor; on
+more, such as the body of an identifier, it skips them all with one `re`
+match, compiled once as a default argument. The functions return what
+`project1.fsm.scan_fsm` returns, or `None` on a character that is not ASCII, so
+that the caller can run the FSM instead.
+
+`load_scanners(fsms)` writes the module to the cache directory (see
+`cache_dir`) and imports it. The file name and the `FINGERPRINT` in it come from
+the generated code itself, so a change to what an FSM does writes a new
+module, and deletes the one for the old FSM, rather than use a stale one.
+
+Examples:
+    >>> from project1.codegen import generate_source
+    >>> from project1.fsm import Colon
+    >>> print(generate_source([Colon()]).split("\\n\\n\\n")[1].rstrip())
+    def scan_Colon(input_string, start):
+        i = start
+        n = len(input_string)
+        if i >= n:
+            return 0, i
+        c = input_string[i]
+        if c in ':':
+            return i - start + 1, i
+        if c > '\\x7f':
+            return None
+        return 0, i
+"""
+
+import glob
+import hashlib
+import importlib.util
+import inspect
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+from types import ModuleType
+from typing import Callable, Sequence
+
+from project1.fsm import (
+    ALPHABET,
+    STOP_HERE,
+    STOP_NEXT,
+    FiniteStateMachine,
+    TableFiniteStateMachine,
+    to_table,
+)
+
+Scanner = Callable[[str, int], "tuple[int, int] | None"]
+"""A generated scanner: `scan_fsm` for an FSM, or `None` when it cannot say."""
+
+GENERATOR_VERSION = "2"
+"""Part of every fingerprint; change it when the generated code changes."""
+
+
+def cache_dir() -> str:
+    """Return the directory for files that project1 caches on disk.
+
+    It is `$PROJECT1_CACHE_DIR` if set, else `project1` in `$XDG_CACHE_HOME`
+    or `~/.cache`.
+    """
+    directory = os.environ.get("PROJECT1_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "project1")
+
+
+def fingerprint(fsms: Sequence[FiniteStateMachine]) -> str:
+    """Return a hash of the generator version and the scanner for each FSM.
+
+    The scanner is written from the tables of the FSM, so the hash changes
+    with what the states do, even when that depends on values outside the
+    class, such as the characters of a `project1.fsm.run_while`. An FSM that
+    cannot be turned into tables is hashed by the source of its module.
+    """
+    digest = hashlib.sha256(GENERATOR_VERSION.encode())
+    for fsm in fsms:
+        cls = type(fsm.source if isinstance(fsm, TableFiniteStateMachine) else fsm)
+        digest.update(f"{cls.__module__}.{cls.__qualname__}\n".encode())
+        try:
+            digest.update(_scanner_source(cls.__name__, to_table(fsm)).encode())
+        except ValueError:
+            try:
+                digest.update(inspect.getsource(sys.modules[cls.__module__]).encode())
+            except (OSError, TypeError, KeyError):
+                pass
+    return digest.hexdigest()
+
+
+def generate_source(fsms: Sequence[FiniteStateMachine]) -> str:
+    """Return the source of a module with a scanner for each FSM.
+
+    Args:
+        fsms: The FSMs, each of a different class.
+
+    Returns:
+        source: The Python module.
+
+    Raises:
+        ValueError: if an FSM cannot be turned into tables (see `to_table`).
+    """
+    parts = [
+        f'"""Scanners generated by project1.codegen -- do not edit."""\n\n'
+        f"import re\n\n"
+        f"FINGERPRINT = {fingerprint(fsms)!r}"
+    ]
+    for fsm in fsms:
+        table = to_table(fsm)
+        parts.append(_scanner_source(type(table.source).__name__, table))
+    return "\n\n\n".join(parts) + "\n"
+
+
+_cache: dict[tuple[type, ...], list[Scanner]] = {}
+
+
+def load_scanners(fsms: Sequence[FiniteStateMachine]) -> list[Scanner]:
+    """Return the generated scanner for each FSM, generating it if needed.
+
+    The module is loaded once for each process and list of FSM classes. If
+    the cache directory cannot be written, the module is built in memory.
+
+    Args:
+        fsms: The FSMs, each of a different class.
+
+    Returns:
+        scanners: The scanner for each FSM, in order.
+
+    Raises:
+        ValueError: if an FSM cannot be turned into tables (see `to_table`).
+    """
+    cache_key = tuple(type(fsm) for fsm in fsms)
+    scanners = _cache.get(cache_key)
+    if scanners is None:
+        module = _load_module(fsms)
+        scanners = [getattr(module, "scan_" + _class_name(fsm)) for fsm in fsms]
+        _cache[cache_key] = scanners
+    return scanners
+
+
+def _class_name(fsm: FiniteStateMachine) -> str:
+    """Return the name of the class of `fsm`, or of its source for tables."""
+    if isinstance(fsm, TableFiniteStateMachine):
+        fsm = fsm.source
+    return type(fsm).__name__
+
+
+def _load_module(fsms: Sequence[FiniteStateMachine]) -> ModuleType:
+    """Import the module for `fsms` from the cache, writing it first if needed."""
+    expected = fingerprint(fsms)
+    prefix = os.path.join(cache_dir(), f"scanners_{_names_key(fsms)}_")
+    path = f"{prefix}{expected[:24]}.py"
+    module = _import(path) if os.path.exists(path) else None
+    if module is not None and getattr(module, "FINGERPRINT", None) == expected:
+        return module
+
+    source = generate_source(fsms)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(path), suffix=".tmp", delete=False
+        ) as f:
+            f.write(source)
+        os.replace(f.name, path)
+    except OSError:
+        module = ModuleType("project1_scanners")
+        exec(compile(source, "<project1 scanners>", "exec"), module.__dict__)
+        return module
+    for old_path in glob.glob(glob.escape(prefix) + "*.py"):
+        if old_path != path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+    module = _import(path)
+    assert module is not None
+    return module
+
+
+def _names_key(fsms: Sequence[FiniteStateMachine]) -> str:
+    """Return a hash of the names of the FSM classes, but not of their source.
+
+    The modules for the same classes share it, so a new module for changed
+    classes replaces the one before it.
+    """
+    names = []
+    for fsm in fsms:
+        cls = type(fsm.source if isinstance(fsm, TableFiniteStateMachine) else fsm)
+        names.append(f"{cls.__module__}.{cls.__qualname__}")
+    return hashlib.sha256("\n".join(names).encode()).hexdigest()[:12]
+
+
+def _import(path: str) -> ModuleType | None:
+    """Import the module at `path`, or return `None` if it does not load."""
+    spec = importlib.util.spec_from_file_location("project1_scanners", path)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        return None
+    return module
+
+
+_MAX_LOOP_CHARS = 8
+"""The most characters in a self loop written as `in` tests rather than `re`."""
+
+
+def _scanner_source(name: str, table: TableFiniteStateMachine) -> str:
+    """Return the source of the scanner function for `table`."""
+    number_of_states = table.number_of_states
+    runs: list[str] = []
+    lines = [
+        "    i = start",
+        "    n = len(input_string)",
+    ]
+    if number_of_states == 1:
+        lines.extend(_state_source(table, 0, "    ", runs))
+    else:
+        lines.append("    state = 0")
+        lines.append("    while True:")
+        for state in range(number_of_states):
+            lines.append(f"        if state == {state}:")
+            lines.extend(_state_source(table, state, "            ", runs))
+
+    parameters = ["input_string", "start"] + [
+        f"_run{k}=re.compile({pattern!r}).match" for k, pattern in enumerate(runs)
+    ]
+    return "\n".join([f"def scan_{name}({', '.join(parameters)}):"] + lines)
+
+
+def _state_source(
+    table: TableFiniteStateMachine, state: int, indent: str, runs: list[str]
+) -> list[str]:
+    """Return the lines for one state: a self loop, the end, and each transition.
+
+    The pattern of a self loop skipped with `re` is added to `runs`.
+    """
+    codes: dict[int, list[str]] = {}
+    for c in ALPHABET:
+        code = table.transitions[state * table.number_of_classes + table.classes[c]]
+        codes.setdefault(code, []).append(c)
+
+    lines: list[str] = []
+    loop = codes.pop(state, None)
+    if loop is not None and len(loop) > _MAX_LOOP_CHARS:
+        lines.append(f"{indent}i = _run{len(runs)}(input_string, i).end()")
+        runs.append("[" + "".join(map(re.escape, loop)) + "]*")
+    elif loop is not None:
+        lines.append(f"{indent}while i < n and input_string[i] in {''.join(loop)!r}:")
+        lines.append(f"{indent}    i += 1")
+    lines.append(f"{indent}if i >= n:")
+    lines.extend(_action_source(table.end[state], f"{indent}    "))
+    lines.append(f"{indent}c = input_string[i]")
+
+    counts = Counter({code: len(chars) for code, chars in codes.items()})
+    default = counts.most_common(1)[0][0] if counts else None
+    for code, chars in codes.items():
+        if code != default:
+            lines.append(f"{indent}if c in {''.join(chars)!r}:")
+            lines.extend(_action_source(code, f"{indent}    "))
+    lines.append(f"{indent}if c > '\\x7f':")
+    lines.append(f"{indent}    return None")
+    if default is not None:
+        lines.extend(_action_source(default, indent))
+    return lines
+
+
+def _action_source(code: int, indent: str) -> list[str]:
+    """Return the lines for a table code: move to a state or return."""
+    if code >= 0:
+        return [f"{indent}state = {code}", f"{indent}i += 1", f"{indent}continue"]
+    if code == STOP_HERE:
+        return [f"{indent}return i - start, i"]
+    if code == STOP_NEXT:
+        return [f"{indent}return i - start + 1, i"]
+    return [f"{indent}return 0, i"]
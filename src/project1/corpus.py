@@ -0,0 +1,291 @@
+"""Generate large Datalog inputs with the number of tokens of each type.
+
+Each generator is seeded, so the same arguments always give the same input,
+and returns a `Corpus`: the input with the number of tokens of each
+`TokenType` that lexing it produces, hidden `WHITESPACE` included. Tests and
+benchmarks can build inputs of any size as they run rather than store them.
+
+  * `generate(size, mix)` writes random tokens with the types weighted by `mix`.
+  * `datalog_program(size)` writes a program with long Schemes, Facts, Rules,
+    and Queries sections, with comments, strings, and white space throughout.
+  * `pathological(kind, size)` writes one extreme case, such as thousands of
+    `:` or a string that never ends.
+
+Tokens are kept apart where they would otherwise lex as one: a single space
+goes between two words or two strings, and a line comment always ends with a
+new line. The counts follow the Datalog token types. The lexer in this package
+only has the FSMs in `project1.lexer.default_fsms`, so only a `Corpus` made
+with `LEXER_MIX` lexes to its counts.
+
+Examples:
+    >>> from project1.corpus import LEXER_MIX, generate
+    >>> corpus = generate(40, LEXER_MIX, seed=1)
+    >>> len(corpus.text) >= 40
+    True
+    >>> sorted(corpus.counts.items())[:3]
+    [('COLON', 9), ('EOF', 1), ('ID', 2)]
+"""
+
+import random
+from typing import Literal
+
+from project1.token import TokenType
+
+Mix = dict[TokenType, float]
+"""The weight of each token type in a generated input."""
+
+DATALOG_MIX: Mix = {
+    "COLON": 1,
+    "COLON_DASH": 2,
+    "COMMA": 8,
+    "COMMENT": 1,
+    "FACTS": 0.1,
+    "ID": 10,
+    "LEFT_PAREN": 4,
+    "PERIOD": 3,
+    "QUERIES": 0.1,
+    "Q_MARK": 1,
+    "RIGHT_PAREN": 4,
+    "RULES": 0.1,
+    "SCHEMES": 0.1,
+    "STRING": 4,
+    "WHITESPACE": 12,
+}
+"""About the mix of a hand written Datalog program."""
+
+LEXER_MIX: Mix = {
+    "COLON": 2,
+    "FACTS": 0.1,
+    "ID": 1,
+    "QUERIES": 0.1,
+    "RULES": 0.1,
+    "SCHEMES": 0.1,
+    "WHITESPACE": 1,
+}
+"""The token types the FSMs in `project1.lexer.default_fsms` recognize."""
+
+Pathology = Literal[
+    "colons", "whitespace", "string", "block_comment", "unterminated_string"
+]
+
+_PUNCTUATION: dict[TokenType, str] = {
+    "COLON": ":",
+    "COLON_DASH": ":-",
+    "COMMA": ",",
+    "LEFT_PAREN": "(",
+    "PERIOD": ".",
+    "Q_MARK": "?",
+    "RIGHT_PAREN": ")",
+    "FACTS": "Facts",
+    "QUERIES": "Queries",
+    "RULES": "Rules",
+    "SCHEMES": "Schemes",
+}
+
+_WORDS: frozenset[TokenType] = frozenset(["ID", "FACTS", "QUERIES", "RULES", "SCHEMES"])
+
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+_ALNUM = _LOWER + _LOWER.upper() + "0123456789"
+_TEXT = _ALNUM + " .,:-()?"
+
+
+class Corpus:
+    """A generated input with the number of tokens of each type in it.
+
+    Attributes:
+        text (str): The input.
+        counts (dict[TokenType, int]): The number of tokens of each type that
+            lexing `text` produces, including `EOF` and `WHITESPACE`.
+    """
+
+    __slots__ = ["text", "counts"]
+
+    def __init__(self, text: str, counts: dict[TokenType, int]) -> None:
+        self.text = text
+        self.counts = counts
+
+
+class _Writer:
+    """Append tokens to an input, keeping them apart, and count them."""
+
+    __slots__ = ["rng", "parts", "length", "counts", "last"]
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.parts: list[str] = []
+        self.length = 0
+        self.counts: dict[TokenType, int] = {}
+        self.last: TokenType | None = None
+
+    def emit(self, token_type: TokenType, text: str) -> None:
+        """Append a token, after a space if it would join the last token."""
+        if token_type == "WHITESPACE" and self.last == "WHITESPACE":
+            self._append(text)
+            return
+        if (token_type in _WORDS and self.last in _WORDS) or (
+            token_type == "STRING" and self.last == "STRING"
+        ):
+            self.emit("WHITESPACE", " ")
+        self._append(text)
+        self.counts[token_type] = self.counts.get(token_type, 0) + 1
+        self.last = token_type
+        if token_type == "COMMENT" and not text.startswith("#|"):
+            self.emit("WHITESPACE", "\n")
+
+    def token(self, token_type: TokenType) -> None:
+        """Append a random token of `token_type`."""
+        self.emit(token_type, _make(self.rng, token_type))
+
+    def corpus(self) -> Corpus:
+        """Return the input written so far, ended with `EOF`."""
+        self.counts["EOF"] = 1
+        return Corpus("".join(self.parts), self.counts)
+
+    def _append(self, text: str) -> None:
+        self.parts.append(text)
+        self.length += len(text)
+
+
+def generate(size: int, mix: Mix = DATALOG_MIX, seed: int = 236) -> Corpus:
+    """Return random tokens, weighted by `mix`, of at least `size` characters.
+
+    Args:
+        size: The least number of characters in the input.
+        mix: The weight of each token type; `EOF` and `UNDEFINED` are ignored.
+        seed: The seed for the random choices.
+
+    Returns:
+        corpus: The input with its token counts.
+    """
+    rng = random.Random(seed)
+    types = [t for t in mix if t not in ("EOF", "UNDEFINED")]
+    weights = [mix[t] for t in types]
+    writer = _Writer(rng)
+    while writer.length < size:
+        for token_type in rng.choices(types, weights, k=64):
+            writer.token(token_type)
+            if writer.length >= size:
+                break
+    return writer.corpus()
+
+
+def datalog_program(size: int, seed: int = 236) -> Corpus:
+    """Return a Datalog program of at least `size` characters.
+
+    The sections take about a tenth, a half, a quarter, and the rest of the
+    input, with comments, multi-line strings, and runs of white space mixed in.
+
+    Args:
+        size: The least number of characters in the input.
+        seed: The seed for the random choices.
+
+    Returns:
+        corpus: The input with its token counts.
+    """
+    rng = random.Random(seed)
+    writer = _Writer(rng)
+    sections: list[tuple[TokenType, float, str]] = [
+        ("SCHEMES", 0.1, "scheme"),
+        ("FACTS", 0.6, "fact"),
+        ("RULES", 0.85, "rule"),
+        ("QUERIES", 1.0, "query"),
+    ]
+    for keyword, end, kind in sections:
+        writer.token(keyword)
+        writer.token("COLON")
+        writer.emit("WHITESPACE", "\n")
+        while True:
+            _noise(writer)
+            _statement(writer, kind)
+            writer.emit("WHITESPACE", "\n")
+            if writer.length >= size * end:
+                break
+    return writer.corpus()
+
+
+def pathological(kind: Pathology, size: int) -> Corpus:
+    """Return one extreme input of about `size` characters.
+
+    Args:
+        kind: `colons` is `size` colons, `whitespace` one run of white space,
+            `string` and `block_comment` one string or comment, and
+            `unterminated_string` a string with no closing quote.
+        size: The number of characters in the input.
+
+    Returns:
+        corpus: The input with its token counts.
+    """
+    body = ("ab\n" * (size // 3 + 1))[: max(size - 4, 0)]
+    if kind == "colons":
+        return Corpus(":" * size, {"COLON": size, "EOF": 1})
+    if kind == "whitespace":
+        text = (" \t\n" * (size // 3 + 1))[: max(size, 1)]
+        return Corpus(text, {"WHITESPACE": 1, "EOF": 1})
+    if kind == "string":
+        return Corpus("'" + body + "'", {"STRING": 1, "EOF": 1})
+    if kind == "block_comment":
+        return Corpus("#|" + body + "|#", {"COMMENT": 1, "EOF": 1})
+    return Corpus("'" + body, {"UNDEFINED": 1})
+
+
+def _make(rng: random.Random, token_type: TokenType) -> str:
+    """Return the text of a random token of `token_type`."""
+    if token_type in _PUNCTUATION:
+        return _PUNCTUATION[token_type]
+    if token_type == "ID":
+        length = rng.choice([1, 2, 4, 8, 12, 64])
+        return rng.choice(_LOWER) + "".join(rng.choices(_ALNUM, k=length - 1))
+    if token_type == "STRING":
+        length = rng.choice([0, 4, 16, 64, 1024])
+        text = "".join(rng.choices(_TEXT + "\n", k=length))
+        return "'" + text.replace("-", "''") + "'"
+    if token_type == "COMMENT":
+        text = "".join(rng.choices(_TEXT, k=rng.choice([0, 16, 80])))
+        if rng.random() < 0.3:
+            return "#|" + text.replace(" ", "\n") + "|#"
+        return "#" + text
+    if token_type == "WHITESPACE":
+        return "".join(rng.choices(" \t\n", k=rng.choice([1, 1, 2, 4, 256])))
+    raise ValueError(token_type + " is not generated")
+
+
+def _noise(writer: _Writer) -> None:
+    """Sometimes append a comment or a long run of white space."""
+    chance = writer.rng.random()
+    if chance < 0.05:
+        writer.token("COMMENT")
+    elif chance < 0.07:
+        writer.emit("WHITESPACE", " " * writer.rng.choice([64, 4096]) + "\n")
+
+
+def _statement(writer: _Writer, kind: str) -> None:
+    """Append one scheme, fact, rule, or query."""
+    if kind == "scheme":
+        _predicate(writer, "ID")
+    elif kind == "fact":
+        _predicate(writer, "STRING")
+        writer.token("PERIOD")
+    elif kind == "rule":
+        _predicate(writer, "ID")
+        writer.emit("WHITESPACE", " ")
+        writer.token("COLON_DASH")
+        for i in range(writer.rng.randint(1, 4)):
+            if i > 0:
+                writer.token("COMMA")
+            writer.emit("WHITESPACE", " ")
+            _predicate(writer, "ID")
+        writer.token("PERIOD")
+    else:
+        _predicate(writer, "STRING")
+        writer.token("Q_MARK")
+
+
+def _predicate(writer: _Writer, parameter: TokenType) -> None:
+    """Append a predicate name with mostly `parameter` parameters."""
+    writer.token("ID")
+    writer.token("LEFT_PAREN")
+    for i in range(writer.rng.randint(1, 6)):
+        if i > 0:
+            writer.token("COMMA")
+        writer.token(parameter if writer.rng.random() < 0.7 else "ID")
+    writer.token("RIGHT_PAREN")
@@ -0,0 +1,357 @@
+"""Compile a list of FSMs into one combined, minimized DFA.
+
+The lexer runs every FSM from the same position and keeps the longest match,
+so each character is read once per FSM. `compile_dfa(fsms)` instead builds a
+single deterministic finite automaton (DFA) that runs all the FSMs in lockstep:
+one pass over the input gives the same number of characters read, and the same
+winning FSM, as running the FSMs one at a time.
+
+Each FSM is first turned into tables with `project1.fsm.to_table`, so the
+combined DFA only covers the characters in `project1.fsm.ALPHABET`. `Dfa.match`
+returns `None` when it sees any other character and the caller falls back to
+running the FSMs directly.
+
+Examples:
+    >>> from project1.dfa import compile_dfa
+    >>> from project1.fsm import Colon, Eof, WhiteSpace
+    >>> dfa = compile_dfa([Colon(), Eof(), WhiteSpace()])
+    >>> dfa.match("  \\n: ", 0)
+    (3, 2, 3)
+    >>> dfa.match("  \\n: ", 3)
+    (1, 0, 3)
+    >>> dfa.match("", 0)
+    (1, 1, 0)
+    >>> dfa.match("a", 0)
+    (0, -1, 0)
+    >>> dfa.match("\\u00e9", 0) is None
+    True
+"""
+
+from typing import Sequence
+
+from project1.fsm import (
+    ALPHABET,
+    NOT_ASCII,
+    STOP_HERE,
+    STOP_NEXT,
+    FiniteStateMachine,
+    Bytes,
+    State,
+    TableFiniteStateMachine,
+    byte_classes,
+    to_table,
+)
+
+_MAX_STATES = 10_000
+
+
+class Dfa:
+    """A combined DFA for a list of FSMs.
+
+    States are integers with `0` the start state. The transition and candidate
+    tables are flat lists indexed by `state * number_of_classes + class`.
+
+    Attributes:
+        classes (dict[str, int]): The character class of each ASCII character.
+        number_of_classes (int): The number of character classes.
+        transitions (list[int]): The next state, or `-1` when every FSM stopped.
+        winners (list[int]): The index of the FSM with the best match that
+            stopped on the transition, or `-1` if there is none.
+        deltas (list[int]): The characters read past those consumed for the
+            winner on the transition.
+        end_winners (list[int]): `winners` for the end of input in each state.
+        end_deltas (list[int]): `deltas` for the end of input in each state.
+        byte_classes (bytes): The character class of each byte, or `NOT_ASCII`.
+    """
+
+    __slots__ = [
+        "byte_classes",
+        "classes",
+        "number_of_classes",
+        "transitions",
+        "winners",
+        "deltas",
+        "end_winners",
+        "end_deltas",
+    ]
+
+    def __init__(
+        self,
+        classes: dict[str, int],
+        number_of_classes: int,
+        transitions: list[int],
+        winners: list[int],
+        deltas: list[int],
+        end_winners: list[int],
+        end_deltas: list[int],
+    ) -> None:
+        self.classes = classes
+        self.number_of_classes = number_of_classes
+        self.transitions = transitions
+        self.winners = winners
+        self.deltas = deltas
+        self.end_winners = end_winners
+        self.end_deltas = end_deltas
+        self.byte_classes = byte_classes(classes)
+
+    @property
+    def number_of_states(self) -> int:
+        """The number of states in the DFA."""
+        return len(self.end_winners)
+
+    def match(self, input_string: str, start: int) -> tuple[int, int, int] | None:
+        """Return the longest match at `start` as a single pass over the input.
+
+        Args:
+            input_string: the string to use as input
+            start: the offset in `input_string` where the match starts
+
+        Returns:
+            (num_chars_read, index, stop): the characters read by the winning
+            FSM and its index in the FSM list, or `0` and `-1` if no FSM read
+            anything, with the offset where the last FSM stopped (see
+            `project1.fsm.scan_fsm`). `None` when a character outside of
+            `ALPHABET` is reached.
+        """
+        classes = self.classes
+        number_of_classes = self.number_of_classes
+        transitions = self.transitions
+        winners = self.winners
+        deltas = self.deltas
+
+        best_num_chars_read = 0
+        best_index = -1
+        state = 0
+        consumed = 0
+        number_of_chars = len(input_string)
+        for i in range(start, number_of_chars):
+            input_class = classes.get(input_string[i], -1)
+            if input_class < 0:
+                return None
+            t = state * number_of_classes + input_class
+            index = winners[t]
+            if index >= 0:
+                num_chars_read = consumed + deltas[t]
+                if num_chars_read > best_num_chars_read or (
+                    num_chars_read == best_num_chars_read and index < best_index
+                ):
+                    best_num_chars_read = num_chars_read
+                    best_index = index
+            state = transitions[t]
+            if state < 0:
+                return best_num_chars_read, best_index, i
+            consumed += 1
+
+        index = self.end_winners[state]
+        if index >= 0:
+            num_chars_read = consumed + self.end_deltas[state]
+            if num_chars_read > best_num_chars_read or (
+                num_chars_read == best_num_chars_read and index < best_index
+            ):
+                best_num_chars_read = num_chars_read
+                best_index = index
+        return best_num_chars_read, best_index, number_of_chars
+
+    def match_bytes(self, data: Bytes, start: int) -> tuple[int, int, int] | None:
+        """Return the longest match at `start` over ASCII bytes (see `match`).
+
+        Args:
+            data: the ASCII bytes to use as input
+            start: the offset in `data` where the match starts
+
+        Returns:
+            (num_chars_read, index, stop): the characters read by the winning
+            FSM and its index in the FSM list, or `0` and `-1` if no FSM read
+            anything, with the offset where the last FSM stopped (see
+            `project1.fsm.scan_fsm`). `None` when a byte that is not ASCII is
+            reached.
+        """
+        classes = self.byte_classes
+        number_of_classes = self.number_of_classes
+        transitions = self.transitions
+        winners = self.winners
+        deltas = self.deltas
+
+        best_num_chars_read = 0
+        best_index = -1
+        state = 0
+        consumed = 0
+        number_of_chars = len(data)
+        for i in range(start, number_of_chars):
+            input_class = classes[data[i]]
+            if input_class == NOT_ASCII:
+                return None
+            t = state * number_of_classes + input_class
+            index = winners[t]
+            if index >= 0:
+                num_chars_read = consumed + deltas[t]
+                if num_chars_read > best_num_chars_read or (
+                    num_chars_read == best_num_chars_read and index < best_index
+                ):
+                    best_num_chars_read = num_chars_read
+                    best_index = index
+            state = transitions[t]
+            if state < 0:
+                return best_num_chars_read, best_index, i
+            consumed += 1
+
+        index = self.end_winners[state]
+        if index >= 0:
+            num_chars_read = consumed + self.end_deltas[state]
+            if num_chars_read > best_num_chars_read or (
+                num_chars_read == best_num_chars_read and index < best_index
+            ):
+                best_num_chars_read = num_chars_read
+                best_index = index
+        return best_num_chars_read, best_index, number_of_chars
+
+
+_ProductState = tuple[int, ...]
+"""The state of each table FSM, or `-1` once it stopped."""
+
+_cache: dict[tuple[tuple[type, State], ...], Dfa] = {}
+
+
+def compile_dfa(fsms: Sequence[FiniteStateMachine]) -> Dfa:
+    """Compile `fsms` into one minimized DFA with longest match, first wins.
+
+    The result is cached for each list of FSM types and initial states, so the
+    lexer only pays for compilation once.
+
+    Args:
+        fsms: the FSMs in priority order
+
+    Returns:
+        dfa: the combined DFA
+
+    Raises:
+        ValueError: if an FSM cannot be turned into tables (see `to_table`).
+    """
+    cache_key = tuple((type(fsm), fsm.initial_state) for fsm in fsms)
+    dfa = _cache.get(cache_key)
+    if dfa is None:
+        dfa = _minimize(*_build(fsms))
+        _cache[cache_key] = dfa
+    return dfa
+
+
+_Candidate = tuple[int, int]
+"""The delta and FSM index of the best match that stopped on a transition."""
+
+
+def _build(
+    fsms: Sequence[FiniteStateMachine],
+) -> tuple[
+    dict[str, int], int, list[list[int]], list[list[_Candidate]], list[_Candidate]
+]:
+    """Build the unminimized product DFA with its character classes."""
+    tables = [to_table(fsm) for fsm in fsms]
+
+    signatures: dict[tuple[int, ...], int] = {}
+    classes: dict[str, int] = {}
+    representatives: list[str] = []
+    for c in ALPHABET:
+        signature = tuple(table.classes[c] for table in tables)
+        if signature not in signatures:
+            signatures[signature] = len(representatives)
+            representatives.append(c)
+        classes[c] = signatures[signature]
+
+    def step(
+        product: _ProductState, input_char: str
+    ) -> tuple[_ProductState, _Candidate]:
+        next_product: list[int] = []
+        best: _Candidate = (-1, -1)
+        for index, (table, state) in enumerate(zip(tables, product)):
+            code = -1 if state < 0 else _code(table, state, input_char)
+            next_product.append(max(code, -1))
+            delta = 0 if code == STOP_HERE else 1 if code == STOP_NEXT else -1
+            if delta > best[0]:
+                best = (delta, index)
+        return tuple(next_product), best
+
+    start: _ProductState = tuple(0 for _ in tables)
+    ids: dict[_ProductState, int] = {start: 0}
+    order = [start]
+    transitions: list[list[int]] = []
+    candidates: list[list[_Candidate]] = []
+    end_candidates: list[_Candidate] = []
+    for product in order:
+        row: list[int] = []
+        row_candidates: list[_Candidate] = []
+        for c in representatives:
+            next_product, best = step(product, c)
+            if all(state < 0 for state in next_product):
+                row.append(-1)
+            else:
+                if next_product not in ids:
+                    if len(ids) >= _MAX_STATES:
+                        raise ValueError("the combined DFA has too many states")
+                    ids[next_product] = len(order)
+                    order.append(next_product)
+                row.append(ids[next_product])
+            row_candidates.append(best)
+        transitions.append(row)
+        candidates.append(row_candidates)
+        end_candidates.append(step(product, "")[1])
+    return classes, len(representatives), transitions, candidates, end_candidates
+
+
+def _code(table: TableFiniteStateMachine, state: int, input_char: str) -> int:
+    """Return the table code for `state` on `input_char` (`""` is the end)."""
+    if input_char == "":
+        return table.end[state]
+    input_class = table.classes[input_char]
+    return table.transitions[state * table.number_of_classes + input_class]
+
+
+def _minimize(
+    classes: dict[str, int],
+    number_of_classes: int,
+    transitions: list[list[int]],
+    candidates: list[list[_Candidate]],
+    end_candidates: list[_Candidate],
+) -> Dfa:
+    """Merge equivalent states with partition refinement (Moore's algorithm)."""
+    number_of_states = len(transitions)
+    block = [0] * number_of_states
+    number_of_blocks = 0
+    while True:
+        signatures: dict[tuple[object, ...], int] = {}
+        next_block = []
+        for s in range(number_of_states):
+            signature = (
+                block[s],
+                end_candidates[s],
+                tuple(candidates[s]),
+                tuple(block[t] if t >= 0 else -1 for t in transitions[s]),
+            )
+            next_block.append(signatures.setdefault(signature, len(signatures)))
+        block = next_block
+        if len(signatures) == number_of_blocks:
+            break
+        number_of_blocks = len(signatures)
+
+    flat_transitions = [0] * (number_of_blocks * number_of_classes)
+    winners = [0] * (number_of_blocks * number_of_classes)
+    deltas = [0] * (number_of_blocks * number_of_classes)
+    end_winners = [0] * number_of_blocks
+    end_deltas = [0] * number_of_blocks
+    for s in range(number_of_states):
+        b = block[s]
+        for c in range(number_of_classes):
+            t = transitions[s][c]
+            delta, index = candidates[s][c]
+            flat_transitions[b * number_of_classes + c] = block[t] if t >= 0 else -1
+            winners[b * number_of_classes + c] = index
+            deltas[b * number_of_classes + c] = delta
+        end_deltas[b], end_winners[b] = end_candidates[s]
+    return Dfa(
+        classes,
+        number_of_classes,
+        flat_transitions,
+        winners,
+        deltas,
+        end_winners,
+        end_deltas,
+    )
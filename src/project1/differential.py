@@ -0,0 +1,140 @@
+"""Check that two lexer engines produce the same tokens.
+
+`first_divergence(input_string, engine, reference)` lexes the input with both
+engines and returns the first place the token streams differ, if any.
+`python -m project1.differential` runs the check over the pass-off inputs and
+over random inputs, and prints the first divergence it finds:
+
+```
+$ python -m project1.differential --engine regex --random 10000
+no divergence in 10029 inputs
+```
+
+Examples:
+    >>> from project1.differential import first_divergence
+    >>> first_divergence(":\\n  \\n:", "regex") is None
+    True
+"""
+
+import argparse
+import itertools
+import random
+import sys
+from typing import Iterable, Iterator, get_args
+
+from project1.benchmark import PASSOFF_ROOT, passoff_inputs
+from project1.corpus import LEXER_MIX, generate
+from project1.lexer import Engine, lexer
+from project1.token import Token
+
+_ALPHABET = " \t\r\n::::-#'aF1!é"
+
+
+class Divergence:
+    """The first difference between the tokens from two engines.
+
+    Attributes:
+        input_string (str): The input that was lexed.
+        index (int): The position of the first token that differs.
+        expected (Token | None): The reference token, `None` past the end.
+        actual (Token | None): The engine token, `None` past the end.
+    """
+
+    __slots__ = ["input_string", "index", "expected", "actual"]
+
+    def __init__(
+        self,
+        input_string: str,
+        index: int,
+        expected: Token | None,
+        actual: Token | None,
+    ) -> None:
+        self.input_string = input_string
+        self.index = index
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self) -> str:
+        return (
+            f"token {self.index} of {self.input_string!r}: "
+            f"expected {self.expected}, got {self.actual}"
+        )
+
+
+def first_divergence(
+    input_string: str, engine: Engine, reference: Engine = "fsm"
+) -> Divergence | None:
+    """Return where `engine` and `reference` first differ on `input_string`.
+
+    Args:
+        input_string: Input string for token generation.
+        engine: The engine to check.
+        reference: The engine to trust.
+
+    Returns:
+        divergence: The first token that differs, or `None` if none does.
+    """
+    pairs = itertools.zip_longest(
+        lexer(input_string, reference), lexer(input_string, engine)
+    )
+    for index, (expected, actual) in enumerate(pairs):
+        if expected != actual:
+            return Divergence(input_string, index, expected, actual)
+    return None
+
+
+def check(
+    inputs: Iterable[str], engine: Engine, reference: Engine = "fsm"
+) -> tuple[int, Divergence | None]:
+    """Return the number of inputs checked and the first divergence, if any.
+
+    Checking stops at the first input where the engines differ.
+    """
+    count = 0
+    for input_string in inputs:
+        count += 1
+        divergence = first_divergence(input_string, engine, reference)
+        if divergence is not None:
+            return count, divergence
+    return count, None
+
+
+def random_inputs(count: int, seed: int = 236) -> Iterator[str]:
+    """Yield `count` random inputs.
+
+    Most are short and drawn from a few characters that start or end tokens;
+    every hundredth is a long input from `project1.corpus.generate`.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        if i % 100 == 99:
+            yield generate(
+                rng.randint(1, 1 << 14), LEXER_MIX, rng.randrange(1 << 30)
+            ).text
+        else:
+            yield "".join(rng.choices(_ALPHABET, k=rng.randint(0, 24)))
+
+
+def main() -> None:
+    """Run the check from the command line."""
+    engines = get_args(Engine)
+    parser = argparse.ArgumentParser(prog="python -m project1.differential")
+    parser.add_argument("--engine", choices=engines, default="regex")
+    parser.add_argument("--reference", choices=engines, default="fsm")
+    parser.add_argument("--passoff", default=PASSOFF_ROOT, help="pass-off inputs")
+    parser.add_argument("--random", type=int, default=1000, help="random inputs")
+    parser.add_argument("--seed", type=int, default=236, help="the random seed")
+    args = parser.parse_args()
+
+    inputs = itertools.chain(
+        passoff_inputs(args.passoff), random_inputs(args.random, args.seed)
+    )
+    count, divergence = check(inputs, args.engine, args.reference)
+    if divergence is not None:
+        print(divergence)
+        sys.exit(1)
+    print(f"no divergence in {count} inputs")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,32 @@
 
 The finite state machine (FSM) is abstracted by the `FiniteStateMachine` class.
 The function `run_fsm(fsm, input_string)` runs the indicated `fsm` until it
-accepts or rejects to return the resulting characters read and token.
+accepts or rejects to return the resulting characters read and token. The
+optional `start` offset runs the `fsm` from a position in the input so that a
+caller, such as the lexer, never needs to copy the unread part of the input.
+
+A `TableFiniteStateMachine` is the same FSM with small integer states and
+transition tables indexed by character class. `to_table(fsm)` derives the
+tables from the callable states of an FSM, and `run_fsm` drives a table FSM
+with a loop that makes no call and builds no tuple for each character.
+
+`run_fsm_bytes` and `scan_fsm_bytes` do the same over ASCII `bytes` or a
+memory mapped file, so the input never needs to be decoded into a `str`.
+
+A state may declare a _run_ with `run_while` or `run_until`: characters that it
+reads one at a time without changing state, such as the body of a string or a
+block of white space. The FSM runner skips a run with one call that runs in C,
+a `re` match or `str.find`, rather than calling the state for each character.
 """
 
-from typing import Callable
-from project1.token import Token
+import copy
+import re
+from array import array
+from mmap import mmap
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+from project1.token import Token, TokenType
 
 
 State = Callable[[int, str], "StateAndOutput"]
@@ -21,9 +42,117 @@ StateAndOutput = tuple[State, int]
 The `State` is the new state resulting from the input while the `int` is the
 new output resulting from the input.
 """
+Bytes = bytes | mmap
+"""
+`Bytes` is ASCII input that is not decoded: indexing gives the `int` code of
+a character and slicing gives `bytes`.
+"""
+
+
+class Run:
+    """Characters that a state reads without changing state.
+
+    A state declares a run with `run_while` or `run_until`. For each character
+    in the run, the state must return itself with one more character read,
+    however many have been read already. The runner then skips the whole run
+    and calls the state on the character after it.
+
+    Attributes:
+        chars (str | None): The characters of a `run_while` run.
+        until (str | None): The delimiter that ends a `run_until` run.
+    """
+
+    __slots__ = ["chars", "until", "_match", "_match_bytes", "_until_bytes"]
+
+    def __init__(self, chars: str | None = None, until: str | None = None) -> None:
+        """Initialize the run from its characters or its delimiter.
+
+        Args:
+            chars: The characters the run reads, for `run_while`.
+            until: The delimiter that ends the run, for `run_until`.
+
+        Raises:
+            ValueError: unless exactly one of `chars` and `until` is not empty.
+        """
+        if bool(chars) == bool(until):
+            raise ValueError("a run needs either characters or a delimiter")
+        self.chars = chars
+        self.until = until
+        self._match = re.compile(_run_pattern(chars or "")).match
+        # Over bytes, only the ASCII characters are skipped in bulk; the state
+        # reads any others one at a time.
+        ascii_chars = "".join(c for c in chars or "" if c.isascii())
+        self._match_bytes = re.compile(_run_pattern(ascii_chars).encode()).match
+        self._until_bytes = (until or "").encode("ascii", "ignore")
+
+    def skip(self, input_string: str, i: int) -> int:
+        """Return the offset of the first character at or after `i` not in the run."""
+        if self.until is None:
+            m = self._match(input_string, i)
+            assert m is not None
+            return m.end()
+        j = input_string.find(self.until, i)
+        return len(input_string) if j < 0 else j
+
+    def skip_bytes(self, data: Bytes, i: int) -> int:
+        """Return the offset of the first byte at or after `i` not in the run."""
+        if self.until is None:
+            m = self._match_bytes(data, i)
+            assert m is not None
+            return m.end()
+        j = data.find(self._until_bytes, i)
+        return len(data) if j < 0 else j
+
+
+def _run_pattern(chars: str) -> str:
+    """Return a pattern for a run of `chars`, or the empty pattern if none."""
+    return "[" + "".join(map(re.escape, chars)) + "]*" if chars else ""
+
+
+_runs: dict[State, Run] = {}
+
+
+def run_while(chars: str) -> Callable[[State], State]:
+    """Declare that a state reads a run of the characters in `chars`.
+
+    Examples:
+        >>> from project1.fsm import FiniteStateMachine, run_while
+        >>> @run_while("ab")
+        ... def s_0(input_chars_read, input_char):
+        ...     if input_char in ("a", "b"):
+        ...         return s_0, input_chars_read + 1
+        ...     return FiniteStateMachine.s_accept, input_chars_read
+    """
+
+    def declare(state: State) -> State:
+        _runs[state] = Run(chars=chars)
+        return state
+
+    return declare
+
+
+def run_until(delimiter: str) -> Callable[[State], State]:
+    """Declare that a state reads a run of characters up to `delimiter`.
+
+    The run ends at the first `delimiter` or at the end of the input, and
+    does not include the delimiter.
+    """
+
+    def declare(state: State) -> State:
+        _runs[state] = Run(until=delimiter)
+        return state
+
+    return declare
 
 
-def run_fsm(fsm: "FiniteStateMachine", input_string: str) -> tuple[int, Token]:
+def run_of(state: State) -> Run | None:
+    """Return the run declared by `state`, if any."""
+    return _runs.get(state)
+
+
+def run_fsm(
+    fsm: "FiniteStateMachine", input_string: str, start: int = 0
+) -> tuple[int, Token]:
     """Run an FSM and return the number of characters read with the token.
 
     Run the passed in FSM until it accepts or rejects. The output is captured
@@ -34,6 +163,7 @@ def run_fsm(fsm: "FiniteStateMachine", input_string: str) -> tuple[int, Token]:
 
         fsm: the FSM to run
         input_string: the string to use as input
+        start: the offset in `input_string` where the FSM starts reading
 
     Returns:
 
@@ -47,35 +177,183 @@ def run_fsm(fsm: "FiniteStateMachine", input_string: str) -> tuple[int, Token]:
         >>> number_chars_read, token = run_fsm(colon, input_string)
         >>> "number_chars_read = {} token = {}".format(number_chars_read, str(token))
         'number_chars_read = 1 token = (COLON,":",0)'
+        >>> number_chars_read, token = run_fsm(colon, "a :", 2)
+        >>> "number_chars_read = {} token = {}".format(number_chars_read, str(token))
+        'number_chars_read = 1 token = (COLON,":",0)'
+    """
+    output_num_chars_read, _ = scan_fsm(fsm, input_string, start)
+    value = input_string[start : start + output_num_chars_read]
+    return (output_num_chars_read, fsm.token(value))
+
+
+def scan_fsm(
+    fsm: "FiniteStateMachine", input_string: str, start: int = 0
+) -> tuple[int, int]:
+    """Run an FSM from `start` and return the number of characters read.
+
+    `scan_fsm` is `run_fsm` without building the token. The input is indexed
+    from `start` rather than sliced so the unread input is never copied. The
+    lexer uses it to compare FSMs and only builds the token for the winner.
+
+    It also returns `stop`, the offset of the last input the FSM examined
+    before it accepted or rejected. A `stop` of `len(input_string)` means the
+    FSM examined the end of the input, so the result may change if the input
+    is longer -- that is how the streaming lexer knows it needs more input.
+
+    Args:
+        fsm: the FSM to run
+        input_string: the string to use as input
+        start: the offset in `input_string` where the FSM starts reading
+
+    Returns:
+        (output_num_chars_read, stop): the number of characters read from the input and the offset where the FSM stopped
+
+    Examples:
+        >>> from project1.fsm import scan_fsm, WhiteSpace
+        >>> scan_fsm(WhiteSpace(), "a  \\n b", 1)
+        (4, 5)
+        >>> scan_fsm(WhiteSpace(), "a  ", 1)
+        (2, 3)
+    """
+    if isinstance(fsm, TableFiniteStateMachine):
+        return _scan_table(fsm, input_string, start)
+    return _scan_states(fsm, input_string, start)
+
+
+def _scan_states(
+    fsm: "FiniteStateMachine", input_string: str, start: int
+) -> tuple[int, int]:
+    """Run the callable states of `fsm` from `start` (see `scan_fsm`).
+
+    A state with a `Run` skips the run before it is called.
     """
     current_state: State = fsm.initial_state
     next_state: State
+    run = _runs.get(current_state)
 
     output_num_chars_read: int = 0
 
     input_num_chars_read: int = 0
     input_char: str = ""
 
+    terminal_states = (FiniteStateMachine.s_accept, FiniteStateMachine.s_reject)
     number_of_chars = len(input_string)
-    for i in range(0, number_of_chars + 1):
+    i: int = start
+    while True:
+        if run is not None and i < number_of_chars:
+            end = run.skip(input_string, i)
+            output_num_chars_read += end - i
+            i = end
         input_num_chars_read = output_num_chars_read
         input_char = input_string[i] if i < number_of_chars else ""
 
         next_state, output_num_chars_read = current_state(
             input_num_chars_read, input_char
         )
-        if next_state in {
-            FiniteStateMachine.s_accept,
-            FiniteStateMachine.s_reject,
-        }:
+        if next_state in terminal_states or i >= number_of_chars:
             break
 
-        current_state = next_state
+        if next_state is not current_state:
+            current_state = next_state
+            run = _runs.get(current_state)
+        i += 1
+
+    return output_num_chars_read, i
+
+
+def run_fsm_bytes(
+    fsm: "FiniteStateMachine", data: Bytes, start: int = 0
+) -> tuple[int, Token]:
+    """Run an FSM over ASCII bytes and return the characters read with the token.
 
-    value = input_string[:output_num_chars_read]
+    `run_fsm_bytes` is `run_fsm` for input that is not decoded. Only the value
+    of the token is decoded.
+
+    Args:
+        fsm: the FSM to run
+        data: the ASCII bytes to use as input
+        start: the offset in `data` where the FSM starts reading
+
+    Returns:
+        (output_num_chars_read, token): the number of characters read from the input and the associated token produced by the FSM as a tuple
+
+    Examples:
+        >>> from project1.fsm import run_fsm_bytes, Colon
+        >>> number_chars_read, token = run_fsm_bytes(Colon(), b"a :", 2)
+        >>> "number_chars_read = {} token = {}".format(number_chars_read, str(token))
+        'number_chars_read = 1 token = (COLON,":",0)'
+    """
+    output_num_chars_read, _ = scan_fsm_bytes(fsm, data, start)
+    value = data[start : start + output_num_chars_read].decode("ascii")
     return (output_num_chars_read, fsm.token(value))
 
 
+def scan_fsm_bytes(
+    fsm: "FiniteStateMachine", data: Bytes, start: int = 0
+) -> tuple[int, int]:
+    """Run an FSM over ASCII bytes from `start` (see `scan_fsm`).
+
+    The callable states are given `chr` of each byte. A table FSM looks up the
+    character class of each byte directly.
+
+    Args:
+        fsm: the FSM to run
+        data: the ASCII bytes to use as input
+        start: the offset in `data` where the FSM starts reading
+
+    Returns:
+        (output_num_chars_read, stop): the number of characters read from the input and the offset where the FSM stopped
+
+    Examples:
+        >>> from project1.fsm import scan_fsm_bytes, to_table, WhiteSpace
+        >>> scan_fsm_bytes(WhiteSpace(), b"a  \\n b", 1)
+        (4, 5)
+        >>> scan_fsm_bytes(to_table(WhiteSpace()), b"a  \\n b", 1)
+        (4, 5)
+    """
+    if isinstance(fsm, TableFiniteStateMachine):
+        return _scan_table_bytes(fsm, data, start)
+    return _scan_states_bytes(fsm, data, start)
+
+
+def _scan_states_bytes(
+    fsm: "FiniteStateMachine", data: Bytes, start: int
+) -> tuple[int, int]:
+    """Run the callable states of `fsm` over bytes (see `scan_fsm_bytes`)."""
+    current_state: State = fsm.initial_state
+    next_state: State
+    run = _runs.get(current_state)
+
+    output_num_chars_read: int = 0
+
+    input_num_chars_read: int = 0
+    input_char: str = ""
+
+    terminal_states = (FiniteStateMachine.s_accept, FiniteStateMachine.s_reject)
+    number_of_chars = len(data)
+    i: int = start
+    while True:
+        if run is not None and i < number_of_chars:
+            end = run.skip_bytes(data, i)
+            output_num_chars_read += end - i
+            i = end
+        input_num_chars_read = output_num_chars_read
+        input_char = chr(data[i]) if i < number_of_chars else ""
+
+        next_state, output_num_chars_read = current_state(
+            input_num_chars_read, input_char
+        )
+        if next_state in terminal_states or i >= number_of_chars:
+            break
+
+        if next_state is not current_state:
+            current_state = next_state
+            run = _runs.get(current_state)
+        i += 1
+
+    return output_num_chars_read, i
+
+
 class FiniteStateMachine:
     """Base class for the finite state machine (FSM) abstraction.
 
@@ -86,10 +364,15 @@ class FiniteStateMachine:
 
     Attributes:
         initial_state (State): The initial state for this FSM.
+        pattern (str | None): A regular expression for exactly the values the
+            FSM accepts, for the "regex" engine (see `project1.pattern`), or
+            `None` if the FSM has none. It is set on the class.
     """
 
     __slots__ = ["initial_state"]
 
+    pattern: str | None = None
+
     def __init__(self, initial_state: State) -> None:
         """Initialize the FSM with its initial state
 
@@ -111,6 +394,20 @@ class FiniteStateMachine:
         """
         return Token.undefined(value)
 
+    def token_type(self, value: str) -> TokenType:
+        """Return the type of the token produced by this FSM for `value`.
+
+        The default builds the token with `token`. Override it when the type is
+        known without building the token.
+
+        Args:
+            value: The value associated with the `Token`.
+
+        Returns:
+            token_type: The type of `self.token(value)`.
+        """
+        return self.token(value).token_type
+
     @staticmethod
     def s_accept(input_chars_read: int, input_char: str) -> StateAndOutput:
         """Accept sync state -- once accept always accept."""
@@ -122,7 +419,293 @@ class FiniteStateMachine:
         return FiniteStateMachine.s_reject, input_chars_read
 
 
+ALPHABET: tuple[str, ...] = tuple(chr(i) for i in range(128))
+"""The characters that are probed by `to_table` to discover the FSM states."""
+
+STOP_NONE = -1
+"""Table code for an FSM that stops having read nothing."""
+STOP_HERE = -2
+"""Table code for an FSM that accepts without reading the input character."""
+STOP_NEXT = -3
+"""Table code for an FSM that accepts after reading the input character."""
+
+NOT_ASCII = 255
+"""The byte class for bytes that are not ASCII (see `byte_classes`)."""
+
+
+class TableFiniteStateMachine(FiniteStateMachine):
+    """An FSM with integer states and character class transition tables.
+
+    State `0` is the initial state. For a state `s` and an input character `c`
+    in `ALPHABET`, the code `transitions[s * number_of_classes + classes[c]]`
+    is either the next state, when it is not negative, or one of `STOP_NONE`,
+    `STOP_HERE`, and `STOP_NEXT`. The code `end[s]` is what happens at the end
+    of the input. Characters that are not in `classes` are given to the
+    callable states of `source` instead. Use `to_table` to create instances.
+
+    Attributes:
+        source (FiniteStateMachine): The FSM with the callable states.
+        classes (dict[str, int]): The character class of each character in `ALPHABET`.
+        number_of_classes (int): The number of character classes.
+        transitions (array[int]): The code for each state and character class.
+        end (array[int]): The code for each state at the end of the input.
+        byte_classes (bytes): The character class of each byte, or `NOT_ASCII`.
+    """
+
+    __slots__ = [
+        "source",
+        "classes",
+        "number_of_classes",
+        "transitions",
+        "end",
+        "byte_classes",
+    ]
+
+    def __init__(
+        self,
+        source: FiniteStateMachine,
+        classes: dict[str, int],
+        number_of_classes: int,
+        transitions: "array[int]",
+        end: "array[int]",
+    ) -> None:
+        """Initialize the table FSM from its tables.
+
+        The `initial_state` is that of `source` so that anything using the
+        callable states, such as the reference loop in `run_fsm`, still works.
+
+        Args:
+            source: The FSM with the callable states.
+            classes: The character class of each character in `ALPHABET`.
+            number_of_classes: The number of character classes.
+            transitions: The code for each state and character class.
+            end: The code for each state at the end of the input.
+        """
+        super().__init__(source.initial_state)
+        self.source = source
+        self.classes = classes
+        self.number_of_classes = number_of_classes
+        self.transitions = transitions
+        self.end = end
+        self.byte_classes = byte_classes(classes)
+
+    @property
+    def number_of_states(self) -> int:
+        """The number of states in the tables."""
+        return len(self.end)
+
+    def token(self, value: str) -> Token:
+        """Return the token produced by `source`."""
+        return self.source.token(value)
+
+    def token_type(self, value: str) -> TokenType:
+        """Return the token type produced by `source`."""
+        return self.source.token_type(value)
+
+
+def _scan_table(
+    fsm: TableFiniteStateMachine, input_string: str, start: int
+) -> tuple[int, int]:
+    """Run the tables of `fsm` from `start` (see `scan_fsm`)."""
+    classes = fsm.classes
+    number_of_classes = fsm.number_of_classes
+    transitions = fsm.transitions
+
+    state = 0
+    code = 0
+    i = start
+    number_of_chars = len(input_string)
+    while i < number_of_chars:
+        input_class = classes.get(input_string[i], -1)
+        if input_class < 0:
+            return _scan_states(fsm.source, input_string, start)
+        code = transitions[state * number_of_classes + input_class]
+        if code < 0:
+            break
+        state = code
+        i += 1
+    else:
+        code = fsm.end[state]
+
+    if code == STOP_HERE:
+        return i - start, i
+    if code == STOP_NEXT:
+        return i - start + 1, i
+    return 0, i
+
+
+def _scan_table_bytes(
+    fsm: TableFiniteStateMachine, data: Bytes, start: int
+) -> tuple[int, int]:
+    """Run the tables of `fsm` over bytes (see `scan_fsm_bytes`)."""
+    classes = fsm.byte_classes
+    number_of_classes = fsm.number_of_classes
+    transitions = fsm.transitions
+
+    state = 0
+    code = 0
+    i = start
+    number_of_chars = len(data)
+    while i < number_of_chars:
+        input_class = classes[data[i]]
+        if input_class == NOT_ASCII:
+            return _scan_states_bytes(fsm.source, data, start)
+        code = transitions[state * number_of_classes + input_class]
+        if code < 0:
+            break
+        state = code
+        i += 1
+    else:
+        code = fsm.end[state]
+
+    if code == STOP_HERE:
+        return i - start, i
+    if code == STOP_NEXT:
+        return i - start + 1, i
+    return 0, i
+
+
+def byte_classes(classes: dict[str, int]) -> bytes:
+    """Return the character class of each byte, indexed by the byte.
+
+    Bytes that are not ASCII map to `NOT_ASCII`.
+
+    Args:
+        classes: The character class of each character in `ALPHABET`.
+
+    Returns:
+        byte_classes: The 256 byte classes.
+    """
+    return bytes(
+        classes[chr(b)] if b < len(ALPHABET) else NOT_ASCII for b in range(256)
+    )
+
+
+_Key = tuple[State, bool]
+"""A probed state: the `State` function and if any characters were read."""
+
+_TERMINAL_STATES = (FiniteStateMachine.s_accept, FiniteStateMachine.s_reject)
+
+
+def _probe(key: _Key, input_char: str) -> _Key | int:
+    """Call the state in `key` on `input_char` and classify the result.
+
+    Returns:
+        outcome: the next probed state or a table code for stopping.
+
+    Raises:
+        ValueError: if the state depends on the number of characters read in
+            a way other than zero or not zero, or counts characters in a way
+            that `run_fsm` would not.
+    """
+    state, started = key
+    outcomes: set[_Key | int] = set()
+    for input_chars_read in (1, 2) if started else (0,):
+        next_state, output_chars_read = state(input_chars_read, input_char)
+        if next_state in _TERMINAL_STATES:
+            if output_chars_read == 0:
+                outcomes.add(STOP_NONE)
+            elif output_chars_read == input_chars_read:
+                outcomes.add(STOP_HERE)
+            elif output_chars_read == input_chars_read + 1:
+                outcomes.add(STOP_NEXT)
+            else:
+                raise ValueError(f"unsupported output from {state!r}")
+        elif output_chars_read == input_chars_read + 1:
+            # `run_fsm` stops after the end of the input whatever the state.
+            outcomes.add((next_state, True) if input_char != "" else STOP_NEXT)
+        else:
+            raise ValueError(f"unsupported output from {state!r}")
+    if len(outcomes) != 1:
+        raise ValueError(f"{state!r} depends on the number of characters read")
+    return outcomes.pop()
+
+
+_MAX_STATES = 10_000
+
+_tables: dict[tuple[type, State], TableFiniteStateMachine] = {}
+
+
+def to_table(fsm: FiniteStateMachine) -> TableFiniteStateMachine:
+    """Derive the integer state tables for an FSM with callable states.
+
+    The states are discovered by _probing_: each reachable state is called with
+    every character in `ALPHABET` and with the end of the input, `""`. A state
+    may behave differently when no characters have been read (see
+    `WhiteSpace.s_0`), so a table state is the pair of a `State` function and
+    whether any characters have been read. Characters that behave the same in
+    every state share a character class. The tables are cached for each FSM
+    type and initial state; the FSM returned has `fsm` as its `source`.
+
+    Args:
+        fsm: The FSM with callable states.
+
+    Returns:
+        table_fsm: The FSM as tables, or `fsm` itself if it is already tables.
+
+    Raises:
+        ValueError: if the behavior of a state cannot be captured in a table.
+
+    Examples:
+        >>> from project1.fsm import run_fsm, to_table, WhiteSpace
+        >>> whitespace = to_table(WhiteSpace())
+        >>> whitespace.number_of_states, whitespace.number_of_classes
+        (2, 2)
+        >>> number_chars_read, token = run_fsm(whitespace, " \\t\\nab")
+        >>> "number_chars_read = {} token = {}".format(number_chars_read, str(token))
+        'number_chars_read = 3 token = (WHITESPACE," \\t\\n",0)'
+    """
+    if isinstance(fsm, TableFiniteStateMachine):
+        return fsm
+
+    cache_key = (type(fsm), fsm.initial_state)
+    table = _tables.get(cache_key)
+    if table is None:
+        table = _tables[cache_key] = _build_table(fsm)
+    if table.source is not fsm:
+        table = copy.copy(table)
+        table.source = fsm
+    return table
+
+
+def _build_table(fsm: FiniteStateMachine) -> TableFiniteStateMachine:
+    """Probe the states of `fsm` and build its tables (see `to_table`)."""
+    ids: dict[_Key, int] = {(fsm.initial_state, False): 0}
+    keys = list(ids)
+    rows: list[list[_Key | int]] = []
+    ends: list[int] = []
+    for key in keys:
+        row = [_probe(key, c) for c in ALPHABET]
+        for outcome in row:
+            if not isinstance(outcome, int) and outcome not in ids:
+                if len(ids) >= _MAX_STATES:
+                    raise ValueError(f"{type(fsm).__name__} has too many states")
+                ids[outcome] = len(keys)
+                keys.append(outcome)
+        end = _probe(key, "")
+        assert isinstance(end, int)
+        rows.append(row)
+        ends.append(end)
+
+    codes = [[o if isinstance(o, int) else ids[o] for o in row] for row in rows]
+    classes: dict[str, int] = {}
+    columns: dict[tuple[int, ...], int] = {}
+    for i, c in enumerate(ALPHABET):
+        column = tuple(row[i] for row in codes)
+        classes[c] = columns.setdefault(column, len(columns))
+
+    transitions = array("i", [0] * (len(keys) * len(columns)))
+    for column, input_class in columns.items():
+        for state, code in enumerate(column):
+            transitions[state * len(columns) + input_class] = code
+    return TableFiniteStateMachine(
+        fsm, classes, len(columns), transitions, array("i", ends)
+    )
+
+
 class Colon(FiniteStateMachine):
+    pattern = ":"
+
     def __init__(self) -> None:
         super().__init__(Colon.s_0)
 
@@ -145,6 +728,13 @@ class Colon(FiniteStateMachine):
             case _:
                 return super().token(value)
 
+    def token_type(self, value: str) -> TokenType:
+        match value:
+            case ":":
+                return "COLON"
+            case _:
+                return "UNDEFINED"
+
     @staticmethod
     def s_0(input_chars_read: int, input_char: str) -> StateAndOutput:
         if input_char == ":":
@@ -154,6 +744,8 @@ class Colon(FiniteStateMachine):
 
 
 class Eof(FiniteStateMachine):
+    pattern = r"\Z"
+
     def __init__(self) -> None:
         super().__init__(Eof.s_0)
 
@@ -164,6 +756,13 @@ class Eof(FiniteStateMachine):
             case _:
                 return super().token(value)
 
+    def token_type(self, value: str) -> TokenType:
+        match value:
+            case "":
+                return "EOF"
+            case _:
+                return "UNDEFINED"
+
     @staticmethod
     def s_0(input_chars_read: int, input_char: str) -> StateAndOutput:
         if input_char == "":
@@ -172,18 +771,104 @@ class Eof(FiniteStateMachine):
             return FiniteStateMachine.s_reject, 0
 
 
+_WHITESPACE = frozenset(" \t\r\n")
+
+
 class WhiteSpace(FiniteStateMachine):
+    pattern = r"[ \t\r\n]+"
+
     def __init__(self) -> None:
         super().__init__(WhiteSpace.s_0)
 
     def token(self, value: str) -> Token:
         return Token.whitespace(value)
 
+    def token_type(self, value: str) -> TokenType:
+        return "WHITESPACE"
+
     @staticmethod
+    @run_while(" \t\r\n")
     def s_0(input_chars_read: int, input_char: str) -> StateAndOutput:
-        if input_char in [" ", "\t", "\r", "\n"]:
+        if input_char in _WHITESPACE:
             return WhiteSpace.s_0, input_chars_read + 1
         elif input_chars_read > 0:
             return FiniteStateMachine.s_accept, input_chars_read
         else:
             return FiniteStateMachine.s_reject, 0
+
+
+_ALNUM = "".join(c for c in ALPHABET if c.isalnum())
+
+
+class Id(FiniteStateMachine):
+    """An identifier, a letter then letters and digits, or a keyword.
+
+    The keywords are identifiers too, so rather than an FSM for each keyword
+    that scans the same characters as this one, the identifier is scanned once
+    and its value is looked up in `keywords`, a read-only mapping from the
+    value of each keyword to its token type. The longest match still decides:
+    `Facts` is a FACTS token, but `Factsx` is an ID since the whole identifier
+    is read first. Add a keyword to `keywords`, and to the `match` in `token`,
+    rather than add an FSM for it.
+
+    Examples:
+        >>> from project1.fsm import Id, run_fsm
+        >>> [str(run_fsm(Id(), value)[1]) for value in ["Facts", "Factsx", "x1:"]]
+        ['(FACTS,"Facts",0)', '(ID,"Factsx",0)', '(ID,"x1",0)']
+    """
+
+    pattern = r"[A-Za-z][A-Za-z0-9]*"
+
+    keywords: Mapping[str, TokenType] = MappingProxyType(
+        {
+            "Schemes": "SCHEMES",
+            "Facts": "FACTS",
+            "Rules": "RULES",
+            "Queries": "QUERIES",
+        }
+    )
+
+    def __init__(self) -> None:
+        super().__init__(Id.s_0)
+
+    def token(self, value: str) -> Token:
+        """Create a token for a keyword or else of type ID.
+
+        NOTE: the match statement is for mypy as it ensures that mypy is able to statically
+        prove that `value` is the keyword when calling, for example, `Token.facts(value)`.
+
+        Args:
+            value: The characters read by the FSM.
+
+        Returns:
+            Token: the keyword token iff what is read is a keyword otherwise Token.id.
+        """
+        match value:
+            case "Schemes":
+                return Token.schemes(value)
+            case "Facts":
+                return Token.facts(value)
+            case "Rules":
+                return Token.rules(value)
+            case "Queries":
+                return Token.queries(value)
+            case _:
+                return Token.id(value)
+
+    def token_type(self, value: str) -> TokenType:
+        return self.keywords.get(value, "ID")
+
+    @staticmethod
+    def s_0(input_chars_read: int, input_char: str) -> StateAndOutput:
+        if input_char.isascii() and input_char.isalpha():
+            return Id.s_1, input_chars_read + 1
+        else:
+            return FiniteStateMachine.s_reject, 0
+
+    @staticmethod
+    @run_while(_ALNUM)
+    def s_1(input_chars_read: int, input_char: str) -> StateAndOutput:
+        if input_char.isascii() and input_char.isalnum():
+            return Id.s_1, input_chars_read + 1
+        else:
+            return FiniteStateMachine.s_accept, input_chars_read
@@ -0,0 +1,307 @@
+"""Re-lex an input after an edit without lexing all of it again.
+
+An `IncrementalLexer` lexes its input once and keeps every token, including
+the hidden ones, with the offset where the FSMs stopped reading for it (see
+`project1.fsm.scan_fsm`). An edit replaces `deleted` characters at `offset`
+with `inserted`. Only the tokens whose FSMs read at or past `offset` can change,
+so lexing restarts at the first of those and stops as soon as a new token
+starts where an old token, after the edit, started: from there on the input
+is the same, so the tokens are the same, only moved by the size of the edit.
+
+The FSMs run over the edited region and not much more, and the tokens after
+it are not rewritten either. As in a gap buffer, the offsets and line numbers
+of the tokens from the _gap_ on are stored less a pending shift. An edit moves
+the gap to the first token it re-lexes, applying the shift to the tokens it
+passes over, and then adds the size of the edit to the shift. The work for an
+edit is the tokens it re-lexes and the tokens between it and the edit before;
+what grows with the input is only copying the new `source` and splicing the
+new tokens into the columns, each a `memmove`. Reading a column applies the
+whole shift.
+
+Examples:
+    >>> from project1.incremental import IncrementalLexer
+    >>> tokens = IncrementalLexer(":\\n:\\n:")
+    >>> tokens.edit(1, 1, "\\n\\n")
+    2
+    >>> for i in tokens:
+    ...     print(i)
+    ...
+    (COLON,":",1)
+    (COLON,":",3)
+    (COLON,":",4)
+    (EOF,"",4)
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Iterator
+
+from project1.lexer import Engine, Matcher, default_fsms, hidden, matcher
+from project1.token import TOKEN_TYPES, Token, TokenCode, code_mask
+
+_LAST_MASK: int = code_mask(["EOF", "UNDEFINED"])
+
+Columns = tuple["array[int]", ...]
+"""The codes, starts, ends, stops, reaches, and line numbers of tokens."""
+
+
+def _columns() -> Columns:
+    """Return empty columns."""
+    return array("B"), array("q"), array("q"), array("q"), array("q"), array("q")
+
+
+class IncrementalLexer:
+    """The token stream for an input that is kept up to date through edits.
+
+    The columns hold every token, hidden or not, in order. The offsets and
+    line numbers are stored less `_shift` and `_line_shift` from `_gap` on.
+
+    Attributes:
+        source (str): The current input.
+        codes (array[int]): The `TokenCode` of each token.
+    """
+
+    __slots__ = [
+        "source",
+        "codes",
+        "_starts",
+        "_ends",
+        "_stops",
+        "_reaches",
+        "_line_nums",
+        "_gap",
+        "_shift",
+        "_line_shift",
+        "_match_at",
+    ]
+
+    def __init__(self, input_string: str, engine: Engine = "fsm") -> None:
+        """Lex all of `input_string`.
+
+        Args:
+            input_string: Input string for token generation.
+            engine: How to find the longest match at each position.
+        """
+        self._match_at: Matcher = matcher(default_fsms(), engine)
+        self.source = input_string
+        (
+            self.codes,
+            self._starts,
+            self._ends,
+            self._stops,
+            self._reaches,
+            self._line_nums,
+        ) = columns = _columns()
+        self._lex(columns, 0, 1, 0, -1, 0, 0)
+        self._gap = len(self.codes)
+        self._shift = 0
+        self._line_shift = 0
+
+    @property
+    def starts(self) -> "array[int]":
+        """The offset in `source` where each token starts."""
+        self._move_gap(len(self.codes))
+        return self._starts
+
+    @property
+    def ends(self) -> "array[int]":
+        """The offset in `source` where each token ends."""
+        self._move_gap(len(self.codes))
+        return self._ends
+
+    @property
+    def stops(self) -> "array[int]":
+        """The offset where the FSMs stopped for each token."""
+        self._move_gap(len(self.codes))
+        return self._stops
+
+    @property
+    def reaches(self) -> "array[int]":
+        """The largest of `stops` up to each token."""
+        self._move_gap(len(self.codes))
+        return self._reaches
+
+    @property
+    def line_nums(self) -> "array[int]":
+        """The line number of each token."""
+        self._move_gap(len(self.codes))
+        return self._line_nums
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> int:
+        """Replace `deleted` characters at `offset` with `inserted` and re-lex.
+
+        Args:
+            offset: Where the edit starts in the current `source`.
+            deleted: The number of characters removed at `offset`.
+            inserted: The characters added at `offset`.
+
+        Returns:
+            count: The number of tokens that were lexed again.
+
+        Raises:
+            ValueError: if the edit is not inside `source`.
+        """
+        if offset < 0 or deleted < 0 or offset + deleted > len(self.source):
+            raise ValueError("the edit is not inside the input")
+        delta = len(inserted) - deleted
+        self.source = self.source[:offset] + inserted + self.source[offset + deleted :]
+
+        # The first token that read the edited input. The stream may have
+        # ended at an UNDEFINED token before the edit.
+        first = self._bisect(self._reaches, offset)
+        if first == len(self.codes):
+            return 0
+        self._move_gap(first)
+
+        # The old tokens from `tail` on start after the edit, so the new tokens
+        # may synchronize with them.
+        tail = self._bisect(self._starts, offset + deleted, first)
+        start = self._starts[first] + self._shift
+        line_num = self._line_nums[first] + self._line_shift
+        reach = self._reaches[first - 1] if first > 0 else 0
+        new = _columns()
+        sync = self._lex(
+            new,
+            start,
+            line_num,
+            reach,
+            offset + len(inserted),
+            tail,
+            self._shift + delta,
+        )
+        if sync >= 0:
+            self._splice(new, first, sync, delta, reach)
+        else:
+            for column, new_column in zip(self._all_columns(), new):
+                column[first:] = new_column
+            self._gap = len(self.codes)
+            self._shift = 0
+            self._line_shift = 0
+        return len(new[0])
+
+    def _all_columns(self) -> Columns:
+        """Return the columns as stored."""
+        return (
+            self.codes,
+            self._starts,
+            self._ends,
+            self._stops,
+            self._reaches,
+            self._line_nums,
+        )
+
+    def _bisect(self, column: "array[int]", value: int, lo: int = 0) -> int:
+        """Return the first index from `lo` where `column` is at least `value`.
+
+        The column is one of the sorted offset columns, read with the shift.
+        """
+        gap = max(self._gap, lo)
+        index = bisect_left(column, value, lo, gap)
+        if index < gap:
+            return index
+        return bisect_left(column, value - self._shift, gap)
+
+    def _move_gap(self, index: int) -> None:
+        """Move the gap to `index`, applying the shifts to the tokens passed."""
+        gap = self._gap
+        lo, hi, sign = (gap, index, 1) if gap < index else (index, gap, -1)
+        if lo < hi and (self._shift or self._line_shift):
+            shift = (sign * self._shift).__add__
+            for column in (self._starts, self._ends, self._stops, self._reaches):
+                column[lo:hi] = array("q", map(shift, column[lo:hi]))
+            line_shift = (sign * self._line_shift).__add__
+            line_nums = self._line_nums
+            line_nums[lo:hi] = array("q", map(line_shift, line_nums[lo:hi]))
+        self._gap = index
+        if index == len(self.codes):
+            self._shift = 0
+            self._line_shift = 0
+
+    def _splice(
+        self, new: Columns, first: int, sync: int, delta: int, reach: int
+    ) -> None:
+        """Replace the old tokens from `first` up to `sync` with the `new` ones.
+
+        The last new token is the one that started where the old token at
+        `sync` started, so the two are the same but for the line number. The
+        old tokens from `sync` on stay where they are, behind the gap.
+        """
+        line_shift = new[5][-1] - self._line_nums[sync]
+        reach = max(reach, new[4][-2]) if len(new[4]) > 1 else reach
+        for column, new_column in zip(self._all_columns(), new):
+            column[first:sync] = new_column[:-1]
+        gap = first + len(new[0]) - 1
+        self._gap = gap
+        self._shift += delta
+        self._line_shift = line_shift
+        # The old reaches are past the edit, so shifted they are still the
+        # largest stops but for new tokens that read further than them.
+        reaches = self._reaches
+        stored_reach = reach - self._shift
+        i = gap
+        while i < len(reaches) and reaches[i] < stored_reach:
+            reaches[i] = stored_reach
+            i += 1
+
+    def _lex(
+        self,
+        columns: Columns,
+        start: int,
+        line_num: int,
+        reach: int,
+        sync_after: int,
+        sync_lo: int,
+        sync_shift: int,
+    ) -> int:
+        """Lex from `start` and append the tokens to `columns`.
+
+        Lexing ends at the last token, or at a token that starts at or after
+        `sync_after` where an old token from `sync_lo` on, shifted by
+        `sync_shift`, starts.
+
+        Returns:
+            sync: the index of the old token where lexing ended, or `-1`.
+        """
+        codes, starts, ends, stops, reaches, line_nums = columns
+        old_starts = self._starts
+        source = self.source
+        match_at = self._match_at
+        number_of_chars = len(source)
+        while True:
+            num_chars_read, fsm, stop = match_at(source, start)
+            if fsm is None:
+                num_chars_read = 1
+            end = min(start + num_chars_read, number_of_chars)
+            code = TokenCode.UNDEFINED
+            if fsm is not None:
+                code = TokenCode.of(fsm.token_type(source[start:end]))
+            reach = max(reach, stop)
+            codes.append(code)
+            starts.append(start)
+            ends.append(end)
+            stops.append(stop)
+            reaches.append(reach)
+            line_nums.append(line_num)
+            if start >= sync_after > -1:
+                i = bisect_left(old_starts, start - sync_shift, sync_lo)
+                if i < len(old_starts) and old_starts[i] == start - sync_shift:
+                    return i
+            if (_LAST_MASK >> code) & 1:
+                return -1
+            line_num = line_num + source.count("\n", start, start + num_chars_read)
+            start = start + num_chars_read
+
+    def __len__(self) -> int:
+        """The number of tokens that are not hidden."""
+        hidden_mask = code_mask(hidden)
+        return sum(1 for code in self.codes if not (hidden_mask >> code) & 1)
+
+    def __iter__(self) -> Iterator[Token]:
+        """Build each token that is not hidden, in order."""
+        source = self.source
+        hidden_mask = code_mask(hidden)
+        for code, start, end, line_num in zip(
+            self.codes, self.starts, self.ends, self.line_nums
+        ):
+            if not (hidden_mask >> code) & 1:
+                yield Token(TOKEN_TYPES[code], source[start:end], line_num)
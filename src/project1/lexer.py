@@ -1,7 +1,13 @@
 """Turn a input string into a stream of tokens with lexical analysis.
 
 The `lexer(input_string: str)` function is the entry point. It generates a
-stream of tokens from the `input_string`.
+stream of tokens from the `input_string`. The `lexer_stream(source)` function
+generates the same stream from a text file or an iterator of string chunks
+without reading all of the input first. The `lexer_bytes(data)` function
+generates it from ASCII bytes, such as a memory mapped file, and only decodes
+the value of each token. The `lexer_buffer(input_string)` function stores the
+stream in a columnar `project1.token_buffer.TokenBuffer` without building a
+`Token` for each token.
 
 Examples:
 
@@ -15,49 +21,721 @@ Examples:
     (EOF,"",3)
 """
 
-from typing import Iterator
+import inspect
+import sys
+from typing import Callable, Iterable, Iterator, Literal, TextIO
 
-from project1.token import Token, TokenType
-from project1.fsm import FiniteStateMachine, Colon, Eof, WhiteSpace
+from project1.token import Token, TokenCode, TokenType, code_mask
+from project1.fsm import (
+    ALPHABET,
+    Bytes,
+    Colon,
+    Eof,
+    FiniteStateMachine,
+    Id,
+    State,
+    WhiteSpace,
+    scan_fsm,
+    scan_fsm_bytes,
+    to_table,
+)
+from project1.cache import LexCache, lexer_version
+from project1.codegen import load_scanners
+from project1.dfa import compile_dfa
+from project1.lines import LineIndex
+from project1.pattern import compile_pattern
+from project1.stats import LexStats
+from project1.token_buffer import TokenBuffer
 
 
-def lexer(input_string: str) -> Iterator[Token]:
+def default_fsms() -> list[FiniteStateMachine]:
+    """Return the FSMs for the lexer in priority order.
+
+    The order matters: when two FSMs read the same number of characters, the
+    one that comes first in the list wins.
+    """
+    return [Colon(), Eof(), WhiteSpace(), Id()]
+
+
+hidden: list[TokenType] = ["WHITESPACE"]
+"""Token types that are read from the input but never yielded by the lexer.
+
+The lexer tests a token against `code_mask(hidden)` using its `TokenCode`.
+"""
+
+_LAST_MASK: int = code_mask(["EOF", "UNDEFINED"])
+_EOF_MASK: int = code_mask(["EOF"])
+
+Engine = Literal["fsm", "table", "dfa", "regex", "generated"]
+"""
+`Engine` names how the lexer finds the longest match at each position: "fsm"
+runs each FSM in turn with `scan_fsm`, "table" does the same with each FSM
+turned into tables by `project1.fsm.to_table`, "dfa" runs the FSMs compiled
+into a single DFA by `project1.dfa.compile_dfa`, and "regex" matches the
+`pattern` of each FSM joined into one regular expression by
+`project1.pattern.compile_pattern`, and "generated" runs the scanner functions
+written for each FSM by `project1.codegen.load_scanners`. All produce the same
+tokens.
+"""
+
+Match = tuple[int, FiniteStateMachine | None, int]
+"""
+A `Match` is the number of characters read by the winning FSM, the winning FSM
+or `None` if no FSM read anything, and the offset where the last FSM stopped
+(see `project1.fsm.scan_fsm`).
+"""
+
+Matcher = Callable[[str, int], Match]
+"""
+A `Matcher` takes the input string with the offset of the next token and
+returns the longest `Match` at that offset.
+"""
+
+BytesMatcher = Callable[[Bytes, int], Match]
+"""A `BytesMatcher` is a `Matcher` for ASCII bytes."""
+
+
+def lexer(
+    input_string: str,
+    engine: Engine = "fsm",
+    stats: LexStats | None = None,
+    positions: bool = False,
+    cache: LexCache | None = None,
+    recover: bool = False,
+) -> Iterator[Token]:
     """Produce a stream of tokens from a given input string.
 
     Pseudo-code:
 
     ```
-    fsms: list[FiniteStateMachine] = [Colon(), Eof(), WhiteSpace()]
+    fsms: list[FiniteStateMachine] = [Colon(), Eof(), WhiteSpace(), Id()]
     hidden: list[TokenType] = ["WHITESPACE"]
     line_num: int = 1
-    token: Token = Token.undefined("")
-    while not _is_last_token(token):
-        token = _get_token(input_string, fsms)
+    start: int = 0
+    while True:
+        num_chars_read, token = _get_token(input_string, start, fsms)
         token.line_num = line_num
-        line_num = line_num + _get_new_lines(token.value)
-        input_string = input_string.removeprefix(token.value)
-        if token.token_type in hidden:
-            continue
-        yield token
+        line_num = line_num + _get_new_lines(input_string, start, num_chars_read)
+        start = start + num_chars_read
+        if token.token_type not in hidden:
+            yield token
+        if _is_last_token(token):
+            return
     ```
 
-    The `_get_token` function should return the token from the FSM that reads
+    The `_get_token` function returns the token from the FSM that reads
     the most characters. In the case of two FSMs reading the same number of
     characters, the one that comes first in the list of FSMs, `fsms`, wins.
-    Some care must be given to determining when the _last_ token has been
-    generated and how to update the new `line_num` for the next token.
+    If no FSM reads any characters, then the token is `UNDEFINED` with the
+    first character of the input as its value. The last token is either `EOF`
+    or the first `UNDEFINED`.
+
+    The lexer keeps a cursor, `start`, into the one immutable `input_string`
+    rather than removing each token from the front of the input. Removing the
+    prefix copies the rest of the input for every token, which makes lexing
+    quadratic in the size of the input. With the cursor, the only copy is the
+    value of each token.
+
+    A hidden token, such as `WHITESPACE`, is never built: the lexer tests the
+    type from `FiniteStateMachine.token_type` and only calls
+    `FiniteStateMachine.token` for the tokens it yields.
+
+    With `positions`, each token also gets its `column` and `end` from a
+    `project1.lines.LineIndex` of the input, which is built once up front.
+
+    With a `cache`, the tokens for an input that was lexed before are read
+    from the cache rather than lexed; otherwise the input is lexed in full
+    and its tokens stored before the first is yielded. Counting `stats` or
+    setting `positions` needs the lexing, so neither uses the cache.
+
+    With `recover`, an `UNDEFINED` token does not end the stream: the lexer
+    goes on from the character after it, so every error is reported in one
+    pass and the last token is always `EOF`. Each undefined character is one
+    `UNDEFINED` token, and the lexing is still linear in the input.
 
     Args:
         input_string: Input string for token generation.
+        engine: How to find the longest match at each position.
+        stats: Where to count what each FSM does, if anywhere.
+        positions: Set the column and end position of each token.
+        cache: Where to look up and store the tokens, if anywhere.
+        recover: Go on after an `UNDEFINED` token to the end of the input.
 
     Yields:
         token: The current token resulting from the string.
     """
-    fsms: list[FiniteStateMachine] = [Colon(), Eof(), WhiteSpace()]
-    hidden: list[TokenType] = ["WHITESPACE"]
+    if cache is not None and stats is None and not positions:
+        version = cache_version() + (":recover" if recover else "")
+        tokens = cache.load(input_string, version)
+        if tokens is None:
+            tokens = list(lexer(input_string, engine, recover=recover))
+            cache.store(input_string, version, tokens)
+        yield from tokens
+        return
+
+    if stats is None:
+        match_at = matcher(default_fsms(), engine)
+    else:
+        match_at = stats_matcher(default_fsms(), engine, stats)
+    lines = LineIndex(input_string) if positions else None
+    hidden_mask = code_mask(hidden)
+    last_mask = _EOF_MASK if recover else _LAST_MASK
+    line_num: int = 1
+    start: int = 0
+    while True:
+        match = match_at(input_string, start)
+        num_chars_read, code = _get_code(input_string, start, match)
+        new_lines = _get_new_lines(input_string, start, num_chars_read)
+        if not (hidden_mask >> code) & 1:
+            _, token = _get_token(input_string, start, match)
+            token.line_num = line_num
+            if lines is not None:
+                end = start + len(token.value)
+                token.column = lines.column(start, line_num)
+                token.end = (
+                    line_num + new_lines,
+                    lines.column(end, line_num + new_lines),
+                )
+            yield token
+        line_num = line_num + new_lines
+        start = start + num_chars_read
+        if (last_mask >> code) & 1:
+            return
+
+
+_versions: dict[tuple[tuple[type, ...], tuple[TokenType, ...]], str] = {}
+
+
+def cache_version() -> str:
+    """Return the `project1.cache.lexer_version` of the default FSMs and `hidden`.
+
+    The source of this module, of `project1.fsm`, and of the modules that
+    define the FSMs is part of the version, so a change to how the lexer runs
+    the FSMs, or to the tokens they build, does not reuse stale tokens. It is
+    computed once for each list of FSM types and hidden types.
+    """
+    fsms = default_fsms()
+    cache_key = (tuple(type(fsm) for fsm in fsms), tuple(hidden))
+    version = _versions.get(cache_key)
+    if version is None:
+        version = lexer_version(fsms, hidden, _lexer_source(fsms))
+        _versions[cache_key] = version
+    return version
+
+
+def _lexer_source(fsms: list[FiniteStateMachine]) -> str:
+    """Return the source of the modules that lex with `fsms`, or "" if not found.
+
+    They are this module, `project1.fsm`, and the modules of the `fsms`.
+    """
+    names = [__name__, FiniteStateMachine.__module__]
+    names.extend(type(fsm).__module__ for fsm in fsms)
+    try:
+        return "".join(
+            inspect.getsource(sys.modules[name]) for name in dict.fromkeys(names)
+        )
+    except (OSError, TypeError, KeyError):
+        return ""
+
+
+def lexer_stream(
+    source: TextIO | Iterable[str],
+    engine: Engine = "fsm",
+    chunk_size: int = 65536,
+    stats: LexStats | None = None,
+    recover: bool = False,
+) -> Iterator[Token]:
+    """Produce a stream of tokens from a text file or an iterator of chunks.
+
+    The tokens are the same as `lexer` on all of the input joined together, but
+    each token is yielded as soon as it is decided. A token is decided once no
+    FSM needs to look past the input read so far (see `project1.fsm.scan_fsm`).
+    Only the input from the start of the next token is kept, so memory is
+    bounded by the longest pending match rather than the size of the input.
+    Tokens may span any number of chunks.
+
+    Args:
+        source: A text file, read `chunk_size` characters at a time, or an
+            iterator of strings.
+        engine: How to find the longest match at each position.
+        chunk_size: The number of characters to read at a time from a file.
+        stats: Where to count what each FSM does, if anywhere.
+        recover: Go on after an `UNDEFINED` token, see `lexer`.
+
+    Yields:
+        token: The current token resulting from the input.
+
+    Examples:
+        >>> from project1.lexer import lexer_stream
+        >>> for i in lexer_stream([" :", "\\n ", " ", "\\n:"]):
+        ...     print(i)
+        ...
+        (COLON,":",1)
+        (COLON,":",3)
+        (EOF,"",3)
+    """
+    chunks: Iterator[str]
+    if hasattr(source, "read"):
+        read = source.read
+        chunks = iter(lambda: str(read(chunk_size)), "")
+    else:
+        chunks = iter(source)
+
+    if stats is None:
+        match_at = matcher(default_fsms(), engine)
+    else:
+        match_at = stats_matcher(default_fsms(), engine, stats)
+    hidden_mask = code_mask(hidden)
+    last_mask = _EOF_MASK if recover else _LAST_MASK
+    buffer: str = ""
+    is_final: bool = False
+    line_num: int = 1
+    start: int = 0
+    while True:
+        match = match_at(buffer, start)
+        if not is_final and match[2] >= len(buffer):
+            buffer, is_final = _read_more(buffer[start:], chunks)
+            start = 0
+            continue
+        num_chars_read, code = _get_code(buffer, start, match)
+        if not (hidden_mask >> code) & 1:
+            _, token = _get_token(buffer, start, match)
+            token.line_num = line_num
+            yield token
+        line_num = line_num + _get_new_lines(buffer, start, num_chars_read)
+        start = start + num_chars_read
+        if (last_mask >> code) & 1:
+            return
+
+
+def lexer_bytes(
+    data: Bytes, engine: Engine = "fsm", recover: bool = False
+) -> Iterator[Token]:
+    """Produce a stream of tokens from ASCII bytes.
+
+    The tokens are the same as `lexer` on `data` decoded as ASCII. The input is
+    never decoded as a whole: the FSMs run over the bytes, see
+    `project1.fsm.scan_fsm_bytes`, and only the value of each token is decoded.
+    With a memory mapped file, the input is never copied into memory at all.
+
+    Args:
+        data: ASCII bytes for token generation.
+        engine: How to find the longest match at each position.
+        recover: Go on after an `UNDEFINED` token, see `lexer`.
+
+    Yields:
+        token: The current token resulting from the bytes.
+
+    Raises:
+        UnicodeDecodeError: if a token value is not ASCII.
+
+    Examples:
+        >>> from project1.lexer import lexer_bytes
+        >>> for i in lexer_bytes(b":\\n  \\n:"):
+        ...     print(i)
+        ...
+        (COLON,":",1)
+        (COLON,":",3)
+        (EOF,"",3)
+    """
+    match_at = bytes_matcher(default_fsms(), engine)
+    hidden_mask = code_mask(hidden)
+    last_mask = _EOF_MASK if recover else _LAST_MASK
+    line_num: int = 1
+    start: int = 0
+    while True:
+        num_chars_read, fsm, _ = match_at(data, start)
+        if fsm is None:
+            num_chars_read = 1
+        value = data[start : start + num_chars_read].decode("ascii")
+        token = fsm.token(value) if fsm is not None else Token.undefined(value)
+        token.line_num = line_num
+        line_num = line_num + value.count("\n")
+        start = start + num_chars_read
+        if not (hidden_mask >> token.code) & 1:
+            yield token
+        if (last_mask >> token.code) & 1:
+            return
+
+
+def lexer_buffer(input_string: str, engine: Engine = "fsm") -> TokenBuffer:
+    """Produce the token stream for an input string as a `TokenBuffer`.
+
+    The buffer holds the same tokens as `lexer` but only records the type,
+    offsets, and line number of each one; see `FiniteStateMachine.token_type`.
+
+    Args:
+        input_string: Input string for token generation.
+        engine: How to find the longest match at each position.
+
+    Returns:
+        buffer: The tokens resulting from the string.
+
+    Examples:
+        >>> from project1.lexer import lexer_buffer
+        >>> buffer = lexer_buffer(":\\n  \\n:")
+        >>> len(buffer)
+        3
+        >>> print(buffer[1])
+        (COLON,":",3)
+    """
+    match_at = matcher(default_fsms(), engine)
+    hidden_mask = code_mask(hidden)
+    buffer = TokenBuffer(input_string)
+    number_of_chars = len(input_string)
+    line_num: int = 1
+    start: int = 0
+    while True:
+        num_chars_read, fsm, _ = match_at(input_string, start)
+        if fsm is None:
+            num_chars_read = 1
+        end = min(start + num_chars_read, number_of_chars)
+        code = TokenCode.UNDEFINED
+        if fsm is not None:
+            code = TokenCode.of(fsm.token_type(input_string[start:end]))
+        if not (hidden_mask >> code) & 1:
+            buffer.append(code, start, end, line_num)
+        if (_LAST_MASK >> code) & 1:
+            return buffer
+        line_num = line_num + _get_new_lines(input_string, start, num_chars_read)
+        start = start + num_chars_read
+
+
+def _read_more(pending: str, chunks: Iterator[str]) -> tuple[str, bool]:
+    """Append chunks to `pending` until its length doubles or the input ends.
+
+    Doubling bounds the work to rescan a match that spans many chunks to a
+    constant factor of its length.
+
+    Returns:
+        (buffer, is_final): the new buffer and if all the input is in it.
+    """
+    parts = [pending]
+    needed = max(len(pending), 1)
+    for chunk in chunks:
+        parts.append(chunk)
+        needed -= len(chunk)
+        if needed <= 0:
+            return "".join(parts), False
+    return "".join(parts), True
+
+
+def matcher(fsms: list[FiniteStateMachine], engine: Engine) -> Matcher:
+    """Return the `Matcher` for the `fsms` using the given `engine`.
+
+    Args:
+        fsms: The FSMs in priority order.
+        engine: How to find the longest match at each position.
+
+    Returns:
+        match_at: The function that returns the longest match at an offset.
+    """
+    match engine:
+        case "fsm" | "table":
+            if engine == "table":
+                fsms = [to_table(fsm) for fsm in fsms]
+            index = dispatch_index(fsms)
+
+            def match_fsms(input_string: str, start: int) -> Match:
+                input_char = input_string[start] if start < len(input_string) else ""
+                return _longest_match(input_string, start, index.get(input_char, fsms))
+
+            return match_fsms
+        case "dfa":
+            dfa = compile_dfa(fsms)
+
+            def match_dfa(input_string: str, start: int) -> Match:
+                match = dfa.match(input_string, start)
+                if match is None:
+                    return _longest_match(input_string, start, fsms)
+                num_chars_read, index, stop = match
+                return num_chars_read, fsms[index] if index >= 0 else None, stop
+
+            return match_dfa
+        case "regex":
+            pattern = compile_pattern(fsms)
+            others = [fsms[i] for i in pattern.others]
+
+            def match_regex(input_string: str, start: int) -> Match:
+                num_chars_read, index, stop = pattern.match(input_string, start)
+                if index < 0 and start < len(input_string):
+                    return _longest_match(input_string, start, fsms)
+                match = num_chars_read, fsms[index] if index >= 0 else None, stop
+                if others:
+                    match = _with_others(
+                        match, _longest_match(input_string, start, others), fsms
+                    )
+                return match
+
+            return match_regex
+        case "generated":
+            all_pairs = list(zip(fsms, load_scanners(fsms)))
+            pairs = {
+                input_char: [all_pairs[i] for i in positions]
+                for input_char, positions in _dispatch_positions(fsms).items()
+            }
+
+            def match_generated(input_string: str, start: int) -> Match:
+                input_char = input_string[start] if start < len(input_string) else ""
+                best_num_chars_read: int = 0
+                best_fsm: FiniteStateMachine | None = None
+                last_stop: int = start
+                for fsm, scan in pairs.get(input_char, all_pairs):
+                    result = scan(input_string, start)
+                    if result is None:
+                        result = scan_fsm(fsm, input_string, start)
+                    num_chars_read, stop = result
+                    if num_chars_read > best_num_chars_read:
+                        best_num_chars_read = num_chars_read
+                        best_fsm = fsm
+                    if stop > last_stop:
+                        last_stop = stop
+                return best_num_chars_read, best_fsm, last_stop
+
+            return match_generated
+
+
+def stats_matcher(
+    fsms: list[FiniteStateMachine], engine: Engine, stats: LexStats
+) -> Matcher:
+    """Return a `Matcher` like `matcher` that counts each FSM run in `stats`.
+
+    The "dfa", "regex", and "generated" engines are counted as the "table"
+    engine, which finds the same matches one FSM at a time.
+
+    Args:
+        fsms: The FSMs in priority order.
+        engine: How to find the longest match at each position.
+        stats: Where to count the runs and the wins.
+
+    Returns:
+        match_at: The function that returns the longest match at an offset.
+    """
+    if engine != "fsm":
+        fsms = [to_table(fsm) for fsm in fsms]
+    index = dispatch_index(fsms)
+    scan = stats.scan_fsm
+
+    def match_counted(input_string: str, start: int) -> Match:
+        input_char = input_string[start] if start < len(input_string) else ""
+        best_num_chars_read: int = 0
+        best_fsm: FiniteStateMachine | None = None
+        last_stop: int = start
+        for fsm in index.get(input_char, fsms):
+            num_chars_read, stop = scan(fsm, input_string, start)
+            if num_chars_read > best_num_chars_read:
+                best_num_chars_read = num_chars_read
+                best_fsm = fsm
+            if stop > last_stop:
+                last_stop = stop
+        if best_fsm is not None:
+            stats.for_fsm(best_fsm).wins += 1
+        return best_num_chars_read, best_fsm, last_stop
+
+    return match_counted
+
+
+def bytes_matcher(fsms: list[FiniteStateMachine], engine: Engine) -> BytesMatcher:
+    """Return the `BytesMatcher` for the `fsms` using the given `engine`.
+
+    The generated scanners index a `str`, so over bytes the "generated" engine
+    runs the tables as the "table" engine does.
+
+    Args:
+        fsms: The FSMs in priority order.
+        engine: How to find the longest match at each position.
+
+    Returns:
+        match_at: The function that returns the longest match at an offset.
+    """
+    match engine:
+        case "fsm" | "table" | "generated":
+            if engine != "fsm":
+                fsms = [to_table(fsm) for fsm in fsms]
+            index = dispatch_index(fsms)
+            byte_index = [index.get(chr(b), fsms) for b in range(256)]
+            end_index = index[""]
+
+            def match_fsms(data: Bytes, start: int) -> Match:
+                candidates = byte_index[data[start]] if start < len(data) else end_index
+                return _longest_match_bytes(data, start, candidates)
+
+            return match_fsms
+        case "dfa":
+            dfa = compile_dfa(fsms)
+
+            def match_dfa(data: Bytes, start: int) -> Match:
+                match = dfa.match_bytes(data, start)
+                if match is None:
+                    return _longest_match_bytes(data, start, fsms)
+                num_chars_read, index, stop = match
+                return num_chars_read, fsms[index] if index >= 0 else None, stop
+
+            return match_dfa
+        case "regex":
+            pattern = compile_pattern(fsms)
+            others = [fsms[i] for i in pattern.others]
+
+            def match_regex(data: Bytes, start: int) -> Match:
+                num_chars_read, index, stop = pattern.match_bytes(data, start)
+                if index < 0 and start < len(data):
+                    return _longest_match_bytes(data, start, fsms)
+                match = num_chars_read, fsms[index] if index >= 0 else None, stop
+                if others:
+                    match = _with_others(
+                        match, _longest_match_bytes(data, start, others), fsms
+                    )
+                return match
+
+            return match_regex
+
+
+def _with_others(match: Match, other: Match, fsms: list[FiniteStateMachine]) -> Match:
+    """Return the better of a pattern match and a match of the other FSMs.
+
+    The longest match wins and ties go to the FSM that comes first in `fsms`.
+    """
+    num_chars_read, fsm, stop = match
+    other_num_chars_read, other_fsm, other_stop = other
+    if other_fsm is not None and (
+        other_num_chars_read > num_chars_read
+        or (
+            other_num_chars_read == num_chars_read
+            and (fsm is None or fsms.index(other_fsm) < fsms.index(fsm))
+        )
+    ):
+        num_chars_read, fsm = other_num_chars_read, other_fsm
+    return num_chars_read, fsm, max(stop, other_stop)
+
+
+_dispatch_cache: dict[tuple[tuple[type, State], ...], dict[str, list[int]]] = {}
+
+
+def dispatch_index(
+    fsms: list[FiniteStateMachine],
+) -> dict[str, list[FiniteStateMachine]]:
+    """Map each leading character to the FSMs that may read it.
+
+    An FSM whose `initial_state` stops on a character having read nothing can
+    never win at a position starting with that character, so it is left out
+    of the list for that character. The lists keep the order of `fsms` so ties
+    still go to the FSM that comes first. The keys are the characters in
+    `project1.fsm.ALPHABET` and `""` for the end of the input; any other
+    character must use all of `fsms`. The positions of the candidates are
+    cached for each list of FSM types and initial states; the lists hold the
+    FSMs in `fsms`.
+
+    Args:
+        fsms: The FSMs in priority order.
+
+    Returns:
+        index: The candidate FSMs for each leading character.
+
+    Examples:
+        >>> from project1.lexer import dispatch_index, default_fsms
+        >>> index = dispatch_index(default_fsms())
+        >>> [type(fsm).__name__ for fsm in index[":"]]
+        ['Colon']
+        >>> [type(fsm).__name__ for fsm in index[""]]
+        ['Eof']
+        >>> [type(fsm).__name__ for fsm in index["a"]]
+        ['Id']
+        >>> index["!"]
+        []
+    """
+    return {
+        input_char: [fsms[i] for i in positions]
+        for input_char, positions in _dispatch_positions(fsms).items()
+    }
+
+
+def _dispatch_positions(fsms: list[FiniteStateMachine]) -> dict[str, list[int]]:
+    """Map each leading character to the positions in `fsms` of its candidates."""
+    cache_key = tuple((type(fsm), fsm.initial_state) for fsm in fsms)
+    index = _dispatch_cache.get(cache_key)
+    if index is None:
+        terminal_states = (FiniteStateMachine.s_accept, FiniteStateMachine.s_reject)
+        index = {}
+        for input_char in ALPHABET + ("",):
+            positions = []
+            for i, fsm in enumerate(fsms):
+                next_state, num_chars_read = fsm.initial_state(0, input_char)
+                if num_chars_read != 0 or next_state not in terminal_states:
+                    positions.append(i)
+            index[input_char] = positions
+        _dispatch_cache[cache_key] = index
+    return index
+
+
+def _longest_match(
+    input_string: str, start: int, fsms: list[FiniteStateMachine]
+) -> Match:
+    """Run each FSM at `start` and return the longest match.
+
+    Ties go to the FSM that comes first in `fsms`.
+    """
+    best_num_chars_read: int = 0
+    best_fsm: FiniteStateMachine | None = None
+    last_stop: int = start
+    for fsm in fsms:
+        num_chars_read, stop = scan_fsm(fsm, input_string, start)
+        if num_chars_read > best_num_chars_read:
+            best_num_chars_read = num_chars_read
+            best_fsm = fsm
+        if stop > last_stop:
+            last_stop = stop
+    return best_num_chars_read, best_fsm, last_stop
+
+
+def _longest_match_bytes(
+    data: Bytes, start: int, fsms: list[FiniteStateMachine]
+) -> Match:
+    """Run each FSM at `start` over bytes and return the longest match."""
+    best_num_chars_read: int = 0
+    best_fsm: FiniteStateMachine | None = None
+    last_stop: int = start
+    for fsm in fsms:
+        num_chars_read, stop = scan_fsm_bytes(fsm, data, start)
+        if num_chars_read > best_num_chars_read:
+            best_num_chars_read = num_chars_read
+            best_fsm = fsm
+        if stop > last_stop:
+            last_stop = stop
+    return best_num_chars_read, best_fsm, last_stop
+
+
+def _get_token(input_string: str, start: int, match: Match) -> tuple[int, Token]:
+    """Return the token for the `match` at `start` with the characters read.
+
+    Only the winning FSM builds a token. If no FSM reads anything, then the
+    token is `UNDEFINED` with the character at `start` as its value.
+    """
+    num_chars_read, fsm, _ = match
+    if fsm is None:
+        return 1, Token.undefined(input_string[start : start + 1])
+
+    value = input_string[start : start + num_chars_read]
+    return num_chars_read, fsm.token(value)
+
+
+def _get_code(input_string: str, start: int, match: Match) -> tuple[int, TokenCode]:
+    """Return the characters read and the code of the token for the `match`.
+
+    The code comes from `FiniteStateMachine.token_type`, so a token that is
+    hidden is never built.
+    """
+    num_chars_read, fsm, _ = match
+    if fsm is None:
+        return 1, TokenCode.UNDEFINED
+    value = input_string[start : start + num_chars_read]
+    return num_chars_read, TokenCode.of(fsm.token_type(value))
+
+
+def _get_new_lines(input_string: str, start: int, num_chars_read: int) -> int:
+    """Count the new lines in the `num_chars_read` characters at `start`."""
+    return input_string.count("\n", start, start + num_chars_read)
 
-    # TODO: remove the `print` statements since they are only here for ruff
-    print(fsms)
-    print(hidden)
 
-    raise NotImplementedError
+def _is_last_token(token: Token) -> bool:
+    """Return true iff no token follows `token` in the stream."""
+    return bool((_LAST_MASK >> token.code) & 1)
@@ -0,0 +1,57 @@
+"""Map offsets in an input to line and column numbers.
+
+A `LineIndex` holds the offset where each line of an input starts. It is built
+once in a single pass over the input that runs in C, `str.split` with the line
+lengths summed by `itertools.accumulate`, and then finds the line of any offset
+with `bisect` rather than by counting the new lines before it. Lines and
+columns are numbered from 1.
+
+Examples:
+    >>> from project1.lines import LineIndex
+    >>> lines = LineIndex("a\\nbc\\n\\nd")
+    >>> len(lines)
+    4
+    >>> lines.position(0), lines.position(3), lines.position(5), lines.position(7)
+    ((1, 1), (2, 2), (3, 1), (4, 2))
+"""
+
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class LineIndex:
+    """The offset where each line of an input starts.
+
+    Attributes:
+        starts (array[int]): The offset of the first character of each line,
+            so `starts[line_num - 1]` for a line number.
+    """
+
+    __slots__ = ["starts"]
+
+    def __init__(self, input_string: str) -> None:
+        """Find the start of every line in `input_string`.
+
+        Args:
+            input_string: The input to index.
+        """
+        lengths = map(len, input_string.split("\n")[:-1])
+        self.starts = array("q", accumulate(map((1).__add__, lengths), initial=0))
+
+    def __len__(self) -> int:
+        """The number of lines."""
+        return len(self.starts)
+
+    def line_of(self, offset: int) -> int:
+        """Return the line number of `offset`."""
+        return bisect_right(self.starts, offset)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Return the line and column numbers of `offset`."""
+        line_num = bisect_right(self.starts, offset)
+        return line_num, offset - self.starts[line_num - 1] + 1
+
+    def column(self, offset: int, line_num: int) -> int:
+        """Return the column number of `offset`, already known to be on `line_num`."""
+        return offset - self.starts[line_num - 1] + 1
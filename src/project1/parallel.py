@@ -0,0 +1,173 @@
+"""Lex one large input on many cores.
+
+`lexer_parallel(input_string)` splits the input into segments just after a
+new line and lexes the segments at the same time in a process pool. A segment
+is lexed as if a token starts where it starts, which is usually, but not
+always, true: a token such as a string may span the new line. The segments are
+stitched together in order. From the end of the tokens that are known to be
+right, tokens are lexed one at a time over the whole input until one starts
+where a token of the next segment starts. Lexing from a token boundary only
+depends on the input that follows, so from there the tokens of the segment
+are the same as the serial lexer's, only with line numbers counted from the
+start of the segment, which are corrected.
+
+A segment only keeps the tokens that its FSMs decided without looking past the
+end of the segment (see `project1.lexer.lexer_stream`), so a token that is cut
+by the end of the segment is lexed again when stitching.
+
+Examples:
+    >>> from project1.parallel import lexer_parallel
+    >>> input_string = ":\\n  \\n:\\n" * 2
+    >>> for i in lexer_parallel(input_string, workers=2, segment_size=4):
+    ...     print(i)
+    ...
+    (COLON,":",1)
+    (COLON,":",3)
+    (COLON,":",4)
+    (COLON,":",6)
+    (EOF,"",7)
+"""
+
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterator
+
+from project1.lexer import (
+    Engine,
+    _get_new_lines,
+    _get_token,
+    default_fsms,
+    hidden,
+    lexer,
+    matcher,
+)
+from project1.token import TOKEN_TYPES, Token, TokenCode, code_mask
+
+_LAST_MASK: int = code_mask(["EOF", "UNDEFINED"])
+
+_Columns = tuple["array[int]", "array[int]", "array[int]", "array[int]"]
+"""The codes, starts, ends, and line numbers of the tokens of a segment."""
+
+
+def lexer_parallel(
+    input_string: str,
+    engine: Engine = "fsm",
+    workers: int | None = None,
+    segment_size: int = 1 << 22,
+) -> Iterator[Token]:
+    """Produce the same stream of tokens as `lexer` using a process pool.
+
+    Args:
+        input_string: Input string for token generation.
+        engine: How to find the longest match at each position.
+        workers: The number of processes, `os.cpu_count()` if `None`.
+        segment_size: The number of characters in each segment, about.
+
+    Yields:
+        token: The current token resulting from the string.
+    """
+    bounds = _split(input_string, segment_size)
+    if len(bounds) == 1:
+        yield from lexer(input_string, engine)
+        return
+
+    with ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+        futures: list[Future[_Columns]] = [
+            pool.submit(_lex_segment, input_string[a:b], b == len(input_string), engine)
+            for a, b in bounds
+        ]
+        yield from _stitch(input_string, engine, bounds, futures)
+
+
+def _split(input_string: str, segment_size: int) -> list[tuple[int, int]]:
+    """Split the input into segments that start just after a new line."""
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    while True:
+        end = input_string.find("\n", start + segment_size) + 1
+        if end <= 0 or end >= len(input_string):
+            bounds.append((start, len(input_string)))
+            return bounds
+        bounds.append((start, end))
+        start = end
+
+
+def _lex_segment(segment: str, is_final: bool, engine: Engine) -> _Columns:
+    """Lex a segment as if a token starts at its start.
+
+    Unless the segment is the last, lexing ends at the first token whose FSMs
+    looked at the end of the segment; that token is not kept.
+    """
+    match_at = matcher(default_fsms(), engine)
+    codes = array("B")
+    starts = array("q")
+    ends = array("q")
+    line_nums = array("q")
+    number_of_chars = len(segment)
+    line_num = 1
+    start = 0
+    while True:
+        num_chars_read, fsm, stop = match_at(segment, start)
+        if stop >= number_of_chars and not is_final:
+            return codes, starts, ends, line_nums
+        if fsm is None:
+            num_chars_read = 1
+        end = min(start + num_chars_read, number_of_chars)
+        code = TokenCode.UNDEFINED
+        if fsm is not None:
+            code = TokenCode.of(fsm.token_type(segment[start:end]))
+        codes.append(code)
+        starts.append(start)
+        ends.append(end)
+        line_nums.append(line_num)
+        if (_LAST_MASK >> code) & 1:
+            return codes, starts, ends, line_nums
+        line_num = line_num + segment.count("\n", start, end)
+        start = end
+
+
+def _stitch(
+    input_string: str,
+    engine: Engine,
+    bounds: list[tuple[int, int]],
+    futures: "list[Future[_Columns]]",
+) -> Iterator[Token]:
+    """Yield the tokens of each segment in order, lexing between segments."""
+    match_at = matcher(default_fsms(), engine)
+    hidden_mask = code_mask(hidden)
+    start = 0
+    line_num = 1
+    for (a, b), future in zip(bounds, futures):
+        codes, starts, ends, line_nums = future.result()
+        while start < b or b == len(input_string):
+            i = bisect_left(starts, start - a)
+            if i < len(starts) and a + starts[i] == start:
+                break
+            match = match_at(input_string, start)
+            num_chars_read, token = _get_token(input_string, start, match)
+            token.line_num = line_num
+            if not (hidden_mask >> token.code) & 1:
+                yield token
+            if (_LAST_MASK >> token.code) & 1:
+                return
+            line_num = line_num + _get_new_lines(input_string, start, num_chars_read)
+            start = start + num_chars_read
+        else:
+            continue
+
+        line_shift = line_num - line_nums[i]
+        for j in range(i, len(codes)):
+            code = codes[j]
+            if not (hidden_mask >> code) & 1:
+                yield Token(
+                    TOKEN_TYPES[code],
+                    input_string[a + starts[j] : a + ends[j]],
+                    line_nums[j] + line_shift,
+                )
+            if (_LAST_MASK >> code) & 1:
+                return
+        start = a + ends[-1]
+        line_num = line_nums[-1] + line_shift
+        line_num = line_num + input_string.count("\n", a + starts[-1], start)
@@ -0,0 +1,122 @@
+"""Compile a list of FSMs into one master regular expression.
+
+An FSM class may set `pattern`, a regular expression for exactly the values
+it accepts. `compile_pattern(fsms)` joins the patterns into one alternation
+with a named group for each FSM, `f0`, `f1`, and so on, in priority order, so
+that finding the next token is a single `re` match that runs in C.
+
+An `re` alternation takes the first alternative that matches rather than the
+longest. The two agree when no alternative can match a proper prefix of what
+a later one matches at the same position, as for FSMs whose tokens start with
+different characters, or when the patterns are written for it, such as a
+keyword that ends at a word boundary. `project1.differential` checks that the
+"regex" engine finds the same tokens as the FSMs.
+
+An empty match at the end of the input reads the end, as `Eof` does. FSMs
+without a `pattern` are still run as FSMs, see `project1.lexer.matcher`.
+
+Examples:
+    >>> from project1.fsm import Colon, Eof, WhiteSpace
+    >>> from project1.pattern import compile_pattern
+    >>> pattern = compile_pattern([Colon(), Eof(), WhiteSpace()])
+    >>> pattern.match("  \\n: ", 0)
+    (3, 2, 3)
+    >>> pattern.match("  \\n: ", 3)
+    (1, 0, 4)
+    >>> pattern.match("", 0)
+    (1, 1, 0)
+    >>> pattern.match("a", 0)
+    (0, -1, 1)
+"""
+
+import re
+from typing import Sequence
+
+from project1.fsm import Bytes, FiniteStateMachine
+
+
+class MasterPattern:
+    """The master regular expression for the FSMs that have a `pattern`.
+
+    Attributes:
+        regex (re.Pattern[str]): The alternation of the patterns.
+        regex_bytes (re.Pattern[bytes]): The same for ASCII bytes.
+        indexes (list[int]): The index in the FSM list of each group.
+        others (list[int]): The indexes of the FSMs with no `pattern`.
+    """
+
+    __slots__ = ["regex", "regex_bytes", "indexes", "others"]
+
+    def __init__(self, fsms: Sequence[FiniteStateMachine]) -> None:
+        alternatives: list[str] = []
+        self.indexes: list[int] = []
+        self.others: list[int] = []
+        for index, fsm in enumerate(fsms):
+            if fsm.pattern is None:
+                self.others.append(index)
+                continue
+            alternatives.append(f"(?P<f{len(self.indexes)}>{fsm.pattern})")
+            self.indexes.append(index)
+        source = "|".join(alternatives) or "(?!)"
+        self.regex = re.compile(source)
+        self.regex_bytes = re.compile(source.encode("ascii"))
+
+    def match(self, input_string: str, start: int) -> tuple[int, int, int]:
+        """Return the first match at `start` as `project1.dfa.Dfa.match` does.
+
+        The regular expression does not say how far it looked, so `stop` is
+        where the match ends or, with no match, the end of the input; either
+        is at least as far as the FSMs would look. With no match before the
+        end, `project1.lexer.matcher` runs the FSMs instead to learn how far
+        they look, so that `project1.lexer.lexer_stream` does not read the
+        rest of the input to decide an `UNDEFINED` token.
+
+        Args:
+            input_string: the string to use as input
+            start: the offset in `input_string` where the match starts
+
+        Returns:
+            (num_chars_read, index, stop): the characters read by the FSM that
+            matched and its index in the FSM list, or `0` and `-1` if none did,
+            with the offset where the match stopped.
+        """
+        return self._result(
+            self.regex.match(input_string, start), start, len(input_string)
+        )
+
+    def match_bytes(self, data: Bytes, start: int) -> tuple[int, int, int]:
+        """Return the first match at `start` over ASCII bytes (see `match`)."""
+        return self._result(self.regex_bytes.match(data, start), start, len(data))
+
+    def _result(
+        self, m: "re.Match[str] | re.Match[bytes] | None", start: int, end: int
+    ) -> tuple[int, int, int]:
+        if m is None or m.lastgroup is None:
+            return 0, -1, end
+        num_chars_read = m.end() - start
+        if num_chars_read == 0:
+            if start < end:
+                return 0, -1, end
+            num_chars_read = 1
+        return num_chars_read, self.indexes[int(m.lastgroup[1:])], min(m.end(), end)
+
+
+_cache: dict[tuple[type, ...], MasterPattern] = {}
+
+
+def compile_pattern(fsms: Sequence[FiniteStateMachine]) -> MasterPattern:
+    """Compile the patterns of `fsms` into one `MasterPattern`.
+
+    The result is cached for each list of FSM types.
+
+    Args:
+        fsms: the FSMs in priority order
+
+    Returns:
+        pattern: the master pattern
+    """
+    cache_key = tuple(type(fsm) for fsm in fsms)
+    pattern = _cache.get(cache_key)
+    if pattern is None:
+        pattern = _cache[cache_key] = MasterPattern(fsms)
+    return pattern
@@ -1,19 +1,45 @@
 """Function to call lexer and get tokens.
 
 These are the two project level entry points: `project1` and `project1cli`.
-All the pass-off tests use `project1`.
+All the pass-off tests use `project1`. Both write the token stream with
+`write_tokens`, which writes to a file as the tokens are produced.
+`write_batch` writes the token streams for many files lexed in a process pool.
+Each can look up and store tokens in a `project1.cache.LexCache`.
 """
 
+import argparse
+import glob
+import io
+import mmap
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from sys import argv
+from typing import Iterable, TextIO
 
-from project1.lexer import lexer
+from project1.binary import write_binary
+from project1.cache import LexCache
+from project1.lexer import lexer, lexer_bytes, lexer_stream
+from project1.stats import LexStats
+from project1.token import Token, TokenCode
 
 
-def project1(input_string: str) -> str:
+def project1(
+    input_string: str, cache: LexCache | None = None, recover: bool = False
+) -> str:
     """Build the token stream for a given input.
 
+    The stream ends at the first error unless `recover` is set, in which case
+    every token is written and the last line names every line with an error
+    (see `write_tokens`).
+
     Args:
         input_string (str): The string to tokenize.
+        cache (LexCache | None): Where to look up and store the tokens, if anywhere.
+        recover (bool): Go on after an error to report them all.
 
     Returns:
         out: the token stream, as a string, from the input string
@@ -26,26 +52,229 @@ def project1(input_string: str) -> str:
         (COLON,":",3)
         (EOF,"",3)
         Total Tokens = 3
+        >>> print(project1(':!\\n!:', recover=True))
+        (COLON,":",1)
+        (UNDEFINED,"!",1)
+        (UNDEFINED,"!",2)
+        (COLON,":",2)
+        (EOF,"",2)
+        <BLANKLINE>
+        Total Tokens = Errors on lines 1, 2
     """
-    result: str = ""
+    out = io.StringIO()
+    tokens = lexer(input_string, cache=cache, recover=recover)
+    write_tokens(tokens, out, recover=recover)
+    return out.getvalue()
+
+
+def write_tokens(
+    tokens: Iterable[Token],
+    out: TextIO,
+    buffer_size: int = 1024,
+    recover: bool = False,
+) -> int:
+    """Write the token stream for `tokens` to `out` as the tokens are produced.
+
+    What is written is exactly what `project1` returns. The lines are written
+    `buffer_size` tokens at a time, so the output starts before the last token
+    is produced and the memory used does not grow with the number of tokens.
+
+    The stream ends at the first `UNDEFINED` token with the line of the error.
+    With `recover`, every token is written instead, and if any is `UNDEFINED`
+    the last line lists the lines with errors rather than the token count.
+
+    Args:
+        tokens: The tokens to write, usually from `project1.lexer.lexer`.
+        out: The file to write to.
+        buffer_size: The number of token lines to join for each write.
+        recover: Write past the first `UNDEFINED` token.
+
+    Returns:
+        token_count: The number of tokens written.
+
+    Examples:
+        >>> import sys
+        >>> from project1.lexer import lexer
+        >>> from project1.project1 import write_tokens
+        >>> count = write_tokens(lexer("\\n\\n::"), sys.stdout)
+        (COLON,":",3)
+        (COLON,":",3)
+        (EOF,"",3)
+        Total Tokens = 3
+    """
+    lines: list[str] = []
+    error_lines: dict[int, None] = {}
     token_count = 0
-    for i in lexer(input_string):
-        result += str(i) + "\n"
+    for i in tokens:
+        lines.append(str(i) + "\n")
         token_count += 1
-        if i.token_type == "UNDEFINED":
-            return result + "\nTotal Tokens = Error on line " + str(i.line_num)
+        if i.code == TokenCode.UNDEFINED:
+            if not recover:
+                lines.append("\nTotal Tokens = Error on line " + str(i.line_num))
+                out.write("".join(lines))
+                return token_count
+            error_lines[i.line_num] = None
+        if len(lines) >= buffer_size:
+            out.write("".join(lines))
+            lines.clear()
+
+    if len(error_lines) == 1:
+        lines.append("\nTotal Tokens = Error on line " + str(*error_lines))
+    elif error_lines:
+        lines.append(
+            "\nTotal Tokens = Errors on lines " + ", ".join(map(str, error_lines))
+        )
+    else:
+        lines.append("Total Tokens = " + str(token_count))
+    out.write("".join(lines))
+    return token_count
+
+
+class BatchSummary:
+    """The totals for a batch of files written by `write_batch`.
+
+    Attributes:
+        files (int): The number of files lexed.
+        tokens (int): The number of tokens written for all the files.
+        errors (int): The number of files that had an undefined token or could
+            not be read.
+        size (int): The number of bytes read.
+        seconds (float): The wall clock time for the batch.
+    """
+
+    __slots__ = ["files", "tokens", "errors", "size", "seconds"]
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.tokens = 0
+        self.errors = 0
+        self.size = 0
+        self.seconds = 0.0
+
+    def __str__(self) -> str:
+        rate = self.size / self.seconds if self.seconds > 0 else 0.0
+        return (
+            f"Files = {self.files}, Tokens = {self.tokens}, Errors = {self.errors},"
+            f" Bytes = {self.size}, Bytes/sec = {rate:.0f}"
+        )
+
+
+def write_batch(
+    paths: list[str],
+    out: TextIO,
+    workers: int | None = None,
+    cache: LexCache | None = None,
+    recover: bool = False,
+) -> BatchSummary:
+    """Write the token stream for each file in `paths` to `out`.
+
+    The files are lexed at the same time in a process pool, but the token
+    streams are written in the order of `paths`, each after a `==> path <==`
+    header and followed by a blank line. A file that cannot be read or decoded
+    gets an error message in place of its token stream, and the batch goes on.
+
+    Args:
+        paths: The files to tokenize.
+        out: The file to write to.
+        workers: The number of processes, `os.cpu_count()` if `None`.
+        cache: Where to look up and store the tokens, if anywhere.
+        recover: Go on after an error to report them all.
+
+    Returns:
+        summary: The totals for the batch.
+    """
+    summary = BatchSummary()
+    begin = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(
+            partial(_lex_file, cache=cache, recover=recover), paths, chunksize=16
+        )
+        for path, (token_stream, token_count, is_error, size) in zip(paths, results):
+            out.write("==> " + path + " <==\n" + token_stream + "\n\n")
+            summary.files += 1
+            summary.tokens += token_count
+            summary.errors += is_error
+            summary.size += size
+    summary.seconds = time.perf_counter() - begin
+    return summary
 
-    return result + "Total Tokens = " + str(token_count)
+
+def _lex_file(
+    path: str, cache: LexCache | None = None, recover: bool = False
+) -> tuple[str, int, bool, int]:
+    """Return the token stream, token count, error flag, and size of a file.
+
+    A file that cannot be read or decoded has an error message for its token
+    stream and counts as an error.
+    """
+    try:
+        with open(path, "r") as f:
+            input_string = f.read()
+    except (OSError, UnicodeDecodeError) as error:
+        return "Error reading file: " + str(error), 0, True, 0
+    out = io.StringIO()
+    tokens = lexer(input_string, cache=cache, recover=recover)
+    token_count = write_tokens(tokens, out, recover=recover)
+    token_stream = out.getvalue()
+    is_error = token_stream.startswith(
+        "Total Tokens = Error", token_stream.rfind("\n") + 1
+    )
+    return token_stream, token_count, is_error, os.path.getsize(path)
+
+
+def _expand(patterns: list[str]) -> list[str]:
+    """Return the files named by `patterns`, in order and without repeats.
+
+    A directory names every `.txt` file under it, and anything that is not a
+    file or directory is a glob pattern; both are sorted. A path that does not
+    exist and has no glob characters is kept, so that it is reported as a file
+    that cannot be read.
+    """
+    paths: list[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(
+                sorted(glob.glob(os.path.join(pattern, "**", "*.txt"), recursive=True))
+            )
+        elif os.path.exists(pattern) or glob.escape(pattern) == pattern:
+            paths.append(pattern)
+        else:
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+    return list(dict.fromkeys(paths))
 
 
 def project1cli() -> None:
     """Build the token stream from the contents of a file.
 
     `project1cli` is only called from the command line in the integrated terminal.
-    Prints the token stream resulting from the contents of the named file.
+    Prints the token stream resulting from the contents of the named file. The
+    file is read in chunks and the token stream is printed as it is produced.
+
+    With `--mmap`, the file is memory mapped and lexed directly over its bytes
+    with `project1.lexer.lexer_bytes` rather than read into a string first. The
+    pages are shared through the OS page cache by every process that maps the
+    same file. A file that is empty or not ASCII is read as usual.
+
+    Given more than one file, a directory, or a glob pattern, the files are
+    lexed in a process pool with `write_batch` and a summary of the batch is
+    printed to standard error.
+
+    With `--stats`, a table of what each FSM did, see `project1.stats`, is
+    printed to standard error after the token stream.
+
+    With `--cache`, the tokens for each file are looked up and stored in a
+    `project1.cache.LexCache`, in the directory given or the default one, so
+    a file lexed before is not lexed again. The file is read whole to find
+    its tokens in the cache.
+
+    With `--all-errors`, lexing goes on after an error, and the last line of
+    each token stream lists every line with an error.
+
+    With `--format binary`, the tokens of a single file are written to
+    standard output in the format of `project1.binary` rather than as text.
 
     Args:
-        argv (list[str]): Generated from the command line and needs to name the input file.
+        argv (list[str]): Generated from the command line and needs to name the input files.
 
     Examples:
     ```
@@ -55,13 +284,110 @@ def project1cli() -> None:
     (COLON,":",2)
     (EOF,"",5)
     Total Tokens = 4
+    $ project1 --mmap t.txt
+    (COLON,":",2)
+    (COLON,":",2)
+    (COLON,":",2)
+    (EOF,"",5)
+    Total Tokens = 4
+    $ project1 t.txt inputs/
+    ==> t.txt <==
+    ...
+    Files = 41, Tokens = 5306, Errors = 3, Bytes = 38110, Bytes/sec = 912345
     ```
     """
-    if len(argv) == 2:
-        input_file = argv[1]
+    parser = argparse.ArgumentParser(prog="project1")
+    parser.add_argument(
+        "input_files", nargs="+", help="the files, directories, or globs to tokenize"
+    )
+    parser.add_argument(
+        "--mmap", action="store_true", help="memory map the file rather than read it"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="the number of processes for a batch"
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="print what each FSM did to stderr"
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DIR",
+        help="look up and store the tokens in a cache, in DIR if given",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "binary"],
+        default="text",
+        help="write the tokens as text or in the binary format",
+    )
+    parser.add_argument(
+        "--all-errors",
+        action="store_true",
+        help="go on after an error and report every line with one",
+    )
+    args = parser.parse_args(argv[1:])
+    recover = args.all_errors
+    cache = None if args.cache is None else LexCache(args.cache or None)
+
+    [input_file, *rest] = args.input_files
+    if args.stats:
+        if rest or not os.path.isfile(input_file):
+            parser.error("--stats takes a single input file")
+        stats = LexStats()
         with open(input_file, "r") as f:
-            input_string = f.read()
-            result = project1(input_string)
-            print(result)
+            tokens = lexer_stream(f, stats=stats, recover=recover)
+            _write_out(tokens, args.format, recover)
+        print(stats, file=sys.stderr)
+        return
+
+    if rest or not os.path.isfile(input_file):
+        if args.format != "text":
+            parser.error("--format binary takes a single input file")
+        paths = _expand(args.input_files)
+        if not paths:
+            parser.error("no input files found")
+        summary = write_batch(paths, sys.stdout, args.jobs, cache, recover)
+        print(summary, file=sys.stderr)
+        return
+
+    if cache is not None:
+        with open(input_file, "r") as f:
+            tokens = lexer(f.read(), cache=cache, recover=recover)
+            _write_out(tokens, args.format, recover)
+        return
+
+    if args.mmap:
+        with open(input_file, "rb") as f:
+            if _is_mappable(f.fileno()):
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if _NOT_ASCII.search(data) is None:
+                        tokens = lexer_bytes(data, recover=recover)
+                        _write_out(tokens, args.format, recover)
+                        return
+
+    with open(input_file, "r") as f:
+        _write_out(lexer_stream(f, recover=recover), args.format, recover)
+
+
+def _write_out(
+    tokens: Iterable[Token], output_format: str, recover: bool = False
+) -> None:
+    """Write `tokens` to standard output as text or in the binary format."""
+    if output_format == "binary":
+        sys.stdout.flush()
+        write_binary(tokens, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
     else:
-        print("usage: project1 <input file>")
+        write_tokens(tokens, sys.stdout, recover=recover)
+        print()
+
+
+_NOT_ASCII = re.compile(b"[^\\x00-\\x7f]")
+
+
+def _is_mappable(fileno: int) -> bool:
+    """Return true iff the file is not empty -- an empty file cannot be mapped."""
+    return os.fstat(fileno).st_size > 0
@@ -0,0 +1,276 @@
+"""A long running lexer service that speaks JSON lines.
+
+`python -m project1.server --socket PATH` listens on a Unix socket, and
+`python -m project1.server` with no socket reads standard input and writes
+standard output. Every line in is a request and every line out is a response,
+each a JSON object:
+
+    {"id": 1, "input": ":\\n:", "engine": "fsm"}    lex `input`, `engine` optional
+    {"id": 1, "cancel": true}                       cancel request 1
+
+The tokens for a request come back in order, `batch_size` at a time, as
+`[token_type, value, line_num]` triples, followed by a last response:
+
+    {"id": 1, "tokens": [["COLON", ":", 1], ["COLON", ":", 2]]}
+    {"id": 1, "tokens": [["EOF", "", 2]]}
+    {"id": 1, "done": true, "count": 3}
+
+The last response for a request is instead `{"id": 1, "cancelled": true}` if
+it was cancelled or `{"id": 1, "error": "..."}` if it could not be done, such
+as when its `id` is a list or an object or the lexing failed.
+
+Requests are lexed in a process pool that is started, and has its FSM tables
+built, before the first request. Many clients are served at once and the
+responses for the requests of a client may interleave. A client has at most
+`max_pending` requests being lexed; the others wait for one to finish, and a
+cancel reaches a waiting request at once.
+
+A worker sends the tokens back a batch at a time through a queue that holds
+only a few batches, so the first batch is sent as soon as it is lexed, and a
+worker stops lexing for a client that does not read its responses until the
+client catches up. A cancelled request stops lexing after the batch it is on.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import queue
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import SyncManager
+from threading import Event
+from typing import Any, get_args
+
+from project1.lexer import Engine, default_fsms, lexer, matcher
+
+_LINE_LIMIT = 1 << 26
+"""The longest request line, in bytes."""
+
+_QUEUE_BATCHES = 4
+"""The most batches of tokens a worker lexes ahead of the client."""
+
+_POLL_SECONDS = 0.1
+"""How long to wait on the queue of a request before checking on it."""
+
+
+class LexServer:
+    """Lex the requests of any number of clients in a shared process pool.
+
+    Attributes:
+        pool (ProcessPoolExecutor): The processes that run the lexer.
+        batch_size (int): The number of tokens in each response.
+        max_pending (int): The number of requests a client may have in flight.
+    """
+
+    __slots__ = ["pool", "batch_size", "max_pending", "_manager"]
+
+    def __init__(
+        self, workers: int | None = None, batch_size: int = 1024, max_pending: int = 16
+    ) -> None:
+        """Start the process pool and build the FSM tables in each process.
+
+        Args:
+            workers: The number of processes, `os.cpu_count()` if `None`.
+            batch_size: The number of tokens in each response.
+            max_pending: The number of requests a client may have in flight.
+        """
+        workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(workers)
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._manager: SyncManager = multiprocessing.Manager()
+        for _ in range(workers):
+            self.pool.submit(_warm)
+
+    def close(self) -> None:
+        """Stop the process pool."""
+        self.pool.shutdown(cancel_futures=True)
+        self._manager.shutdown()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the requests from `reader` until it ends, then close `writer`."""
+        tasks: dict[Any, asyncio.Task[None]] = {}
+        pending = asyncio.Semaphore(self.max_pending)
+
+        def finish(request_id: Any, task: asyncio.Task[None]) -> None:
+            if tasks.get(request_id) is task:
+                del tasks[request_id]
+            if task.cancelled():
+                _write(writer, {"id": request_id, "cancelled": True})
+            elif (error := task.exception()) is not None:
+                message = str(error) or type(error).__name__
+                _write(writer, {"id": request_id, "error": message})
+
+        try:
+            async for line in reader:
+                try:
+                    request = json.loads(line)
+                    request_id = request.get("id")
+                except (ValueError, AttributeError):
+                    _write(writer, {"id": None, "error": "not a JSON object"})
+                    continue
+                try:
+                    hash(request_id)
+                except TypeError:
+                    error = "the id is not a string or a number"
+                    _write(writer, {"id": request_id, "error": error})
+                    continue
+                if request.get("cancel"):
+                    if request_id in tasks:
+                        tasks[request_id].cancel()
+                    continue
+                task = asyncio.create_task(
+                    self._lex(request_id, request, writer, pending)
+                )
+                tasks[request_id] = task
+                task.add_done_callback(functools.partial(finish, request_id))
+        except ValueError:
+            _write(writer, {"id": None, "error": "the request is too long"})
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        writer.close()
+
+    async def _lex(
+        self,
+        request_id: Any,
+        request: dict[str, Any],
+        writer: asyncio.StreamWriter,
+        pending: asyncio.Semaphore,
+    ) -> None:
+        """Lex one request in the pool and write its responses as they come."""
+        input_string = request.get("input")
+        engine = request.get("engine", "fsm")
+        if not isinstance(input_string, str) or engine not in get_args(Engine):
+            _write(writer, {"id": request_id, "error": "bad input or engine"})
+            return
+        async with pending:
+            batches = self._manager.Queue(_QUEUE_BATCHES)
+            cancel = self._manager.Event()
+            try:
+                future = self.pool.submit(
+                    _lex_batches, input_string, engine, self.batch_size, batches, cancel
+                )
+                count = 0
+                while True:
+                    try:
+                        batch = await asyncio.to_thread(
+                            batches.get, True, _POLL_SECONDS
+                        )
+                    except queue.Empty:
+                        if future.done():
+                            # Raise the error of the worker, if any; if none,
+                            # the end of the tokens is already in the queue.
+                            future.result()
+                        continue
+                    if batch is None:
+                        break
+                    count += len(batch)
+                    _write(writer, {"id": request_id, "tokens": batch})
+                    await writer.drain()
+            finally:
+                cancel.set()
+        _write(writer, {"id": request_id, "done": True, "count": count})
+        await writer.drain()
+
+
+def _warm() -> None:
+    """Build the tables for every engine so the first request does not."""
+    for engine in get_args(Engine):
+        matcher(default_fsms(), engine)
+
+
+def _lex_batches(
+    input_string: str,
+    engine: Engine,
+    batch_size: int,
+    batches: "queue.Queue[list[tuple[str, str, int]] | None]",
+    cancel: Event,
+) -> None:
+    """Put the tokens for `input_string` on `batches` as triples, then `None`.
+
+    Lexing stops without the `None` once `cancel` is set.
+    """
+    batch: list[tuple[str, str, int]] = []
+    for i in lexer(input_string, engine):
+        batch.append((i.token_type, i.value, i.line_num))
+        if len(batch) >= batch_size:
+            if not _put(batches, batch, cancel):
+                return
+            batch = []
+    if batch and not _put(batches, batch, cancel):
+        return
+    _put(batches, None, cancel)
+
+
+def _put(
+    batches: "queue.Queue[list[tuple[str, str, int]] | None]",
+    item: list[tuple[str, str, int]] | None,
+    cancel: Event,
+) -> bool:
+    """Put `item` on `batches` once there is room; false if cancelled first."""
+    while not cancel.is_set():
+        try:
+            batches.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _write(writer: asyncio.StreamWriter, response: dict[str, Any]) -> None:
+    """Write one response line unless the client is gone."""
+    if not writer.is_closing():
+        writer.write(json.dumps(response).encode() + b"\n")
+
+
+async def serve_unix(server: LexServer, path: str) -> None:
+    """Serve clients that connect to the Unix socket at `path`, forever."""
+    unix_server = await asyncio.start_unix_server(
+        server.handle, path, limit=_LINE_LIMIT
+    )
+    async with unix_server:
+        await unix_server.serve_forever()
+
+
+async def serve_stdio(server: LexServer) -> None:
+    """Serve standard input and output as a single client."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=_LINE_LIMIT)
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+    transport, protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, sys.stdout
+    )
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    await server.handle(reader, writer)
+
+
+def main() -> None:
+    """Run the service from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m project1.server")
+    parser.add_argument("--socket", help="the Unix socket, else standard input")
+    parser.add_argument("--workers", type=int, help="the number of processes")
+    parser.add_argument(
+        "--batch-size", type=int, default=1024, help="the tokens in each response"
+    )
+    args = parser.parse_args()
+
+    server = LexServer(args.workers, args.batch_size)
+    try:
+        if args.socket:
+            asyncio.run(serve_unix(server, args.socket))
+        else:
+            asyncio.run(serve_stdio(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
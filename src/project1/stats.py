@@ -0,0 +1,131 @@
+"""Count what each FSM does while lexing.
+
+A `LexStats` keeps an `FsmStats` for each `FiniteStateMachine` subclass: how
+many times it ran, how many characters it examined, how often it accepted or
+rejected, how often it won the longest match, and the time it took. The
+counting is opt-in. `LexStats.run_fsm` is `run_fsm` with counting, and the
+lexer only counts when given a `LexStats` (see `project1.lexer.stats_matcher`);
+otherwise it runs exactly the code it runs without this module.
+
+An FSM accepts when it reads at least one character and rejects otherwise.
+The characters examined include the end of the input when the FSM looked at
+it. A table FSM is counted under the class of the FSM it was made from.
+
+Examples:
+    >>> from project1.fsm import Colon
+    >>> from project1.stats import LexStats
+    >>> stats = LexStats()
+    >>> stats.run_fsm(Colon(), "::", 1)[0]
+    1
+    >>> stats.run_fsm(Colon(), "a")[0]
+    0
+    >>> colon = stats.fsms["Colon"]
+    >>> colon.invocations, colon.chars_examined, colon.accepts, colon.rejects
+    (2, 2, 1, 1)
+"""
+
+import time
+
+from project1.fsm import FiniteStateMachine, TableFiniteStateMachine, scan_fsm
+from project1.token import Token
+
+
+class FsmStats:
+    """The counts for one `FiniteStateMachine` subclass.
+
+    Attributes:
+        invocations (int): The number of times an FSM ran.
+        chars_examined (int): The characters examined over all of the runs.
+        accepts (int): The runs that read at least one character.
+        rejects (int): The runs that read nothing.
+        wins (int): The times the FSM won the longest match in the lexer.
+        seconds (float): The time spent running the FSM.
+    """
+
+    __slots__ = [
+        "invocations",
+        "chars_examined",
+        "accepts",
+        "rejects",
+        "wins",
+        "seconds",
+    ]
+
+    def __init__(self) -> None:
+        self.invocations = 0
+        self.chars_examined = 0
+        self.accepts = 0
+        self.rejects = 0
+        self.wins = 0
+        self.seconds = 0.0
+
+
+class LexStats:
+    """The counts for every FSM, by the name of its class.
+
+    Attributes:
+        fsms (dict[str, FsmStats]): The counts for each class, in the order
+            the classes were first seen.
+    """
+
+    __slots__ = ["fsms"]
+
+    def __init__(self) -> None:
+        self.fsms: dict[str, FsmStats] = {}
+
+    def for_fsm(self, fsm: FiniteStateMachine) -> FsmStats:
+        """Return the counts for the class of `fsm`."""
+        if isinstance(fsm, TableFiniteStateMachine):
+            fsm = fsm.source
+        name = type(fsm).__name__
+        fsm_stats = self.fsms.get(name)
+        if fsm_stats is None:
+            fsm_stats = self.fsms[name] = FsmStats()
+        return fsm_stats
+
+    def scan_fsm(
+        self, fsm: FiniteStateMachine, input_string: str, start: int = 0
+    ) -> tuple[int, int]:
+        """Return `project1.fsm.scan_fsm` for `fsm` and count the run."""
+        fsm_stats = self.for_fsm(fsm)
+        begin = time.perf_counter()
+        num_chars_read, stop = scan_fsm(fsm, input_string, start)
+        fsm_stats.seconds += time.perf_counter() - begin
+        fsm_stats.invocations += 1
+        fsm_stats.chars_examined += stop - start + 1
+        if num_chars_read > 0:
+            fsm_stats.accepts += 1
+        else:
+            fsm_stats.rejects += 1
+        return num_chars_read, stop
+
+    def run_fsm(
+        self, fsm: FiniteStateMachine, input_string: str, start: int = 0
+    ) -> tuple[int, Token]:
+        """Return `project1.fsm.run_fsm` for `fsm` and count the run."""
+        num_chars_read, _ = self.scan_fsm(fsm, input_string, start)
+        return num_chars_read, fsm.token(input_string[start : start + num_chars_read])
+
+    def __str__(self) -> str:
+        """A table with a row for each FSM class."""
+        rows = [("FSM", "calls", "chars", "accepts", "rejects", "wins", "seconds")]
+        for name, s in self.fsms.items():
+            rows.append(
+                (
+                    name,
+                    str(s.invocations),
+                    str(s.chars_examined),
+                    str(s.accepts),
+                    str(s.rejects),
+                    str(s.wins),
+                    f"{s.seconds:.6f}",
+                )
+            )
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return "\n".join(
+            row[0].ljust(widths[0])
+            + "".join(
+                "  " + cell.rjust(width) for cell, width in zip(row[1:], widths[1:])
+            )
+            for row in rows
+        )
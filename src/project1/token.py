@@ -4,7 +4,8 @@ The Datalog parser takes a stream of _tokens_ as input. A `Token` type
 maps a string to its syntactic type in the grammar. For example, the string
 'Facts' maps to the syntactic type 'FACTS'. The grammar itself defines the
 allowed orders of the syntactic types that constitute valid Datalog syntax.
-This module defines the syntactic types for Datalog.
+This module defines the syntactic types for Datalog, and `FrozenToken`, an
+immutable and hashable token for streams that are kept, see `freeze`.
 
 Examples:
     >>> from project1.token import Token
@@ -16,9 +17,15 @@ Examples:
     >>> id.line_num = 42
     >>> print(id)
     (ID,"id",42)
+    >>> id.code
+    <TokenCode.ID: 7>
+    >>> id.code.token_type
+    'ID'
 """
 
-from typing import Literal, Any
+import sys
+from enum import IntEnum
+from typing import Any, Iterable, Iterator, Literal, get_args
 
 TokenType = Literal[
     "COLON",
@@ -51,6 +58,68 @@ For more on algebraic types in Python see
 https://threeofwands.com/algebraic-data-types-in-python/
 """
 
+TOKEN_TYPES: tuple[TokenType, ...] = get_args(TokenType)
+"""The names in `TokenType` in the order of their `TokenCode`."""
+
+
+class TokenCode(IntEnum):
+    """A small integer code for each name in `TokenType`.
+
+    The member names are the names in `TokenType` and the values are their
+    positions in `TOKEN_TYPES`. Comparing codes, or testing them against a
+    bitmask, is cheaper than comparing names, and codes pack into arrays.
+    """
+
+    COLON = 0
+    COLON_DASH = 1
+    COMMA = 2
+    COMMENT = 3
+    UNDEFINED = 4
+    EOF = 5
+    FACTS = 6
+    ID = 7
+    LEFT_PAREN = 8
+    PERIOD = 9
+    QUERIES = 10
+    Q_MARK = 11
+    RIGHT_PAREN = 12
+    RULES = 13
+    SCHEMES = 14
+    STRING = 15
+    WHITESPACE = 16
+
+    @property
+    def token_type(self) -> TokenType:
+        """The name in `TokenType` for this code."""
+        return TOKEN_TYPES[self]
+
+    @staticmethod
+    def of(token_type: TokenType) -> "TokenCode":
+        """Return the code for a name in `TokenType`."""
+        return _CODES[token_type]
+
+
+_CODES: dict[TokenType, TokenCode] = {
+    t: TokenCode(i) for i, t in enumerate(TOKEN_TYPES)
+}
+
+
+def code_mask(token_types: list[TokenType]) -> int:
+    """Return a bitmask with the bit for the code of each of `token_types` set.
+
+    `(mask >> code) & 1` is then a membership test for a code.
+
+    Examples:
+        >>> from project1.token import TokenCode, code_mask
+        >>> mask = code_mask(["EOF", "UNDEFINED"])
+        >>> (mask >> TokenCode.EOF) & 1, (mask >> TokenCode.COLON) & 1
+        (1, 0)
+    """
+    mask = 0
+    for token_type in token_types:
+        mask |= 1 << _CODES[token_type]
+    return mask
+
 
 class Token:
     """Token class for Datalog.
@@ -64,9 +133,15 @@ class Token:
         token_type (TokenType): The syntactic type of this token.
         value (str): The string associated with the token.
         line_num (int): The line number associated with the token -- where it starts in the input.
+        column (int | None): The column number where the token starts, if known.
+        end (tuple[int, int] | None): The line and column numbers just past the
+            end of the value, if known.
+
+    The column and end are only set when asked for (see `project1.lexer.lexer`)
+    and are not part of the string representation or of equality.
     """
 
-    __slots__ = ["token_type", "value", "line_num"]
+    __slots__ = ["token_type", "value", "line_num", "column", "end"]
 
     def __init__(self, token_type: TokenType, value: str, line_num: int = 0) -> None:
         """Initialize a `Token` with its type, value, and line number.
@@ -82,6 +157,8 @@ class Token:
         self.token_type: TokenType = token_type
         self.value: str = value
         self.line_num: int = line_num
+        self.column: int | None = None
+        self.end: tuple[int, int] | None = None
 
     def __str__(self) -> str:
         """Return the string representation of the token
@@ -92,8 +169,13 @@ class Token:
             "(" + self.token_type + ',"' + self.value + '",' + str(self.line_num) + ")"
         )
 
+    @property
+    def code(self) -> TokenCode:
+        """The `TokenCode` for the type of this token."""
+        return _CODES[self.token_type]
+
     def __eq__(self, other: Any) -> bool:
-        if isinstance(other, Token):
+        if isinstance(other, (Token, FrozenToken)):
             return (
                 self.token_type == other.token_type
                 and self.value == other.value
@@ -191,3 +273,150 @@ class Token:
         for i in value:
             assert i == " " or i == "\t" or i == "\n" or i == "\r"
         return Token("WHITESPACE", value)
+
+
+FIXED_VALUES: dict[TokenType, str] = {
+    "COLON": ":",
+    "COLON_DASH": ":-",
+    "COMMA": ",",
+    "EOF": "",
+    "FACTS": "Facts",
+    "LEFT_PAREN": "(",
+    "PERIOD": ".",
+    "QUERIES": "Queries",
+    "Q_MARK": "?",
+    "RIGHT_PAREN": ")",
+    "RULES": "Rules",
+    "SCHEMES": "Schemes",
+}
+"""The one value of each token type that has only one."""
+
+_INTERNED: frozenset[TokenType] = frozenset(["ID", "STRING"])
+
+
+class FrozenToken:
+    """An immutable, hashable token.
+
+    A `FrozenToken` has the type, value, and line number of a `Token` and
+    compares equal to a `Token` with the same ones, but it cannot be changed,
+    so it can be a `dict` key or in a `set`. Use `replace` for a token that
+    differs in some of them, and `freeze` to build them from a token stream.
+
+    Attributes:
+        token_type (TokenType): The syntactic type of this token.
+        value (str): The string associated with the token.
+        line_num (int): The line number where the token starts in the input.
+
+    Examples:
+        >>> from project1.token import FrozenToken
+        >>> colon = FrozenToken("COLON", ":", 10)
+        >>> print(colon)
+        (COLON,":",10)
+        >>> len({colon, colon.replace(line_num=11), FrozenToken("COLON", ":", 10)})
+        2
+        >>> colon.line_num = 12
+        Traceback (most recent call last):
+        ...
+        AttributeError: FrozenToken is immutable
+    """
+
+    __slots__ = ["token_type", "value", "line_num"]
+
+    token_type: TokenType
+    value: str
+    line_num: int
+
+    def __init__(self, token_type: TokenType, value: str, line_num: int = 0) -> None:
+        """Initialize a `FrozenToken` with its type, value, and line number.
+
+        Args:
+            token_type: The type of this token.
+            value: The value to use for this token.
+            line_num: The line number from the input where the token value begins.
+        """
+        object.__setattr__(self, "token_type", token_type)
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "line_num", line_num)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("FrozenToken is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("FrozenToken is immutable")
+
+    def __str__(self) -> str:
+        """Return the string representation of the token, as for `Token`."""
+        return (
+            "(" + self.token_type + ',"' + self.value + '",' + str(self.line_num) + ")"
+        )
+
+    def __repr__(self) -> str:
+        return f"FrozenToken({self.token_type!r}, {self.value!r}, {self.line_num})"
+
+    @property
+    def code(self) -> TokenCode:
+        """The `TokenCode` for the type of this token."""
+        return _CODES[self.token_type]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (FrozenToken, Token)):
+            return (
+                self.token_type == other.token_type
+                and self.value == other.value
+                and self.line_num == other.line_num
+            )
+        return False
+
+    def __hash__(self) -> int:
+        return hash((self.token_type, self.value, self.line_num))
+
+    def replace(
+        self,
+        token_type: TokenType | None = None,
+        value: str | None = None,
+        line_num: int | None = None,
+    ) -> "FrozenToken":
+        """Return a token like this one but with the given fields changed."""
+        return FrozenToken(
+            self.token_type if token_type is None else token_type,
+            self.value if value is None else value,
+            self.line_num if line_num is None else line_num,
+        )
+
+    def thaw(self) -> Token:
+        """Return a mutable `Token` with the same type, value, and line number."""
+        return Token(self.token_type, self.value, self.line_num)
+
+
+def freeze(tokens: Iterable[Token]) -> Iterator[FrozenToken]:
+    """Yield a `FrozenToken` for each token, sharing values where it can.
+
+    Every token of a type with only one value, see `FIXED_VALUES`, shares that
+    one value string, and the values of `ID` and `STRING` tokens are interned
+    with `sys.intern`, so each distinct identifier is stored once however many
+    times it appears. Only the line number and the token object itself are
+    stored for each token.
+
+    Args:
+        tokens: The tokens to freeze, usually from `project1.lexer.lexer`.
+
+    Yields:
+        token: The frozen token for each token in order.
+
+    Examples:
+        >>> from project1.token import Token, freeze
+        >>> a, b = freeze([Token.id("".join("ab")), Token.id("".join("ab"))])
+        >>> a.value is b.value
+        True
+    """
+    fixed_values = FIXED_VALUES
+    interned = _INTERNED
+    intern = sys.intern
+    for token in tokens:
+        token_type = token.token_type
+        value = token.value
+        if token_type in interned:
+            value = intern(value)
+        elif fixed_values.get(token_type) == value:
+            value = fixed_values[token_type]
+        yield FrozenToken(token_type, value, token.line_num)
@@ -0,0 +1,105 @@
+"""Columnar storage for a token stream.
+
+A `Token` object for every token is a lot of memory for inputs with millions
+of tokens. A `TokenBuffer` stores the same stream as columns: a small integer
+code for the token type, the start and end offsets of the value in the source,
+and the line number, each in a compact `array`. A `Token` is only built when
+one is asked for by indexing or iterating.
+
+Examples:
+    >>> from project1.token import TokenCode
+    >>> from project1.token_buffer import TokenBuffer
+    >>> buffer = TokenBuffer(": :")
+    >>> buffer.append(TokenCode.COLON, 0, 1, 1)
+    >>> buffer.append(TokenCode.COLON, 2, 3, 1)
+    >>> buffer.append(TokenCode.EOF, 3, 3, 1)
+    >>> len(buffer)
+    3
+    >>> print(buffer[1])
+    (COLON,":",1)
+    >>> for i in buffer[1:]:
+    ...     print(i)
+    ...
+    (COLON,":",1)
+    (EOF,"",1)
+"""
+
+from array import array
+from typing import Iterator, overload
+
+from project1.token import TOKEN_TYPES, Token, TokenCode
+
+
+class TokenBuffer:
+    """A token stream stored as columns of integers over its source.
+
+    Attributes:
+        source (str): The input the token values are read from.
+        types (array[int]): The `TokenCode` of each token.
+        starts (array[int]): The offset in `source` where each value starts.
+        ends (array[int]): The offset in `source` where each value ends.
+        line_nums (array[int]): The line number of each token.
+    """
+
+    __slots__ = ["source", "types", "starts", "ends", "line_nums"]
+
+    def __init__(self, source: str) -> None:
+        """Initialize an empty buffer over `source`.
+
+        Args:
+            source: The input the token values are read from.
+        """
+        self.source = source
+        self.types = array("B")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.line_nums = array("q")
+
+    def append(self, code: TokenCode, start: int, end: int, line_num: int) -> None:
+        """Add a token to the end of the buffer.
+
+        Args:
+            code: The code for the type of the token.
+            start: The offset in `source` where the value starts.
+            end: The offset in `source` where the value ends.
+            line_num: The line number of the token.
+        """
+        self.types.append(code)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.line_nums.append(line_num)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TokenBuffer": ...
+
+    def __getitem__(self, index: int | slice) -> "Token | TokenBuffer":
+        """Build the token at `index`, or return a buffer for a slice.
+
+        A slice shares `source` and copies only the columns.
+        """
+        if isinstance(index, slice):
+            result = TokenBuffer(self.source)
+            result.types = self.types[index]
+            result.starts = self.starts[index]
+            result.ends = self.ends[index]
+            result.line_nums = self.line_nums[index]
+            return result
+        return Token(
+            TOKEN_TYPES[self.types[index]],
+            self.source[self.starts[index] : self.ends[index]],
+            self.line_nums[index],
+        )
+
+    def __iter__(self) -> Iterator[Token]:
+        """Build each token in order."""
+        source = self.source
+        for code, start, end, line_num in zip(
+            self.types, self.starts, self.ends, self.line_nums
+        ):
+            yield Token(TOKEN_TYPES[code], source[start:end], line_num)
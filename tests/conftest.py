@@ -0,0 +1,11 @@
+# type: ignore
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv(
+            "PROJECT1_CACHE_DIR", str(tmp_path_factory.mktemp("project1-cache"))
+        )
+        yield
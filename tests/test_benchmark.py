@@ -0,0 +1,69 @@
+# type: ignore
+from project1.benchmark import (
+    _token_starts,
+    compare,
+    parse_size,
+    run_benchmarks,
+    synthetic_input,
+)
+from project1.lexer import lexer
+
+
+def test_given_sizes_when_run_benchmarks_then_every_case_measured():
+    # given
+    sizes = [parse_size("1K"), 100]
+
+    # when
+    results = run_benchmarks(sizes, repeat=1)
+
+    # then
+    for input_name in ["passoff", "1K", "100"]:
+        for target in ["run_fsm/Colon", "run_fsm/Eof", "run_fsm/WhiteSpace"]:
+            assert target + "/" + input_name in results
+        assert results["lexer/" + input_name]["tokens_per_sec"] > 0
+        assert results["project1/" + input_name]["peak_bytes"] > 0
+    assert results["lexer/1K"]["bytes"] == 1024
+
+
+def test_given_input_when_token_starts_then_starts_and_lexer_count():
+    # given
+    input_string = synthetic_input(5000) + " $"
+
+    # when
+    starts, count = _token_starts(input_string)
+
+    # then
+    assert "q" == starts.typecode
+    assert sorted(set(starts)) == list(starts)
+    assert len(input_string) - 1 == starts[-1]
+    assert sum(1 for _ in lexer(input_string)) == count
+    assert len(starts) > count
+
+
+def test_given_size_when_synthetic_input_then_same_input_each_time():
+    # when
+    input_string = synthetic_input(5000)
+
+    # then
+    assert len(input_string) == 5000
+    assert synthetic_input(5000) == input_string
+
+
+def test_given_regressions_when_compare_then_only_beyond_threshold():
+    # given
+    baseline = {
+        "a": {"tokens_per_sec": 100.0, "peak_bytes": 100},
+        "b": {"tokens_per_sec": 100.0, "peak_bytes": 100},
+        "c": {"tokens_per_sec": 100.0, "peak_bytes": 100},
+    }
+    current = {
+        "a": {"tokens_per_sec": 95.0, "peak_bytes": 105},
+        "b": {"tokens_per_sec": 100.0, "peak_bytes": 150},
+        "d": {"tokens_per_sec": 1.0, "peak_bytes": 1},
+    }
+
+    # when
+    regressions = compare(baseline, current, 0.1)
+
+    # then
+    assert ["b: peak_bytes 100 -> 150 (+50.0%)"] == regressions
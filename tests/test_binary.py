@@ -0,0 +1,63 @@
+# type: ignore
+import io
+import random
+
+import pytest
+
+from project1.binary import TokenReader, write_binary
+from project1.lexer import lexer
+from project1.project1 import project1, write_tokens
+
+
+def _random_inputs(count, alphabet=" \t\r\n:é!"):
+    rng = random.Random(236)
+    return ["".join(rng.choices(alphabet, k=rng.randint(0, 30))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("input", _random_inputs(50))
+def test_given_tokens_when_write_binary_then_reader_yields_same_tokens(input):
+    # given
+    out = io.BytesIO()
+
+    # when
+    count = write_binary(lexer(input), out, buffer_size=2)
+
+    # then
+    tokens = list(TokenReader(out.getvalue()).tokens())
+    assert count == len(tokens)
+    assert write_tokens(lexer(input), io.StringIO()) == count
+    text = io.StringIO()
+    write_tokens(tokens, text)
+    assert project1(input) == text.getvalue()
+
+
+def test_given_buffer_when_iterate_then_values_are_views_into_buffer():
+    # given
+    out = io.BytesIO()
+    write_binary(lexer(": :"), out)
+    data = bytearray(out.getvalue())
+
+    # when
+    (code, value, line_num), *_ = TokenReader(data)
+
+    # then
+    assert value.obj is data
+    assert b":" == value.tobytes()
+    assert (0, 1) == (code, line_num)
+
+
+def test_given_truncated_stream_when_iterate_then_error():
+    # given
+    out = io.BytesIO()
+    write_binary(lexer(": :"), out)
+    reader = TokenReader(out.getvalue()[:-3])
+
+    # when/then
+    with pytest.raises(ValueError):
+        list(reader)
+
+
+def test_given_text_when_reader_then_error():
+    # when/then
+    with pytest.raises(ValueError):
+        TokenReader(b'(COLON,":",1)')
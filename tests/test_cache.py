@@ -0,0 +1,125 @@
+# type: ignore
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from project1 import lexer as lexer_module
+from project1.cache import LexCache, lexer_version
+from project1.lexer import cache_version, default_fsms, lexer
+from project1.project1 import project1
+
+
+def _fail(*args):
+    raise AssertionError("lexed on a cache hit")
+
+
+@pytest.mark.parametrize("input", ["", ":\n  :\n", " \n:é!", "\n\t:" * 1000])
+def test_given_stored_input_when_lexer_then_same_tokens_without_lexing(
+    tmp_path, monkeypatch, input
+):
+    # given
+    cache = LexCache(str(tmp_path))
+    expected = list(lexer(input, cache=cache))
+    monkeypatch.setattr(lexer_module, "matcher", _fail)
+
+    # when
+    result = list(lexer(input, cache=cache))
+
+    # then
+    assert expected == result
+    assert [str(token) for token in expected] == [str(token) for token in result]
+
+
+def test_given_other_version_when_load_then_miss(tmp_path):
+    # given
+    cache = LexCache(str(tmp_path))
+    list(lexer("::", cache=cache))
+
+    # when
+    result = cache.load("::", cache_version() + "x")
+
+    # then
+    assert result is None
+
+
+def test_given_corrupt_file_when_load_then_miss(tmp_path):
+    # given
+    cache = LexCache(str(tmp_path))
+    list(lexer("::", cache=cache))
+    with open(cache.path("::", cache_version()), "r+b") as f:
+        f.truncate(10)
+
+    # when
+    result = cache.load("::", cache_version())
+
+    # then
+    assert result is None
+    assert list(lexer("::")) == list(lexer("::", cache=cache))
+
+
+def test_given_bad_code_when_load_then_miss(tmp_path):
+    # given
+    cache = LexCache(str(tmp_path))
+    list(lexer("::", cache=cache))
+    path = cache.path("::", cache_version())
+    with open(path, "r+b") as f:
+        f.seek(12)
+        f.write(b"\xff")
+
+    # when
+    result = cache.load("::", cache_version())
+
+    # then
+    assert result is None
+    assert list(lexer("::")) == list(lexer("::", cache=cache))
+
+
+def test_given_other_lexer_source_when_lexer_version_then_differs():
+    # given
+    fsms = default_fsms()
+
+    # when
+    versions = {lexer_version(fsms, ["WHITESPACE"], source) for source in ["a", "b"]}
+
+    # then
+    assert 2 == len(versions)
+
+
+def test_given_full_cache_when_evict_then_least_recently_used_removed(tmp_path):
+    # given
+    version = cache_version()
+    tokens = list(lexer(":" * 100))
+    cache = LexCache(str(tmp_path))
+    for i in range(4):
+        cache.store(str(i), version, tokens)
+        os.utime(cache.path(str(i), version), (i, i))
+    cache.load("0", version)
+    cache.max_bytes = 3 * os.path.getsize(cache.path("0", version))
+
+    # when
+    cache.evict()
+
+    # then
+    assert [cache.load(str(i), version) is not None for i in range(4)] == [
+        True,
+        False,
+        True,
+        True,
+    ]
+
+
+def _project1_cached(directory, input):
+    return project1(input, LexCache(directory))
+
+
+def test_given_processes_sharing_cache_when_project1_then_same_output(tmp_path):
+    # given
+    inputs = [":" * (i % 7) + "\n " * (i % 5) for i in range(200)]
+
+    # when
+    with ProcessPoolExecutor(4) as pool:
+        results = list(pool.map(_project1_cached, [str(tmp_path)] * 200, inputs))
+
+    # then
+    assert [project1(input) for input in inputs] == results
@@ -0,0 +1,140 @@
+# type: ignore
+import glob
+import os
+import random
+
+import pytest
+
+from project1 import codegen
+from project1 import fsm as fsm_module
+from project1.codegen import fingerprint, generate_source, load_scanners
+from project1.fsm import FiniteStateMachine, scan_fsm
+from project1.lexer import default_fsms
+
+
+class ColonDash(FiniteStateMachine):
+    def __init__(self) -> None:
+        super().__init__(ColonDash.s_0)
+
+    @staticmethod
+    def s_0(input_chars_read, input_char):
+        if input_char == ":":
+            return ColonDash.s_1, input_chars_read + 1
+        return FiniteStateMachine.s_reject, 0
+
+    @staticmethod
+    def s_1(input_chars_read, input_char):
+        if input_char == "-":
+            return FiniteStateMachine.s_accept, input_chars_read + 1
+        return FiniteStateMachine.s_reject, 0
+
+
+DASHES = "-"
+
+
+class Dashes(FiniteStateMachine):
+    def __init__(self) -> None:
+        super().__init__(Dashes.s_0)
+
+    @staticmethod
+    def s_0(input_chars_read, input_char):
+        if input_char in DASHES:
+            return Dashes.s_0, input_chars_read + 1
+        return FiniteStateMachine.s_accept, input_chars_read
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROJECT1_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(codegen, "_cache", {})
+    return tmp_path
+
+
+def test_given_random_input_when_scan_then_same_as_scan_fsm(cache):
+    # given
+    fsms = default_fsms() + [ColonDash()]
+    scanners = load_scanners(fsms)
+    rng = random.Random(236)
+
+    for _ in range(200):
+        test_input = "".join(rng.choices(" \t\r\n:-abé", k=12))
+        for start in range(len(test_input) + 1):
+            for fsm, scan in zip(fsms, scanners):
+                # when
+                result = scan(test_input, start)
+
+                # then
+                if result is not None:
+                    assert scan_fsm(fsm, test_input, start) == result
+                else:
+                    assert "é" in test_input[start:]
+
+
+def test_given_fsms_when_load_twice_then_module_reused(cache):
+    # given
+    load_scanners(default_fsms())
+    (path,) = glob.glob(str(cache / "scanners_*.py"))
+    os.utime(path, (0, 0))
+    codegen._cache.clear()
+
+    # when
+    load_scanners(default_fsms())
+
+    # then
+    assert 0 == os.stat(path).st_mtime
+
+
+def test_given_stale_module_when_load_then_regenerated(cache):
+    # given
+    load_scanners(default_fsms())
+    (path,) = glob.glob(str(cache / "scanners_*.py"))
+    with open(path, "w") as f:
+        f.write("FINGERPRINT = 'stale'\n")
+    codegen._cache.clear()
+
+    # when
+    scan_colon = load_scanners(default_fsms())[0]
+
+    # then
+    assert (1, 0) == scan_colon(":", 0)
+    with open(path) as f:
+        assert generate_source(default_fsms()) == f.read()
+
+
+def test_given_changed_fsms_when_load_then_old_module_removed(cache):
+    # given
+    load_scanners(default_fsms())
+    (path,) = glob.glob(str(cache / "scanners_*.py"))
+    old_path = path[: -len("0" * 24 + ".py")] + "0" * 24 + ".py"
+    os.rename(path, old_path)
+    codegen._cache.clear()
+
+    # when
+    load_scanners(default_fsms())
+
+    # then
+    assert [path] == glob.glob(str(cache / "scanners_*.py"))
+
+
+def test_given_different_fsms_when_load_then_different_module(cache):
+    # given
+    load_scanners(default_fsms())
+
+    # when
+    load_scanners(default_fsms() + [ColonDash()])
+
+    # then
+    assert 2 == len(glob.glob(str(cache / "scanners_*.py")))
+
+
+def test_given_changed_module_constant_when_fingerprint_then_differs(monkeypatch):
+    # given
+    before = fingerprint([Dashes()])
+    monkeypatch.setattr(fsm_module, "_tables", {})
+    monkeypatch.setattr(f"{__name__}.DASHES", "-=")
+
+    # when
+    after = fingerprint([Dashes()])
+
+    # then
+    assert before != after
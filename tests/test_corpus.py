@@ -0,0 +1,61 @@
+# type: ignore
+from collections import Counter
+
+import pytest
+
+from project1.corpus import (
+    DATALOG_MIX,
+    LEXER_MIX,
+    datalog_program,
+    generate,
+    pathological,
+)
+from project1.incremental import IncrementalLexer
+from project1.token import TOKEN_TYPES
+
+
+def lexed_counts(input_string):
+    return dict(
+        Counter(TOKEN_TYPES[code] for code in IncrementalLexer(input_string).codes)
+    )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_given_lexer_mix_when_generate_then_counts_same_as_lexer(seed):
+    # when
+    corpus = generate(2000, LEXER_MIX, seed)
+
+    # then
+    assert len(corpus.text) >= 2000
+    assert lexed_counts(corpus.text) == corpus.counts
+
+
+@pytest.mark.parametrize("kind", ["colons", "whitespace", "unterminated_string"])
+def test_given_lexed_pathology_when_pathological_then_counts_same_as_lexer(kind):
+    # when
+    corpus = pathological(kind, 5000)
+
+    # then
+    assert lexed_counts(corpus.text) == corpus.counts
+
+
+def test_given_seed_when_datalog_program_then_same_program_each_time():
+    # when
+    corpus = datalog_program(20000, seed=7)
+
+    # then
+    assert len(corpus.text) >= 20000
+    assert datalog_program(20000, seed=7).text == corpus.text
+    for keyword in ["Schemes:", "Facts:", "Rules:", "Queries:"]:
+        assert keyword in corpus.text
+    for token_type in ["SCHEMES", "FACTS", "RULES", "QUERIES", "EOF"]:
+        assert corpus.counts[token_type] == 1
+
+
+def test_given_datalog_mix_when_generate_then_only_mix_types():
+    # when
+    corpus = generate(20000, DATALOG_MIX)
+
+    # then
+    assert set(corpus.counts) <= set(DATALOG_MIX) | {"EOF"}
+    assert corpus.counts["ID"] > corpus.counts["SCHEMES"]
@@ -0,0 +1,91 @@
+# type: ignore
+import glob
+import random
+
+import pytest
+
+from project1.dfa import compile_dfa
+from project1.fsm import Colon, Eof, FiniteStateMachine, WhiteSpace
+from project1.lexer import _longest_match, default_fsms, lexer
+
+
+def _random_inputs(count, length, alphabet=" \t\r\n:abé"):
+    rng = random.Random(236)
+    return ["".join(rng.choices(alphabet, k=length)) for _ in range(count)]
+
+
+def test_given_fsms_when_compile_then_minimized():
+    # given
+    fsms = [Colon(), Eof(), WhiteSpace()]
+
+    # when
+    dfa = compile_dfa(fsms)
+
+    # then
+    # start and inside whitespace
+    assert 2 == dfa.number_of_states
+
+
+def test_given_same_fsms_when_compile_then_cached():
+    # given
+    fsms = default_fsms()
+
+    # when
+    first = compile_dfa(fsms)
+    second = compile_dfa(default_fsms())
+
+    # then
+    assert first is second
+
+
+@pytest.mark.parametrize("test_input", _random_inputs(200, 12))
+def test_given_random_input_when_match_then_same_as_fsms(test_input):
+    # given
+    fsms = default_fsms()
+    dfa = compile_dfa(fsms)
+
+    for start in range(len(test_input) + 1):
+        # when
+        match = dfa.match(test_input, start)
+        expected = _longest_match(test_input, start, fsms)
+
+        # then
+        if match is not None:
+            num_chars_read, index, stop = match
+            fsm = fsms[index] if index >= 0 else None
+            assert expected == (num_chars_read, fsm, stop)
+
+
+@pytest.mark.parametrize(
+    "path", sorted(glob.glob("./tests/resources/project1-passoff/*/input*.txt"))
+)
+def test_given_passoff_input_when_dfa_lexer_then_same_as_fsm_lexer(path):
+    # given
+    with open(path, "r") as f:
+        input_string = f.read()
+
+    # when
+    tokens = list(lexer(input_string, "dfa"))
+
+    # then
+    assert list(lexer(input_string, "fsm")) == tokens
+
+
+class CountingState(FiniteStateMachine):
+    def __init__(self) -> None:
+        super().__init__(CountingState.s_0)
+
+    @staticmethod
+    def s_0(input_chars_read, input_char):
+        if input_chars_read < 2:
+            return CountingState.s_0, input_chars_read + 1
+        return FiniteStateMachine.s_accept, input_chars_read
+
+
+def test_given_state_depends_on_count_when_compile_then_error():
+    # given
+    fsms = [CountingState()]
+
+    # when/then
+    with pytest.raises(ValueError):
+        compile_dfa(fsms)
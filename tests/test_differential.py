@@ -0,0 +1,29 @@
+# type: ignore
+import pytest
+
+from project1.differential import check, first_divergence, random_inputs
+from project1.fsm import Colon
+
+
+@pytest.mark.parametrize("engine", ["table", "dfa", "regex", "generated"])
+def test_given_random_inputs_when_check_then_no_divergence(engine):
+    # when
+    count, divergence = check(random_inputs(300), engine)
+
+    # then
+    assert count == 300
+    assert divergence is None
+
+
+def test_given_wrong_pattern_when_first_divergence_then_reported(monkeypatch):
+    # given
+    monkeypatch.setattr(Colon, "pattern", "::?")
+    monkeypatch.setattr("project1.pattern._cache", {})
+
+    # when
+    divergence = first_divergence(" ::", "regex")
+
+    # then
+    assert divergence.index == 0
+    assert str(divergence.expected) == '(COLON,":",1)'
+    assert str(divergence.actual) == '(UNDEFINED,"::",1)'
@@ -1,5 +1,23 @@
 # type: ignore
-from project1.fsm import run_fsm, Colon, WhiteSpace, Eof
+import random
+
+import pytest
+
+from project1.fsm import (
+    run_fsm,
+    run_fsm_bytes,
+    run_until,
+    scan_fsm,
+    scan_fsm_bytes,
+    to_table,
+    Colon,
+    Eof,
+    FiniteStateMachine,
+    Id,
+    Run,
+    WhiteSpace,
+)
+from project1.lexer import lexer
 from project1.token import Token
 
 
@@ -27,6 +45,18 @@ class TestColon:
         assert 1 == number_chars_read
         assert Token.colon(":") == token
 
+    def test_given_offset_when_run_then_accept_from_offset(self):
+        # given
+        colon = Colon()
+        input_string = "ab:c"
+
+        # when
+        number_chars_read, token = run_fsm(colon, input_string, 2)
+
+        # then
+        assert 1 == number_chars_read
+        assert Token.colon(":") == token
+
 
 class TestEof:
     def test_given_non_eof_when_run_then_reject(self):
@@ -53,6 +83,74 @@ class TestEof:
         assert Token.eof("") == token
 
 
+class TestId:
+    def test_given_non_letter_when_run_then_reject(self):
+        # given
+        id = Id()
+        input_string = "1abc"
+
+        # when
+        number_chars_read, _ = run_fsm(id, input_string)
+
+        # then
+        assert 0 == number_chars_read
+
+    def test_given_id_when_run_then_accept(self):
+        # given
+        id = Id()
+        input_string = "a1B2:c"
+
+        # when
+        number_chars_read, token = run_fsm(id, input_string)
+
+        # then
+        assert 4 == number_chars_read
+        assert Token.id("a1B2") == token
+
+    @pytest.mark.parametrize(
+        "input_string, expected",
+        [
+            ("Schemes", Token.schemes("Schemes")),
+            ("Facts:", Token.facts("Facts")),
+            ("Rules\n", Token.rules("Rules")),
+            ("Queries", Token.queries("Queries")),
+            ("Factsx", Token.id("Factsx")),
+            ("Fact", Token.id("Fact")),
+            ("facts", Token.id("facts")),
+        ],
+    )
+    def test_given_keyword_or_id_when_run_then_longest_match_classified(
+        self, input_string, expected
+    ):
+        # given
+        id = Id()
+
+        # when
+        number_chars_read, token = run_fsm(id, input_string)
+
+        # then
+        assert len(expected.value) == number_chars_read
+        assert expected == token
+
+    def test_given_keywords_when_token_then_same_type_as_token_type(self):
+        # given
+        id = Id()
+
+        # when
+        tokens = [id.token(value) for value in id.keywords]
+
+        # then
+        assert [id.token_type(t.value) for t in tokens] == [
+            t.token_type for t in tokens
+        ]
+        assert "ID" not in [t.token_type for t in tokens]
+
+    def test_given_keywords_when_assign_then_error(self):
+        # when/then
+        with pytest.raises(TypeError):
+            Id.keywords["Foo"] = "COLON"
+
+
 class TestWhiteSpace:
     def test_given_non_white_space_when_run_then_reject(self):
         # given
@@ -76,3 +174,181 @@ class TestWhiteSpace:
         # then
         assert 13 == number_chars_read
         assert Token.whitespace(" \r\n\r\n \n \t \t  ") == token
+
+
+table_inputs = ["", ":", "::", " \t\r\n:", "a :", "  ", "é :", " é", ":-"]
+
+
+class TestToTable:
+    @pytest.mark.parametrize("fsm_class", [Colon, Eof, WhiteSpace])
+    @pytest.mark.parametrize("input_string", table_inputs)
+    def test_given_fsm_when_to_table_then_run_matches(self, fsm_class, input_string):
+        # given
+        fsm = fsm_class()
+
+        # when
+        table = to_table(fsm)
+
+        # then
+        for start in range(len(input_string) + 1):
+            assert run_fsm(fsm, input_string, start) == run_fsm(
+                table, input_string, start
+            )
+
+    @pytest.mark.parametrize("fsm_class", [Colon, Eof, WhiteSpace])
+    @pytest.mark.parametrize("input_string", table_inputs)
+    def test_given_bytes_when_run_then_matches_str(self, fsm_class, input_string):
+        # given
+        fsm = fsm_class()
+        data = input_string.encode("latin-1")
+
+        # when
+        results = [
+            (run_fsm_bytes(fsm, data, start), run_fsm_bytes(to_table(fsm), data, start))
+            for start in range(len(data) + 1)
+        ]
+
+        # then
+        for start, (result, table_result) in enumerate(results):
+            if input_string.isascii():
+                assert run_fsm(fsm, input_string, start) == result
+            assert result == table_result
+
+    def test_given_table_when_to_table_then_same(self):
+        # given
+        table = to_table(WhiteSpace())
+
+        # when
+        result = to_table(table)
+
+        # then
+        assert table is result
+
+    def test_given_new_instance_when_to_table_then_tables_shared(self):
+        # given
+        table = to_table(WhiteSpace())
+        fsm = WhiteSpace()
+
+        # when
+        result = to_table(fsm)
+
+        # then
+        assert fsm is result.source
+        assert table.transitions is result.transitions
+
+
+class QuotedString(FiniteStateMachine):
+    """A quoted string with '' for a quote, its body read as a run."""
+
+    calls = 0
+
+    def __init__(self) -> None:
+        super().__init__(QuotedString.s_0)
+
+    @staticmethod
+    def s_0(input_chars_read, input_char):
+        if input_char == "'":
+            return QuotedString.s_1, input_chars_read + 1
+        return FiniteStateMachine.s_reject, 0
+
+    @staticmethod
+    @run_until("'")
+    def s_1(input_chars_read, input_char):
+        QuotedString.calls += 1
+        if input_char == "":
+            return FiniteStateMachine.s_reject, 0
+        if input_char == "'":
+            return QuotedString.s_2, input_chars_read + 1
+        return QuotedString.s_1, input_chars_read + 1
+
+    @staticmethod
+    def s_2(input_chars_read, input_char):
+        if input_char == "'":
+            return QuotedString.s_1, input_chars_read + 1
+        return FiniteStateMachine.s_accept, input_chars_read
+
+
+class PlainQuotedString(FiniteStateMachine):
+    """`QuotedString` without the run."""
+
+    def __init__(self) -> None:
+        super().__init__(PlainQuotedString.s_0)
+
+    @staticmethod
+    def s_0(input_chars_read, input_char):
+        if input_char == "'":
+            return PlainQuotedString.s_1, input_chars_read + 1
+        return FiniteStateMachine.s_reject, 0
+
+    @staticmethod
+    def s_1(input_chars_read, input_char):
+        if input_char == "":
+            return FiniteStateMachine.s_reject, 0
+        if input_char == "'":
+            return PlainQuotedString.s_2, input_chars_read + 1
+        return PlainQuotedString.s_1, input_chars_read + 1
+
+    @staticmethod
+    def s_2(input_chars_read, input_char):
+        if input_char == "'":
+            return PlainQuotedString.s_1, input_chars_read + 1
+        return FiniteStateMachine.s_accept, input_chars_read
+
+
+class TestRun:
+    def test_given_random_strings_when_scan_then_same_as_without_run(self):
+        # given
+        rng = random.Random(236)
+        for _ in range(500):
+            input_string = "".join(rng.choices("'''ab \n", k=rng.randint(0, 20)))
+
+            for start in range(len(input_string) + 1):
+                # when
+                result = scan_fsm(QuotedString(), input_string, start)
+                bytes_result = scan_fsm_bytes(
+                    QuotedString(), input_string.encode(), start
+                )
+
+                # then
+                expected = scan_fsm(PlainQuotedString(), input_string, start)
+                assert expected == result
+                assert expected == bytes_result
+
+    def test_given_long_string_when_scan_then_body_skipped(self):
+        # given
+        input_string = "'" + "a''b\n" * 3 + "x" * 10000 + "' :"
+        QuotedString.calls = 0
+
+        # when
+        result = scan_fsm(QuotedString(), input_string)
+
+        # then
+        assert (len(input_string) - 2, len(input_string) - 2) == result
+        assert QuotedString.calls == 4
+
+    def test_given_whitespace_run_when_lexer_then_line_numbers_counted(self):
+        # given
+        input_string = " \n\t\r\n" * 1000 + ":"
+
+        # when
+        tokens = list(lexer(input_string))
+
+        # then
+        assert [Token("COLON", ":", 2001), Token("EOF", "", 2001)] == tokens
+
+    def test_given_non_ascii_chars_when_run_while_then_skipped_in_str(self):
+        # given
+        run = Run("éè")
+
+        # when
+        result = run.skip("aéèéb", 1)
+        bytes_result = run.skip_bytes(b"ab", 1)
+
+        # then
+        assert 4 == result
+        assert 1 == bytes_result
+
+    def test_given_no_chars_or_delimiter_when_run_then_error(self):
+        # when/then
+        with pytest.raises(ValueError):
+            Run()
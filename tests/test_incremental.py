@@ -0,0 +1,67 @@
+# type: ignore
+import random
+
+import pytest
+
+from project1.incremental import IncrementalLexer
+from project1.lexer import lexer
+
+
+@pytest.mark.parametrize("engine", ["fsm", "dfa", "regex"])
+def test_given_random_edits_when_edit_then_same_as_lexer(engine):
+    # given
+    rng = random.Random(236)
+    for _ in range(100):
+        input_string = "".join(rng.choices(" \t\n\n::!", k=rng.randint(0, 30)))
+        tokens = IncrementalLexer(input_string, engine)
+        for _ in range(10):
+            offset = rng.randint(0, len(tokens.source))
+            deleted = rng.randint(0, len(tokens.source) - offset)
+            inserted = "".join(rng.choices(" \t\n::!", k=rng.randint(0, 4)))
+
+            # when
+            tokens.edit(offset, deleted, inserted)
+
+            # then
+            expected = IncrementalLexer(tokens.source, engine)
+            assert list(lexer(tokens.source)) == list(tokens)
+            assert expected.starts == tokens.starts
+            assert expected.stops == tokens.stops
+            assert expected.line_nums == tokens.line_nums
+            assert expected.reaches == tokens.reaches
+
+
+def test_given_large_input_when_small_edit_then_few_tokens_lexed():
+    # given
+    tokens = IncrementalLexer(": \n" * 10000)
+
+    # when
+    count = tokens.edit(15000, 0, "\n\n:")
+
+    # then
+    assert count <= 4
+    assert list(lexer(tokens.source)) == list(tokens)
+
+
+def test_given_large_input_when_edits_near_start_then_tail_not_rewritten():
+    # given
+    tokens = IncrementalLexer(": \n" * 10000)
+    tail = tokens._starts[-100:]
+
+    # when
+    for i in range(10):
+        tokens.edit(3 * i, 1, "\n:\n:")
+
+    # then
+    assert tail == tokens._starts[-100:]
+    assert list(lexer(tokens.source)) == list(tokens)
+    assert tokens.source.count("\n") + 1 == tokens.line_nums[-1]
+
+
+def test_given_edit_outside_input_when_edit_then_error():
+    # given
+    tokens = IncrementalLexer(":")
+
+    # when/then
+    with pytest.raises(ValueError):
+        tokens.edit(1, 1, "")
@@ -1,31 +1,221 @@
 # type: ignore
+import io
+import random
+
 import pytest
 
 from project1.token import Token
-from project1.lexer import lexer
+from project1.fsm import Colon, Eof, WhiteSpace, to_table
+from project1.lexer import dispatch_index, lexer, lexer_bytes, lexer_stream
 
 inputs = [
     (": ", [Token("COLON", ":", 1), Token("EOF", "", 1)]),
     (" \t\r\n\n: ", [Token("COLON", ":", 3), Token("EOF", "", 3)]),
     ("   !undefined\n\t", [Token("UNDEFINED", "!", 1)]),
+    (
+        "Facts Factsx:\nQueries",
+        [
+            Token("FACTS", "Facts", 1),
+            Token("ID", "Factsx", 1),
+            Token("COLON", ":", 1),
+            Token("QUERIES", "Queries", 2),
+            Token("EOF", "", 2),
+        ],
+    ),
 ]
 ids = [
     "colon",
     "colon-line",
     "undefined",
+    "keywords",
 ]
 
 
+@pytest.mark.parametrize("engine", ["fsm", "table", "dfa", "regex", "generated"])
 @pytest.mark.parametrize("test_input, expected", inputs, ids=ids)
 def test_given_input_when_lexer_then_match_tokens(
-    test_input: str, expected: list[Token]
+    test_input: str, expected: list[Token], engine: str
 ):
     # given
     # input
 
     # went
-    tokens = [i for i in lexer(test_input)]
+    tokens = [i for i in lexer(test_input, engine)]
 
     # then
     assert len(expected) == len(tokens)
     assert expected == tokens
+
+
+def test_given_fsms_when_dispatch_index_then_candidates_keep_order():
+    # given
+    fsms = [Colon(), Eof(), WhiteSpace(), to_table(Colon())]
+
+    # when
+    index = dispatch_index(fsms)
+
+    # then
+    assert [fsms[0], fsms[3]] == index[":"]
+    assert [fsms[2]] == index["\n"]
+    assert [] == index["!"]
+
+
+def test_given_new_instances_when_dispatch_index_then_their_fsms():
+    # given
+    dispatch_index([Colon(), Eof(), WhiteSpace()])
+    fsms = [Colon(), Eof(), WhiteSpace()]
+
+    # when
+    index = dispatch_index(fsms)
+
+    # then
+    assert fsms[0] is index[":"][0]
+    assert fsms[2] is index["\n"][0]
+
+
+def _fail(*args):
+    raise AssertionError("built a hidden token")
+
+
+def test_given_whitespace_when_lexer_then_hidden_tokens_not_built(monkeypatch):
+    # given
+    input_string = " \t\n:\n  :" * 10
+    monkeypatch.setattr(WhiteSpace, "token", _fail)
+
+    # when
+    tokens = list(lexer(input_string, positions=True))
+    streamed = list(lexer_stream([input_string[:5], input_string[5:]]))
+
+    # then
+    assert 21 == len(tokens)
+    assert tokens == streamed
+    assert (2, 1) == (tokens[0].line_num, tokens[0].column)
+
+
+def _random_chunks(input_string, rng):
+    chunks = []
+    start = 0
+    while start < len(input_string):
+        end = start + rng.randint(0, 4)
+        chunks.append(input_string[start:end])
+        start = end
+    return chunks
+
+
+@pytest.mark.parametrize("engine", ["fsm", "table", "dfa", "regex", "generated"])
+def test_given_random_chunks_when_lexer_stream_then_same_as_lexer(engine):
+    # given
+    rng = random.Random(236)
+    for _ in range(200):
+        input_string = "".join(rng.choices(" \t\n\n:é!", k=rng.randint(0, 20)))
+        chunks = _random_chunks(input_string, rng)
+
+        # when
+        tokens = list(lexer_stream(chunks, engine))
+
+        # then
+        assert list(lexer(input_string)) == tokens
+
+
+@pytest.mark.parametrize("engine", ["fsm", "dfa", "generated"])
+def test_given_errors_when_lexer_recover_then_every_error_then_eof(engine):
+    # given
+    input_string = ":!\n !!\n:é"
+
+    # when
+    tokens = list(lexer(input_string, engine, recover=True))
+
+    # then
+    assert [
+        Token("COLON", ":", 1),
+        Token("UNDEFINED", "!", 1),
+        Token("UNDEFINED", "!", 2),
+        Token("UNDEFINED", "!", 2),
+        Token("COLON", ":", 3),
+        Token("UNDEFINED", "é", 3),
+        Token("EOF", "", 3),
+    ] == tokens
+
+
+def test_given_random_chunks_when_lexer_stream_recover_then_same_as_lexer():
+    # given
+    rng = random.Random(236)
+    for _ in range(200):
+        input_string = "".join(rng.choices(" \t\n\n:é!", k=rng.randint(0, 20)))
+        chunks = _random_chunks(input_string, rng)
+
+        # when
+        tokens = list(lexer_stream(chunks, recover=True))
+
+        # then
+        assert list(lexer(input_string, recover=True)) == tokens
+        assert list(lexer(input_string)) == tokens[: len(list(lexer(input_string)))]
+
+
+def test_given_file_when_lexer_stream_then_same_as_lexer():
+    # given
+    input_string = " \t\r\n" * 50 + ":\n:" + " " * 100 + ":"
+    source = io.StringIO(input_string)
+
+    # when
+    tokens = list(lexer_stream(source, chunk_size=3))
+
+    # then
+    assert list(lexer(input_string)) == tokens
+
+
+@pytest.mark.parametrize("engine", ["fsm", "table", "dfa", "regex", "generated"])
+def test_given_endless_chunks_when_lexer_stream_then_tokens_before_end(engine):
+    # given
+    def chunks():
+        while True:
+            yield ": \n"
+
+    # when
+    tokens = lexer_stream(chunks(), engine)
+
+    # then
+    assert [Token("COLON", ":", 1), Token("COLON", ":", 2)] == [
+        next(tokens),
+        next(tokens),
+    ]
+
+
+@pytest.mark.parametrize("recover", [False, True])
+@pytest.mark.parametrize("engine", ["fsm", "table", "dfa", "regex", "generated"])
+def test_given_undefined_in_first_chunk_when_lexer_stream_then_one_chunk_read(
+    engine, recover
+):
+    # given
+    chunks_read = []
+
+    def chunks():
+        for i in range(100000):
+            chunks_read.append(i)
+            yield ": !" if i == 0 else ":"
+
+    # when
+    tokens = lexer_stream(chunks(), engine, recover=recover)
+
+    # then
+    assert [Token("COLON", ":", 1), Token("UNDEFINED", "!", 1)] == [
+        next(tokens),
+        next(tokens),
+    ]
+    assert len(chunks_read) <= 2
+
+
+@pytest.mark.parametrize("recover", [False, True])
+@pytest.mark.parametrize("engine", ["fsm", "table", "dfa", "regex", "generated"])
+def test_given_random_bytes_when_lexer_bytes_then_same_as_lexer(engine, recover):
+    # given
+    rng = random.Random(236)
+    for _ in range(200):
+        input_string = "".join(rng.choices(" \t\r\n:!", k=rng.randint(0, 20)))
+
+        # when
+        data = input_string.encode("ascii")
+        tokens = list(lexer_bytes(data, engine, recover=recover))
+
+        # then
+        assert list(lexer(input_string, recover=recover)) == tokens
@@ -0,0 +1,50 @@
+# type: ignore
+import random
+
+from project1.lexer import lexer
+from project1.lines import LineIndex
+
+
+def test_given_random_input_when_position_then_same_as_counting():
+    # given
+    rng = random.Random(236)
+    for _ in range(100):
+        input = "".join(rng.choices("ab\n", k=rng.randint(0, 30)))
+        lines = LineIndex(input)
+
+        for offset in range(len(input) + 1):
+            # when
+            position = lines.position(offset)
+
+            # then
+            line_num = input.count("\n", 0, offset) + 1
+            column = offset - (input.rfind("\n", 0, offset) + 1) + 1
+            assert (line_num, column) == position
+            assert line_num == lines.line_of(offset)
+        assert input.count("\n") + 1 == len(lines)
+
+
+def test_given_positions_when_lexer_then_column_and_end_set():
+    # given
+    input = " :\n\n  :: \n"
+
+    # when
+    tokens = list(lexer(input, positions=True))
+
+    # then
+    assert list(lexer(input)) == tokens
+    assert [(t.line_num, t.column, t.end) for t in tokens] == [
+        (1, 2, (1, 3)),
+        (3, 3, (3, 4)),
+        (3, 4, (3, 5)),
+        (4, 1, (4, 1)),
+    ]
+
+
+def test_given_no_positions_when_lexer_then_column_and_end_unset():
+    # when
+    token = next(lexer(":"))
+
+    # then
+    assert token.column is None
+    assert token.end is None
@@ -0,0 +1,47 @@
+# type: ignore
+import random
+
+import pytest
+
+from project1.lexer import lexer
+from project1.parallel import _split, lexer_parallel
+
+
+@pytest.mark.parametrize("engine", ["fsm", "dfa"])
+def test_given_random_input_when_lexer_parallel_then_same_as_lexer(engine):
+    # given
+    rng = random.Random(236)
+    for _ in range(10):
+        input_string = "".join(rng.choices(" \t\n\n::!", k=rng.randint(0, 200)))
+
+        # when
+        answer = list(lexer_parallel(input_string, engine, 2, rng.randint(1, 20)))
+
+        # then
+        assert list(lexer(input_string)) == answer
+
+
+def test_given_whitespace_across_lines_when_lexer_parallel_then_same_as_lexer():
+    # given
+    input_string = ":" + " \n" * 50 + ":\n" * 50
+
+    # when
+    answer = list(lexer_parallel(input_string, workers=2, segment_size=10))
+
+    # then
+    assert list(lexer(input_string)) == answer
+
+
+def test_given_input_when_split_then_segments_start_after_new_line():
+    # given
+    input_string = ":\n" * 100
+
+    # when
+    bounds = _split(input_string, 15)
+
+    # then
+    assert bounds[0][0] == 0
+    assert bounds[-1][1] == len(input_string)
+    for (_, end), (start, _) in zip(bounds, bounds[1:]):
+        assert end == start
+        assert input_string[start - 1] == "\n"
@@ -1,5 +1,8 @@
 # type: ignore
-from project1.project1 import project1
+import io
+
+from project1.lexer import lexer
+from project1.project1 import _expand, project1, write_batch, write_tokens
 
 
 def test_given_good_input_when_project1_then_output_tokens():
@@ -26,3 +29,124 @@ def test_given_bad_input_when_project1_then_output_tokens_to_undefined():
 
     # then
     assert expected == result
+
+
+def test_given_good_input_when_project1_recover_then_same_as_project1():
+    # given
+    input = " \t\r\n::\t:\n\n"
+
+    # when
+    result = project1(input, recover=True)
+
+    # then
+    assert project1(input) == result
+
+
+def test_given_bad_input_when_project1_recover_then_every_error_line():
+    # given
+    input = "!:\n\n:!!\n:\n!"
+    expected = (
+        '(UNDEFINED,"!",1)\n(COLON,":",1)\n(COLON,":",3)\n(UNDEFINED,"!",3)\n'
+        '(UNDEFINED,"!",3)\n(COLON,":",4)\n(UNDEFINED,"!",5)\n(EOF,"",5)\n'
+        "\nTotal Tokens = Errors on lines 1, 3, 5"
+    )
+
+    # when
+    result = project1(input, recover=True)
+
+    # then
+    assert expected == result
+
+
+def test_given_one_error_when_project1_recover_then_error_line():
+    # given
+    input = ":\n!:"
+
+    # when
+    result = project1(input, recover=True)
+
+    # then
+    assert result.endswith('(EOF,"",2)\n\nTotal Tokens = Error on line 2')
+
+
+def test_given_small_buffer_when_write_tokens_then_same_as_project1():
+    # given
+    input = " \t\r\n::\t:\n\n:" * 10
+    out = io.StringIO()
+
+    # when
+    write_tokens(lexer(input), out, buffer_size=3)
+
+    # then
+    assert project1(input) == out.getvalue()
+
+
+def test_given_files_when_write_batch_then_each_token_stream_in_order(tmp_path):
+    # given
+    inputs = [":\n:", " \n!", "", "::"]
+    paths = []
+    for i, input in enumerate(inputs):
+        path = tmp_path / f"{i}.txt"
+        path.write_text(input)
+        paths.append(str(path))
+    out = io.StringIO()
+
+    # when
+    summary = write_batch(paths, out, workers=2)
+
+    # then
+    expected = "".join(
+        "==> " + path + " <==\n" + project1(input) + "\n\n"
+        for path, input in zip(paths, inputs)
+    )
+    assert expected == out.getvalue()
+    assert summary.files == 4
+    assert summary.tokens == 3 + 1 + 1 + 3
+    assert summary.errors == 1
+    assert summary.size == 8
+
+
+def test_given_unreadable_files_when_write_batch_then_others_written(tmp_path):
+    # given
+    paths = [str(tmp_path / name) for name in ["a.txt", "bad.txt", "c.txt"]]
+    (tmp_path / "a.txt").write_text(":")
+    (tmp_path / "bad.txt").write_bytes(b":\xff\xfe")
+    (tmp_path / "c.txt").write_text("::")
+    paths.append(str(tmp_path / "missing.txt"))
+    out = io.StringIO()
+
+    # when
+    summary = write_batch(paths, out, workers=2)
+
+    # then
+    blocks = out.getvalue().split("==> ")[1:]
+    assert 4 == len(blocks)
+    assert blocks[0].endswith(project1(":") + "\n\n")
+    assert "Error reading file: " in blocks[1]
+    assert blocks[2].endswith(project1("::") + "\n\n")
+    assert "Error reading file: " in blocks[3]
+    assert (4, 2 + 3, 2) == (summary.files, summary.tokens, summary.errors)
+
+
+def test_given_directory_and_glob_when_expand_then_sorted_files(tmp_path):
+    # given
+    (tmp_path / "sub").mkdir()
+    for name in ["b.txt", "a.txt", "sub/c.txt", "d.dat"]:
+        (tmp_path / name).write_text(":")
+
+    # when
+    paths = _expand(
+        [
+            str(tmp_path),
+            str(tmp_path / "*.dat"),
+            str(tmp_path / "a.txt"),
+            str(tmp_path / "missing.txt"),
+            str(tmp_path / "*.none"),
+        ]
+    )
+
+    # then
+    assert [
+        str(tmp_path / name)
+        for name in ["a.txt", "b.txt", "sub/c.txt", "d.dat", "missing.txt"]
+    ] == paths
@@ -0,0 +1,127 @@
+# type: ignore
+import asyncio
+import json
+
+import pytest
+
+from project1.lexer import lexer
+from project1.server import LexServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = LexServer(workers=2, batch_size=2)
+    yield server
+    server.close()
+
+
+def exchange(server, path, requests):
+    async def run():
+        unix_server = await asyncio.start_unix_server(server.handle, path)
+        async with unix_server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            for request in requests:
+                writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            writer.write_eof()
+            responses = [json.loads(line) async for line in reader]
+            writer.close()
+            return responses
+
+    return asyncio.run(run())
+
+
+def tokens_for(responses, request_id):
+    return [
+        tuple(token)
+        for response in responses
+        if response["id"] == request_id and "tokens" in response
+        for token in response["tokens"]
+    ]
+
+
+def test_given_requests_when_served_then_tokens_same_as_lexer(server, tmp_path):
+    # given
+    inputs = {1: " \t\r\n::\t:\n\n", 2: ":\n!this", 3: ":" * 7}
+    requests = [{"id": i, "input": input} for i, input in inputs.items()]
+    requests[2]["engine"] = "dfa"
+
+    # when
+    responses = exchange(server, str(tmp_path / "s"), requests)
+
+    # then
+    for i, input in inputs.items():
+        expected = [(t.token_type, t.value, t.line_num) for t in lexer(input)]
+        assert expected == tokens_for(responses, i)
+        assert {"id": i, "done": True, "count": len(expected)} in responses
+    assert all(len(r["tokens"]) <= 2 for r in responses if "tokens" in r)
+
+
+def test_given_cancel_when_served_then_request_cancelled(server, tmp_path):
+    # given
+    requests = [
+        {"id": "a", "input": ":" * 50000},
+        {"id": "a", "cancel": True},
+        {"id": "b", "input": ":"},
+    ]
+
+    # when
+    responses = exchange(server, str(tmp_path / "s"), requests)
+
+    # then
+    assert {"id": "a", "cancelled": True} in responses
+    assert [] == tokens_for(responses, "a")
+    assert [("COLON", ":", 1), ("EOF", "", 1)] == tokens_for(responses, "b")
+
+
+def test_given_requests_at_limit_when_cancel_then_request_cancelled(tmp_path):
+    # given
+    server = LexServer(workers=1, max_pending=1)
+    requests = [
+        {"id": 1, "input": ":" * 60000},
+        {"id": 2, "input": ":" * 2000},
+        {"id": 1, "cancel": True},
+    ]
+
+    # when
+    try:
+        responses = exchange(server, str(tmp_path / "s"), requests)
+    finally:
+        server.close()
+
+    # then
+    assert {"id": 1, "cancelled": True} in responses
+    assert not any(r["id"] == 1 and "done" in r for r in responses)
+    assert {"id": 2, "done": True, "count": 2001} in responses
+
+
+def test_given_bad_requests_when_served_then_errors(server, tmp_path):
+    # given
+    requests = [
+        "not an object",
+        {"id": 1, "input": ":", "engine": "none"},
+        {"id": [2], "input": ":"},
+        {"id": 3, "input": ":"},
+    ]
+
+    # when
+    responses = exchange(server, str(tmp_path / "s"), requests)
+
+    # then
+    assert {"id": None, "error": "not a JSON object"} in responses
+    assert {"id": 1, "error": "bad input or engine"} in responses
+    assert {"id": [2], "error": "the id is not a string or a number"} in responses
+    assert {"id": 3, "done": True, "count": 2} in responses
+
+
+def test_given_broken_pool_when_served_then_error(tmp_path):
+    # given
+    server = LexServer(workers=1)
+    server.close()
+
+    # when
+    responses = exchange(server, str(tmp_path / "s"), [{"id": 1, "input": ":"}])
+
+    # then
+    assert [1] == [r["id"] for r in responses]
+    assert "error" in responses[0]
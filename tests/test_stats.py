@@ -0,0 +1,46 @@
+# type: ignore
+import pytest
+
+from project1.lexer import lexer
+from project1.stats import LexStats
+
+
+@pytest.mark.parametrize("engine", ["fsm", "table", "dfa", "regex", "generated"])
+def test_given_stats_when_lexer_then_same_tokens_and_counted(engine):
+    # given
+    input = " \t\r\n::\t:\n\n:"
+    stats = LexStats()
+
+    # when
+    answer = list(lexer(input, engine, stats))
+
+    # then
+    assert list(lexer(input)) == answer
+    assert ["WhiteSpace", "Colon", "Eof"] == list(stats.fsms)
+    assert stats.fsms["Colon"].wins == 4
+    assert stats.fsms["WhiteSpace"].wins == 3
+    assert stats.fsms["Eof"].wins == 1
+    for fsm_stats in stats.fsms.values():
+        assert fsm_stats.invocations == fsm_stats.accepts + fsm_stats.rejects
+        assert fsm_stats.chars_examined >= fsm_stats.invocations
+
+
+def test_given_stats_when_str_then_row_for_each_fsm():
+    # given
+    stats = LexStats()
+    list(lexer(":!", stats=stats))
+
+    # when
+    table = str(stats).splitlines()
+
+    # then
+    assert table[0].split() == [
+        "FSM",
+        "calls",
+        "chars",
+        "accepts",
+        "rejects",
+        "wins",
+        "seconds",
+    ]
+    assert [row.split()[0] for row in table[1:]] == ["Colon"]
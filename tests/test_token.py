@@ -1,6 +1,15 @@
 # type: ignore
+import tracemalloc
+
 import pytest
-from project1.token import Token
+from project1.token import (
+    FIXED_VALUES,
+    TOKEN_TYPES,
+    FrozenToken,
+    Token,
+    TokenCode,
+    freeze,
+)
 
 
 str_test_inputs = [
@@ -56,3 +65,93 @@ def test_given_good_token_when_str_then_match_expected(token: Token, expected: s
 
     # then
     assert expected == result
+
+
+def test_given_token_codes_when_compare_then_names_match_token_types():
+    # given
+    token_types = TOKEN_TYPES
+
+    # when
+    names = [code.name for code in TokenCode]
+
+    # then
+    assert list(token_types) == names
+    assert all(TokenCode.of(name).token_type == name for name in token_types)
+
+
+@pytest.mark.parametrize("token, expected", str_test_inputs, ids=str_test_ids)
+def test_given_token_when_code_then_match_type(token: Token, expected: str):
+    # given
+    # token
+
+    # when
+    result = token.code
+
+    # then
+    assert token.token_type == result.name
+
+
+def test_given_frozen_token_when_replace_then_new_token_and_original_unchanged():
+    # given
+    token = FrozenToken("ID", "a", 1)
+
+    # when
+    result = token.replace(line_num=2)
+
+    # then
+    assert FrozenToken("ID", "a", 2) == result
+    assert FrozenToken("ID", "a", 1) == token
+    with pytest.raises(AttributeError):
+        token.value = "b"
+
+
+def test_given_equal_tokens_when_hash_then_deduplicated():
+    # given
+    tokens = [FrozenToken("ID", "a", 1), FrozenToken("ID", "a", 1), Token("ID", "a", 1)]
+
+    # when
+    result = set(tokens[:2])
+
+    # then
+    assert 1 == len(result)
+    assert tokens[2] == tokens[0] and tokens[0] == tokens[2]
+    assert tokens[2] == tokens[0].thaw()
+
+
+def test_given_repeated_values_when_freeze_then_values_shared():
+    # given
+    tokens = [Token("COLON_DASH", "".join(":-"), 1), Token.id("".join("ab"))] * 2
+
+    # when
+    frozen = list(freeze(tokens))
+
+    # then
+    assert tokens == frozen
+    assert frozen[0].value is frozen[2].value is FIXED_VALUES["COLON_DASH"]
+    assert frozen[1].value is frozen[3].value
+
+
+def test_given_many_repeated_ids_when_freeze_then_less_memory():
+    # given
+    line_nums = list(range(1000, 1200))
+
+    def ids():
+        for i in range(10000):
+            token = Token.id("identifier_" + str(i % 100))
+            token.line_num = line_nums[i // 50]
+            yield token
+
+    # when
+    tracemalloc.start()
+    tokens = list(ids())
+    token_bytes = tracemalloc.get_traced_memory()[0]
+    del tokens
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    frozen = list(freeze(ids()))
+    frozen_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # then
+    assert 10000 == len(frozen)
+    assert frozen_bytes < token_bytes / 2
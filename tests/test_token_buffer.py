@@ -0,0 +1,46 @@
+# type: ignore
+import random
+
+import pytest
+
+from project1.lexer import lexer, lexer_buffer
+from project1.token import Token
+from project1.token_buffer import TokenBuffer
+
+
+@pytest.mark.parametrize("engine", ["fsm", "table", "dfa", "regex", "generated"])
+def test_given_random_input_when_lexer_buffer_then_same_as_lexer(engine):
+    # given
+    rng = random.Random(236)
+    for _ in range(200):
+        input_string = "".join(rng.choices(" \t\r\n:!é", k=rng.randint(0, 20)))
+
+        # when
+        buffer = lexer_buffer(input_string, engine)
+
+        # then
+        assert list(lexer(input_string)) == list(buffer)
+
+
+def test_given_buffer_when_index_then_build_token():
+    # given
+    buffer = lexer_buffer(" :\n\n:")
+
+    # when
+    tokens = [buffer[0], buffer[-1]]
+
+    # then
+    assert [Token("COLON", ":", 1), Token("EOF", "", 3)] == tokens
+
+
+def test_given_buffer_when_slice_then_buffer_over_same_source():
+    # given
+    buffer = lexer_buffer(" :\n\n:")
+
+    # when
+    result = buffer[1:]
+
+    # then
+    assert isinstance(result, TokenBuffer)
+    assert buffer.source is result.source
+    assert [Token("COLON", ":", 3), Token("EOF", "", 3)] == list(result)